@@ -62,6 +62,17 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
+    # orjson para JSON y MessagePack con Accept: application/msgpack; la
+    # interfaz navegable de DRF solo en desarrollo
+    "DEFAULT_RENDERER_CLASSES": [
+        "reservations.renderers.ORJSONRenderer",
+        "reservations.renderers.MessagePackRenderer",
+    ] + (["rest_framework.renderers.BrowsableAPIRenderer"] if DEBUG else []),
+    "DEFAULT_PARSER_CLASSES": [
+        "reservations.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
 SIMPLE_JWT = {
@@ -105,6 +116,41 @@ DATABASES = {
     'default': dj_database_url.config(default=config('DATABASE_URL'))
 }
 
+# Solo PostgreSQL: confiar en la restricción de exclusión de la base de datos
+# en lugar de consultar solapamientos antes de cada INSERT
+RESERVATION_OVERLAP_CONSTRAINT = config(
+    'RESERVATION_OVERLAP_CONSTRAINT', default=False, cast=bool)
+
+# Índice en memoria de noches ocupadas para RoomViewSet.availability
+OCCUPANCY_INDEX = config('OCCUPANCY_INDEX', default=False, cast=bool)
+OCCUPANCY_INDEX_HORIZON_DAYS = config(
+    'OCCUPANCY_INDEX_HORIZON_DAYS', default=365, cast=int)
+# Los cambios de otros procesos llegan por la caché (si es compartida); el
+# índice se reconstruye si falta alguno y, en todo caso, tras estos segundos
+OCCUPANCY_INDEX_MAX_AGE = config('OCCUPANCY_INDEX_MAX_AGE', default=300, cast=int)
+
+# Caché compartida entre procesos (por ejemplo Redis o Memcached en producción)
+CACHES = {
+    'default': {
+        'BACKEND': config(
+            'CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+
+# Segundos de vida de las respuestas de /room/availability/ (0 la desactiva)
+AVAILABILITY_CACHE_TTL = config('AVAILABILITY_CACHE_TTL', default=0, cast=int)
+
+# Bajo ASGI cada petición en curso abre su propia conexión: búsquedas
+# asíncronas que consultan la base de datos a la vez, por proceso
+ASYNC_AVAILABILITY_DB_CONCURRENCY = config(
+    'ASYNC_AVAILABILITY_DB_CONCURRENCY', default=20, cast=int)
+
+# Segundos que se guarda la respuesta de un POST con Idempotency-Key
+IDEMPOTENCY_KEY_TTL = config('IDEMPOTENCY_KEY_TTL', default=86400, cast=int)
+# Segundos tras los que una petición sin terminar (proceso caído) libera su clave
+IDEMPOTENCY_LOCK_TIMEOUT = config('IDEMPOTENCY_LOCK_TIMEOUT', default=60, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -0,0 +1,120 @@
+import asyncio
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from reservations.authentication import AsyncJWTAuthentication
+from reservations.availability import (
+    InvalidAvailabilityQuery, availability_data, availability_page, availability_paginated,
+    availability_queryset, availability_row, parse_availability_query
+)
+from reservations.cache import (
+    availability_cache_enabled, availability_cache_key, cache_availability, get_cached_availability
+)
+from reservations.occupancy import get_occupancy_index, occupancy_index_enabled
+from reservations.renderers import render_json
+
+
+# Un semáforo por bucle de eventos (uno por proceso bajo uvicorn)
+_db_slots = weakref.WeakKeyDictionary()
+
+
+def db_slots():
+    """Limita las conexiones simultáneas que abren las búsquedas asíncronas"""
+    loop = asyncio.get_running_loop()
+    if loop not in _db_slots:
+        _db_slots[loop] = asyncio.Semaphore(settings.ASYNC_AVAILABILITY_DB_CONCURRENCY)
+    return _db_slots[loop]
+
+
+def release_connection():
+    """
+    Cierra la conexión del hilo de la petición antes de liberar el turno, en
+    lugar de esperar a request_finished (salvo dentro de una transacción)
+    """
+    if not connection.in_atomic_block:
+        close_old_connections()
+
+
+def json_response(data, status=status.HTTP_200_OK):
+    # Mismo codificador que ORJSONRenderer: Decimal y fechas igual que la vista síncrona
+    return HttpResponse(render_json(data), status=status, content_type='application/json')
+
+
+def error_response(exc):
+    """Respuesta con el mismo formato que el manejador de errores de DRF"""
+    detail = exc.detail if isinstance(exc.detail, dict) else {'detail': exc.detail}
+    return json_response(detail, status=exc.status_code)
+
+
+@require_GET
+async def availability(request):
+    """
+    Consultar disponibilidad de habitaciones en fechas específicas, versión
+    asíncrona de RoomViewSet.availability para servidores ASGI
+    """
+    # La autenticación también consulta la base de datos
+    async with db_slots():
+        try:
+            return await search_availability(request)
+        finally:
+            await sync_to_async(release_connection)()
+
+
+async def search_availability(request):
+    authentication = AsyncJWTAuthentication()
+    try:
+        user_auth = await authentication.aauthenticate(request)
+    except APIException as exc:
+        response = error_response(exc)
+        response['WWW-Authenticate'] = authentication.authenticate_header(request)
+        return response
+
+    if user_auth is None:
+        response = json_response(
+            {'detail': 'Authentication credentials were not provided.'},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+        response['WWW-Authenticate'] = authentication.authenticate_header(request)
+        return response
+
+    try:
+        params = parse_availability_query(request.GET)
+    except InvalidAvailabilityQuery as e:
+        return json_response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Consultas idénticas con el mismo inventario devuelven la misma respuesta
+    cache_key = None
+    if availability_cache_enabled():
+        cache_key = await sync_to_async(availability_cache_key)(params)
+        cached = await sync_to_async(get_cached_availability)(cache_key)
+        if cached is not None:
+            return json_response(cached)
+
+    # room_ids_for() reconstruye el índice si está vencido y eso lee la base
+    # de datos: se hace fuera del bucle de eventos
+    room_ids = None
+    if occupancy_index_enabled():
+        index = get_occupancy_index()
+        room_ids = await sync_to_async(index.room_ids_for)(
+            params['date_in'], params['date_out'])
+
+    available_rooms = availability_queryset(params, room_ids)
+    results = [
+        availability_row(row)
+        async for row in availability_page(available_rooms, params)
+    ]
+    total_available = (
+        await available_rooms.acount() if availability_paginated(params) else len(results))
+
+    data = availability_data(params, results, total_available)
+    if cache_key is not None:
+        await sync_to_async(cache_availability)(cache_key, data)
+
+    return json_response(data)
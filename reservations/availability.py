@@ -0,0 +1,430 @@
+import heapq
+import re
+from datetime import date, datetime, timedelta
+from decimal import ROUND_FLOOR, Decimal, InvalidOperation
+
+from django.db import connections
+from django.db.models import (
+    BooleanField, DecimalField, Exists, ExpressionWrapper, F, IntegerField, OuterRef, Value)
+from django.db.models.expressions import RawSQL
+
+from reservations.models import AMENITIES, Reservation, Room, RoomNight, amenity_mask
+from reservations.occupancy import night_mask
+
+
+# Columnas de Room que necesita una respuesta de disponibilidad
+ROOM_TYPES = [value for value, _ in Room.TYPE_ROOM]
+
+AVAILABILITY_FIELDS = (
+    'id', 'number', 'type', 'capacity', 'price_for_night', 'description', 'amenities'
+)
+
+# Valores de `ordering` aceptados por la búsqueda de disponibilidad. Con
+# `nights` fijo, ordenar por total_price equivale a ordenar por price_for_night,
+# que puede recorrer el índice room_price_idx.
+AVAILABILITY_ORDERINGS = {
+    'number': ('number', 'id'),
+    'price': ('price_for_night', 'number', 'id'),
+    '-price': ('-price_for_night', 'number', 'id'),
+    'total_price': ('price_for_night', 'number', 'id'),
+    '-total_price': ('-price_for_night', 'number', 'id'),
+}
+
+
+def availability_row(row):
+    """
+    Resultado de disponibilidad a partir de las columnas AVAILABILITY_FIELDS
+    de una habitación más `nights` y `total_price`
+    """
+    return {
+        'room_id': row['id'],
+        'room_number': row['number'],
+        'room_type': row['type'],
+        'capacity': row['capacity'],
+        'price_per_night': row['price_for_night'],
+        'total_price': row['total_price'],
+        'nights': row['nights'],
+        'description': row['description'],
+        'amenities': row['amenities']
+    }
+
+
+def room_availability(room, nights):
+    """
+    Resultado de disponibilidad de una habitación para una estadía de
+    `nights` noches
+    """
+    row = {field: getattr(room, field) for field in AVAILABILITY_FIELDS}
+    row.update({'nights': nights, 'total_price': nights * room.price_for_night})
+    return availability_row(row)
+
+
+def max_price_per_night(max_price, nights):
+    """
+    Tope por noche equivalente a total_price <= max_price. Los precios tienen
+    dos decimales, así que se redondea hacia abajo al centavo.
+    """
+    return (max_price / nights).quantize(Decimal('0.01'), rounding=ROUND_FLOOR)
+
+
+def filter_amenities(rooms, amenities):
+    """
+    Habitaciones con todos los `amenities`. Los de AMENITIES se comprueban
+    con un AND sobre amenity_mask; el resto con el JSON (contención @> con
+    índice GIN en PostgreSQL, extracción de la clave en SQLite).
+    """
+    known = {key: True for key in amenities if key in AMENITIES}
+    extra = {key: True for key in amenities if key not in AMENITIES}
+
+    mask = amenity_mask(known)
+    if mask:
+        rooms = rooms.alias(
+            amenity_match=F('amenity_mask').bitand(mask)
+        ).filter(amenity_match=mask)
+
+    if extra:
+        if connections[rooms.db].vendor == 'postgresql':
+            rooms = rooms.filter(amenities__contains=extra)
+        else:
+            rooms = rooms.filter(**{f'amenities__{key}': True for key in extra})
+    return rooms
+
+
+def filter_room_ids(rooms, room_ids):
+    """
+    Habitaciones de room_ids.ids (o las demás si son las ocupadas). En
+    PostgreSQL la lista va como un solo parámetro (= ANY): con id__in Django
+    prepara cada valor por separado y eso cuesta más que la consulta
+    """
+    if connections[rooms.db].vendor != 'postgresql':
+        if room_ids.free:
+            return rooms.filter(id__in=room_ids.ids)
+        return rooms.exclude(id__in=room_ids.ids)
+
+    column = f'"{Room._meta.db_table}"."{Room._meta.pk.column}"'
+    condition = RawSQL(f'{column} = ANY(%s)', [room_ids.ids], output_field=BooleanField())
+    return rooms.filter(condition) if room_ids.free else rooms.exclude(condition)
+
+
+def available_rooms_query(date_in, date_out, guests=1, room_type=None,
+                          room_ids=None, ordering='number', max_price=None,
+                          amenities=()):
+    """
+    Filas (AVAILABILITY_FIELDS más `nights` y `total_price` calculados en la
+    base de datos) de las habitaciones libres en [date_in, date_out). Sin los
+    `room_ids` del índice en memoria (occupancy.RoomIds), las ocupadas se
+    descartan con un NOT EXISTS correlacionado sobre RoomNight.
+    """
+    nights = (date_out - date_in).days
+    rooms = Room.objects.filter(
+        status='available',
+        capacity__gte=guests
+    )
+    if room_type:
+        rooms = rooms.filter(type=room_type)
+    # Se filtra la columna y no la expresión para poder usar room_price_idx
+    if amenities:
+        rooms = filter_amenities(rooms, amenities)
+    if max_price is not None:
+        rooms = rooms.filter(price_for_night__lte=max_price_per_night(max_price, nights))
+
+    if room_ids is not None:
+        rooms = filter_room_ids(rooms, room_ids)
+    else:
+        rooms = rooms.filter(~Exists(RoomNight.objects.filter(
+            room=OuterRef('pk'),
+            night__gte=date_in,
+            night__lt=date_out
+        )))
+
+    rooms = rooms.annotate(
+        nights=Value(nights, output_field=IntegerField()),
+        total_price=ExpressionWrapper(
+            F('price_for_night') * nights,
+            output_field=DecimalField(max_digits=12, decimal_places=2)
+        )
+    )
+    return rooms.order_by(*AVAILABILITY_ORDERINGS[ordering]).values(
+        *AVAILABILITY_FIELDS, 'nights', 'total_price')
+
+
+def occupancy_bitmaps(rooms, first_night, last_night):
+    """
+    Noches ocupadas de cada habitación en [first_night, last_night) como
+    arreglo de bits (bit i = noche first_night + i), con una sola consulta
+    """
+    bitmaps = {room.id: 0 for room in rooms}
+    reservations = Reservation.objects.filter(
+        room_id__in=list(bitmaps),
+        status__in=Reservation.ACTIVE_STATUSES,
+        date_in__lt=last_night,
+        date_out__gt=first_night
+    ).values_list('room_id', 'date_in', 'date_out')
+
+    for room_id, date_in, date_out in reservations:
+        bitmaps[room_id] |= night_mask(
+            first_night,
+            max(date_in, first_night),
+            min(date_out, last_night)
+        )
+    return bitmaps
+
+
+# Nombres de amenities aceptados en el filtro (también son claves del JSON)
+AMENITY_KEY = re.compile(r'^[a-z_][a-z0-9_]*$')
+
+
+class InvalidAvailabilityQuery(ValueError):
+    """Parámetros inválidos en la búsqueda de disponibilidad"""
+
+
+def parse_availability_query(query_params):
+    """
+    Convierte y valida los parámetros de la búsqueda de disponibilidad.
+    Compartido por la vista síncrona y la asíncrona.
+    """
+    date_in = query_params.get('date_in')
+    date_out = query_params.get('date_out')
+    guests = query_params.get('guests', 1)
+    room_type = query_params.get('room_type') or None
+    ordering = query_params.get('ordering', 'number')
+    max_price = query_params.get('max_price')
+    limit = query_params.get('limit')
+    offset = query_params.get('offset', 0)
+    # amenities=wifi,jacuzzi o amenities=wifi&amenities=jacuzzi
+    amenities = [
+        key.strip()
+        for value in query_params.getlist('amenities')
+        for key in value.split(',')
+        if key.strip()
+    ]
+
+    # Validar parámetros requeridos
+    if not date_in or not date_out:
+        raise InvalidAvailabilityQuery("date_in and date_out parameters are required")
+
+    try:
+        # Convertir strings a objetos date
+        date_in = datetime.strptime(date_in, '%Y-%m-%d').date()
+        date_out = datetime.strptime(date_out, '%Y-%m-%d').date()
+        guests = int(guests)
+    except ValueError:
+        raise InvalidAvailabilityQuery("Invalid date format. Use YYYY-MM-DD")
+
+    # Validar fechas
+    if date_out <= date_in:
+        raise InvalidAvailabilityQuery("date_out must be after date_in")
+
+    if date_in < date.today():
+        raise InvalidAvailabilityQuery("date_in cannot be in the past")
+
+    if room_type is not None and room_type not in ROOM_TYPES:
+        raise InvalidAvailabilityQuery(
+            f"room_type must be one of: {', '.join(ROOM_TYPES)}")
+
+    if ordering not in AVAILABILITY_ORDERINGS:
+        raise InvalidAvailabilityQuery(
+            f"ordering must be one of: {', '.join(AVAILABILITY_ORDERINGS)}")
+
+    # Paginación opcional
+    try:
+        limit = int(limit) if limit is not None else None
+        offset = int(offset)
+    except ValueError:
+        raise InvalidAvailabilityQuery("limit and offset must be integers")
+
+    if (limit is not None and limit < 1) or offset < 0:
+        raise InvalidAvailabilityQuery(
+            "limit must be positive and offset cannot be negative")
+
+    if max_price is not None:
+        try:
+            max_price = Decimal(max_price)
+        except InvalidOperation:
+            raise InvalidAvailabilityQuery("max_price must be a number")
+        if not max_price.is_finite() or max_price < 0:
+            raise InvalidAvailabilityQuery("max_price cannot be negative")
+
+    if not all(AMENITY_KEY.match(key) for key in amenities):
+        raise InvalidAvailabilityQuery(
+            "amenities must be a comma-separated list of amenity names")
+
+    return {
+        'date_in': date_in,
+        'date_out': date_out,
+        'guests': guests,
+        'room_type': room_type,
+        'amenities': tuple(sorted(set(amenities))),
+        'ordering': ordering,
+        'limit': limit,
+        'offset': offset,
+        'max_price': max_price,
+    }
+
+
+def availability_queryset(params, room_ids=None):
+    """available_rooms_query para los parámetros de parse_availability_query"""
+    return available_rooms_query(
+        params['date_in'], params['date_out'], params['guests'], params['room_type'],
+        room_ids=room_ids, ordering=params['ordering'],
+        max_price=params['max_price'], amenities=params['amenities'])
+
+
+def availability_paginated(params):
+    return params['limit'] is not None or params['offset'] > 0
+
+
+def availability_page(rows, params):
+    """Página pedida con limit/offset, o todas las filas"""
+    if not availability_paginated(params):
+        return rows
+    offset, limit = params['offset'], params['limit']
+    return rows[offset:offset + limit if limit is not None else None]
+
+
+def availability_data(params, results, total_available):
+    """Cuerpo de la respuesta de disponibilidad"""
+    data = {
+        'date_in': params['date_in'],
+        'date_out': params['date_out'],
+        'guests': params['guests'],
+        'available_rooms': results,
+        'total_available': total_available
+    }
+    if availability_paginated(params):
+        data.update({'limit': params['limit'], 'offset': params['offset']})
+    return data
+
+
+def batch_availability(rooms, windows):
+    """
+    Habitaciones libres para cada ventana [date_in, date_out). Las
+    reservaciones del rango que cubre todas las ventanas se leen una vez.
+    """
+    rooms = list(rooms)
+    first_night = min(window['date_in'] for window in windows)
+    last_night = max(window['date_out'] for window in windows)
+    bitmaps = occupancy_bitmaps(rooms, first_night, last_night)
+
+    results = []
+    for window in windows:
+        date_in, date_out = window['date_in'], window['date_out']
+        mask = night_mask(first_night, date_in, date_out)
+        nights = (date_out - date_in).days
+        available_rooms = [
+            room_availability(room, nights)
+            for room in rooms
+            if not bitmaps[room.id] & mask
+        ]
+        results.append({
+            'date_in': date_in,
+            'date_out': date_out,
+            'available_rooms': available_rooms,
+            'total_available': len(available_rooms)
+        })
+    return results
+
+
+def occupancy_runs(bitstring):
+    """Tramos ocupados como pares [desplazamiento, noches]"""
+    return [
+        [match.start(), match.end() - match.start()]
+        for match in re.finditer('1+', bitstring)
+    ]
+
+
+def occupancy_calendar(rooms, start, end, encoding='bitstring'):
+    """
+    Matriz habitaciones x días de [start, end): el carácter i de cada fila
+    es '1' si la noche start + i está ocupada
+    """
+    rooms = list(rooms)
+    days = (end - start).days
+    bitmaps = occupancy_bitmaps(rooms, start, end)
+
+    calendar = []
+    for room in rooms:
+        # El bit i es la noche i: invertir el binario para leer de izquierda a derecha
+        bitstring = format(bitmaps[room.id], f'0{days}b')[::-1]
+        calendar.append({
+            'room_id': room.id,
+            'room_number': room.number,
+            'room_type': room.type,
+            'status': room.status,
+            'occupancy': occupancy_runs(bitstring) if encoding == 'runs' else bitstring
+        })
+    return calendar
+
+
+# Sugerencias de fechas alternativas: ventanas devueltas por defecto y días
+# revisados antes de date_in y después de date_out
+ALTERNATIVES_LIMIT = 3
+ALTERNATIVES_HORIZON_DAYS = 30
+
+
+def free_gaps(reservations, start, end):
+    """
+    Tramos libres [inicio, fin) dentro de [start, end) dadas las
+    reservaciones (date_in, date_out) ordenadas por date_in
+    """
+    gaps = []
+    cursor = start
+    for date_in, date_out in reservations:
+        if date_in > cursor:
+            gaps.append((cursor, min(date_in, end)))
+        cursor = max(cursor, date_out)
+        if cursor >= end:
+            break
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def suggest_alternative_dates(rooms, date_in, date_out, limit=ALTERNATIVES_LIMIT,
+                              horizon=ALTERNATIVES_HORIZON_DAYS, exclude_reservation=None):
+    """
+    Las `limit` ventanas libres de la misma duración más cercanas a
+    [date_in, date_out) en cualquiera de las habitaciones. Las reservaciones
+    del rango revisado se leen con una sola consulta ordenada.
+    """
+    rooms = {room.id: room for room in rooms}
+    nights = (date_out - date_in).days
+    scan_start = max(date.today(), date_in - timedelta(days=horizon))
+    scan_end = date_out + timedelta(days=horizon)
+
+    reservations = Reservation.objects.filter(
+        room_id__in=list(rooms),
+        status__in=Reservation.ACTIVE_STATUSES,
+        date_in__lt=scan_end,
+        date_out__gt=scan_start
+    )
+    # Al editar, la propia reservación no bloquea sus fechas
+    if exclude_reservation is not None and exclude_reservation.pk:
+        reservations = reservations.exclude(pk=exclude_reservation.pk)
+    reservations = reservations.order_by('room_id', 'date_in').values_list(
+        'room_id', 'date_in', 'date_out')
+
+    booked = {room_id: [] for room_id in rooms}
+    for room_id, booked_in, booked_out in reservations:
+        booked[room_id].append((booked_in, booked_out))
+
+    candidates = []
+    for room_id, room in rooms.items():
+        for gap_start, gap_end in free_gaps(booked[room_id], scan_start, scan_end):
+            last_start = gap_end - timedelta(days=nights)
+            start = gap_start
+            while start <= last_start:
+                offset = (start - date_in).days
+                candidates.append((abs(offset), offset, room.number, room_id, start))
+                start += timedelta(days=1)
+
+    return [
+        {
+            'room_id': room_id,
+            'room_number': rooms[room_id].number,
+            'date_in': start,
+            'date_out': start + timedelta(days=nights),
+            'offset_days': offset
+        }
+        for _, offset, _, room_id, start in heapq.nsmallest(limit, candidates)
+    ]
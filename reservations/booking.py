@@ -0,0 +1,200 @@
+import random
+import time
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.db.models import Q
+
+from reservations.availability import suggest_alternative_dates
+from reservations.cache import record_inventory_change
+from reservations.models import (
+    OVERLAP_CONSTRAINT, Reservation, Room, RoomNight, overlap_constraint_enabled)
+from reservations.occupancy import reservation_change
+
+# Intentos ante un deadlock o un fallo de serialización de PostgreSQL
+BOOKING_ATTEMPTS = 3
+BOOKING_RETRY_DELAY = 0.05
+
+# 40P01 deadlock_detected, 40001 serialization_failure
+RETRYABLE_PGCODES = {'40P01', '40001'}
+
+
+def is_retryable(exc):
+    """Errores tras los que la transacción completa puede repetirse"""
+    pgcode = getattr(exc.__cause__, 'pgcode', None)
+    return pgcode in RETRYABLE_PGCODES or 'database is locked' in str(exc)
+
+
+def run_with_retry(operation, attempts=BOOKING_ATTEMPTS, delay=BOOKING_RETRY_DELAY):
+    """
+    Ejecuta operation() en su propia transacción y la repite si la base de
+    datos la abortó por un deadlock o un conflicto de serialización. Dentro de
+    una transacción externa no se repite: el error abortó también a esa
+    """
+    if connection.in_atomic_block:
+        attempts = 1
+
+    for attempt in range(1, attempts + 1):
+        try:
+            with transaction.atomic():
+                return operation()
+        except OperationalError as exc:
+            if attempt == attempts or not is_retryable(exc):
+                raise
+        # Espera creciente con algo de azar para que los reintentos no choquen otra vez
+        time.sleep(delay * attempt * (1 + random.random()))
+
+
+class RoomUnavailable(ValidationError):
+    """La habitación ya tiene noches ocupadas en el rango pedido"""
+
+    def __init__(self, alternatives):
+        super().__init__("The room is not available for the selected dates.")
+        # Fechas libres más cercanas (suggest_alternative_dates)
+        self.alternatives = alternatives
+
+
+def check_availability(reservation):
+    try:
+        reservation.check_availability()
+    except ValidationError:
+        raise RoomUnavailable(suggest_alternative_dates(
+            [reservation.room], reservation.date_in, reservation.date_out,
+            exclude_reservation=reservation))
+
+
+def book(reservation, check_room=None):
+    """
+    Guarda la reservación con su habitación bloqueada (SELECT ... FOR UPDATE
+    sobre esa fila): las reservas de una misma habitación se atienden de a
+    una y las de otras habitaciones no esperan. El estado, la capacidad, el
+    precio y las noches ocupadas se leen después del bloqueo y en la misma
+    transacción que el INSERT, así que dos reservas de la misma habitación
+    no pueden pasar ambas la consulta de disponibilidad.
+
+    check_room(reservation): validaciones propias de quien llama, con la
+    fila bloqueada ya asignada a reservation.room
+    """
+    pk, adding = reservation.pk, reservation._state.adding
+
+    def save():
+        # Un intento abortado pudo haber asignado la clave del INSERT revertido
+        reservation.pk, reservation._state.adding = pk, adding
+        room = Room.objects.select_for_update().filter(pk=reservation.room_id).first()
+        if room is None:
+            raise ValidationError({'room': "The room does not exist."})
+        reservation.room = room
+        if check_room is not None:
+            check_room(reservation)
+        # En modo restricción de PostgreSQL el INSERT detecta el solapamiento
+        if not overlap_constraint_enabled():
+            check_availability(reservation)
+        reservation.save(availability_checked=True)
+        return reservation
+
+    return run_with_retry(save)
+
+
+def occupied_nights(reservations):
+    """
+    Noches ya ocupadas de las habitaciones y fechas pedidas, en una sola
+    consulta: (room_id, noche)
+    """
+    stays = Q()
+    for reservation in reservations:
+        stays |= Q(room_id=reservation.room_id, night__gte=reservation.date_in,
+                   night__lt=reservation.date_out)
+    if not stays:
+        return set()
+    return set(RoomNight.objects.filter(stays).values_list('room_id', 'night'))
+
+
+def validate_group(reservations, rooms):
+    """
+    Las mismas validaciones que Reservation.save, más el solapamiento con el
+    inventario y entre las estadías del grupo. Devuelve {posición: mensajes}
+    """
+    errors = {}
+    valid = []
+    for position, reservation in enumerate(reservations):
+        room = rooms.get(reservation.room_id)
+        if room is None:
+            errors[position] = ["The room does not exist."]
+            continue
+        reservation.room = room
+        try:
+            reservation.set_total_price()
+            reservation.clean_fields(exclude=['client', 'room'])
+            reservation.clean_stay()
+            reservation.clean_room()
+        except ValidationError as e:
+            errors[position] = e.messages
+            continue
+        valid.append((position, reservation))
+
+    occupied = occupied_nights([reservation for _, reservation in valid])
+    requested = set()
+    for position, reservation in valid:
+        nights = {(reservation.room_id, night) for night in reservation.get_nights()}
+        if nights & occupied:
+            errors[position] = ["The room is not available for the selected dates."]
+        elif nights & requested:
+            errors[position] = ["The room is booked more than once for the same nights."]
+        requested |= nights
+    return errors
+
+
+def notify_bulk_created(reservations):
+    # bulk_create no envía post_save: lo que hacen los receptores de
+    # reservations.signals, una sola vez para todo el grupo
+    record_inventory_change([reservation_change(reservation) for reservation in reservations])
+
+
+def book_group(client, items, status='pending'):
+    """
+    Reserva de grupo, todo o nada: items son diccionarios con room (id),
+    date_in, date_out y number_of_guests. Bloquea las habitaciones en orden
+    de id (dos grupos que comparten habitaciones no se bloquean en cruz),
+    valida con una consulta de solapamiento y guarda con bulk_create. Si
+    algún ítem no es válido lanza ValidationError {posición: mensajes} y no
+    guarda ninguno
+    """
+    def save():
+        room_ids = {item['room'] for item in items}
+        rooms = {
+            room.pk: room
+            for room in Room.objects.select_for_update().filter(pk__in=room_ids).order_by('pk')
+        }
+        reservations = [
+            Reservation(client=client, room_id=item['room'], status=status,
+                        date_in=item['date_in'], date_out=item['date_out'],
+                        number_of_guests=item['number_of_guests'])
+            for item in items
+        ]
+        errors = validate_group(reservations, rooms)
+        if errors:
+            raise ValidationError(errors)
+
+        # Respaldo de la base de datos, como en Reservation.save: el bloqueo
+        # ya impide el solapamiento
+        try:
+            Reservation.objects.bulk_create(reservations)
+        except IntegrityError as e:
+            if OVERLAP_CONSTRAINT in str(e):
+                raise ValidationError(
+                    "The room is not available for the selected dates.")
+            raise
+        try:
+            RoomNight.objects.bulk_create([
+                RoomNight(room_id=reservation.room_id, night=night, reservation=reservation)
+                for reservation in reservations
+                if reservation.status in Reservation.ACTIVE_STATUSES
+                for night in reservation.get_nights()
+            ])
+        except IntegrityError:
+            raise ValidationError(
+                "The room is not available for the selected dates.")
+        notify_bulk_created(reservations)
+        return reservations
+
+    return run_with_retry(save)
@@ -0,0 +1,123 @@
+import hashlib
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# Versión global del inventario: cualquier escritura de Room o Reservation la
+# incrementa y deja inaccesibles todas las respuestas cacheadas anteriores
+INVENTORY_VERSION_KEY = 'inventory_version'
+# Cambios de cada versión (ver bump_inventory_version) y segundos que se guardan
+INVENTORY_CHANGES_KEY = 'inventory_changes'
+INVENTORY_CHANGES_TTL = 3600
+HITS_KEY = 'availability_cache:hits'
+MISSES_KEY = 'availability_cache:misses'
+
+
+def availability_cache_enabled():
+    return getattr(settings, 'AVAILABILITY_CACHE_TTL', 0) > 0
+
+
+def _increment(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # La clave no existe (primer uso o expulsada de la caché)
+        cache.add(key, 0, timeout=None)
+        return cache.incr(key)
+
+
+def inventory_version():
+    version = cache.get(INVENTORY_VERSION_KEY)
+    if version is None:
+        cache.add(INVENTORY_VERSION_KEY, 1, timeout=None)
+        version = cache.get(INVENTORY_VERSION_KEY, 1)
+    return version
+
+
+def inventory_change_key(version):
+    return f'{INVENTORY_CHANGES_KEY}:{version}'
+
+
+def bump_inventory_version(change=None):
+    """
+    change: lista de lo que cambió con esta versión, para que los índices de
+    ocupación se pongan al día sin reconstruirse (OccupancyIndex.refresh).
+    Sin ella esa versión no se puede aplicar y los índices se reconstruyen
+    """
+    version = _increment(INVENTORY_VERSION_KEY)
+    if change is not None:
+        cache.set(inventory_change_key(version), change, timeout=INVENTORY_CHANGES_TTL)
+    return version
+
+
+def inventory_changes(first, last):
+    """Los cambios de las versiones first a last, o None si falta alguno"""
+    keys = [inventory_change_key(version) for version in range(first, last + 1)]
+    changes = cache.get_many(keys)
+    if len(changes) < len(keys):
+        return None
+    return [changes[key] for key in keys]
+
+
+def record_inventory_change(change):
+    """
+    Incrementa la versión ya, para las lecturas dentro de la transacción
+    (sin cambios confirmados todavía), y otra vez al confirmar con `change`,
+    por si una lectura concurrente cacheó el estado anterior
+    """
+    bump_inventory_version(change=[])
+    transaction.on_commit(partial(bump_inventory_version, change=change))
+
+
+def cache_key_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (list, tuple)):
+        return ','.join(str(item) for item in value)
+    return str(value)
+
+
+def availability_cache_key(params):
+    """
+    Clave de la consulta normalizada: parámetros ya convertidos a su tipo y
+    en orden fijo, más la versión del inventario. La consulta va como hash:
+    memcached no admite espacios ni claves de más de 250 caracteres
+    """
+    query = '&'.join(
+        f'{name}={cache_key_value(value)}'
+        for name, value in sorted(params.items())
+    )
+    digest = hashlib.sha256(query.encode()).hexdigest()
+    return f'availability:{inventory_version()}:{digest}'
+
+
+def get_cached_availability(key):
+    """
+    key: availability_cache_key() calculada antes de consultar habitaciones,
+    la misma que se pasa a cache_availability
+    """
+    data = cache.get(key)
+    _increment(HITS_KEY if data is not None else MISSES_KEY)
+    return data
+
+
+def cache_availability(key, data):
+    # Con la versión leída antes de la consulta: si una escritura se confirma
+    # en medio, incrementa la versión y esta respuesta queda inaccesible
+    cache.set(key, data, timeout=settings.AVAILABILITY_CACHE_TTL)
+
+
+def availability_cache_stats():
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    lookups = hits + misses
+    return {
+        'enabled': availability_cache_enabled(),
+        'ttl': getattr(settings, 'AVAILABILITY_CACHE_TTL', 0),
+        'inventory_version': inventory_version(),
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / lookups, 4) if lookups else None,
+    }
@@ -0,0 +1,72 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+
+# Campo de cambios de Room, Reservation y Clients
+MODIFIED_FIELD = 'modified_at'
+
+
+def queryset_version(queryset, relations=()):
+    """
+    Cantidad de filas y última modificación del queryset y de las relaciones
+    cuyos campos se muestran, en un solo aggregate: una baja cambia la
+    cantidad y un alta o un cambio, la fecha
+    """
+    aggregates = {'count': Count('pk'), MODIFIED_FIELD: Max(MODIFIED_FIELD)}
+    for relation in relations:
+        aggregates[relation] = Max(f'{relation}__{MODIFIED_FIELD}')
+    values = queryset.order_by().aggregate(**aggregates)
+    count = values.pop('count')
+    return count, max((value for value in values.values() if value), default=None)
+
+
+def instance_version(instance, relations=()):
+    """Como queryset_version para un objeto ya leído (relaciones con select_related)"""
+    timestamps = [getattr(instance, MODIFIED_FIELD)]
+    for relation in relations:
+        related = getattr(instance, relation)
+        if related is not None:
+            timestamps.append(getattr(related, MODIFIED_FIELD))
+    return max(timestamps)
+
+
+def make_etag(request, *parts):
+    """
+    ETag débil de la versión de los datos y de todo lo que cambia el cuerpo
+    para los mismos datos: URL con parámetros, formato y usuario
+    """
+    accepted = getattr(request, 'accepted_media_type', '')
+    key = '|'.join(str(part) for part in (
+        *parts, request.get_full_path(), accepted, request.user.pk))
+    return f'W/"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+
+
+def conditional_response(request, version, build_response, use_last_modified=True):
+    """
+    304 si If-None-Match / If-Modified-Since coinciden con la versión; si no,
+    la respuesta de build_response() con los validadores.
+
+    use_last_modified=False en los listados: una baja no cambia la última
+    modificación, solo la cantidad que incluye el ETag. Sin Last-Modified
+    If-Modified-Since no produce 304
+    """
+    count, last_modified = version
+    etag = make_etag(request, count, last_modified.isoformat() if last_modified else '')
+    timestamp = None
+    if use_last_modified and last_modified:
+        timestamp = int(last_modified.timestamp())
+
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = build_response()
+        if response.status_code != 200:
+            return response
+    response['ETag'] = etag
+    if timestamp is not None:
+        response['Last-Modified'] = http_date(timestamp)
+    # El cuerpo depende del usuario del token
+    patch_vary_headers(response, ['Authorization'])
+    return response
@@ -0,0 +1,78 @@
+# Restricción de exclusión de PostgreSQL contra reservaciones solapadas. Sin
+# dependencias de los modelos: la usan la migración 0003 y el comando
+# add_overlap_constraint
+
+OVERLAP_CONSTRAINT = 'reservation_no_overlap'
+
+# La habitación se compara como rango de un solo valor para no depender de
+# la extensión btree_gist (requiere privilegios que no siempre hay)
+CREATE_CONSTRAINT = f"""
+    ALTER TABLE reservations_reservation
+        ADD CONSTRAINT {OVERLAP_CONSTRAINT}
+        EXCLUDE USING gist (
+            int8range(room_id, room_id, '[]') WITH &&,
+            daterange(date_in, date_out) WITH &&
+        )
+        WHERE (status IN ('pending', 'confirmed'));
+"""
+
+DROP_CONSTRAINT = f"""
+    ALTER TABLE reservations_reservation
+        DROP CONSTRAINT IF EXISTS {OVERLAP_CONSTRAINT};
+"""
+
+# Sin escrituras entre la búsqueda de solapamientos y el ALTER TABLE
+LOCK_RESERVATIONS = """
+    LOCK TABLE reservations_reservation IN SHARE ROW EXCLUSIVE MODE;
+"""
+
+# Pares de reservaciones activas de la misma habitación con noches en común
+OVERLAPPING_RESERVATIONS = """
+    SELECT earlier.id, later.id, earlier.room_id
+    FROM reservations_reservation earlier
+    JOIN reservations_reservation later
+        ON later.room_id = earlier.room_id
+        AND later.id > earlier.id
+        AND later.status IN ('pending', 'confirmed')
+        AND later.date_in < earlier.date_out
+        AND earlier.date_in < later.date_out
+    WHERE earlier.status IN ('pending', 'confirmed')
+    ORDER BY earlier.id, later.id
+    LIMIT %s
+"""
+
+# Pares que se informan como máximo
+OVERLAP_REPORT_LIMIT = 100
+
+
+def find_overlaps(cursor, limit=OVERLAP_REPORT_LIMIT):
+    """(id, id, room_id) de las reservaciones activas que se solapan"""
+    cursor.execute(OVERLAPPING_RESERVATIONS, [limit])
+    return cursor.fetchall()
+
+
+def constraint_exists(cursor):
+    cursor.execute(
+        'SELECT 1 FROM pg_constraint WHERE conname = %s', [OVERLAP_CONSTRAINT])
+    return cursor.fetchone() is not None
+
+
+def format_overlaps(overlaps):
+    return '\n'.join(
+        f'  habitación {room_id}: reservaciones {first} y {second}'
+        for first, second, room_id in overlaps
+    )
+
+
+def add_overlap_constraint(cursor):
+    """
+    Crea la restricción si no hay solapamientos entre las reservaciones
+    activas (ALTER TABLE ... EXCLUDE las verifica y fallaría; PostgreSQL no
+    admite NOT VALID en restricciones de exclusión). Devuelve los pares
+    encontrados: vacío si se creó
+    """
+    cursor.execute(LOCK_RESERVATIONS)
+    overlaps = find_overlaps(cursor)
+    if not overlaps:
+        cursor.execute(CREATE_CONSTRAINT)
+    return overlaps
@@ -0,0 +1,51 @@
+import csv
+from decimal import Decimal
+
+from django.http import StreamingHttpResponse
+
+from reservations.renderers import encode_default, render_json
+
+# Filas leídas por consulta al recorrer el queryset de una exportación
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """Pseudo-buffer: csv.writer devuelve cada línea en lugar de acumularla"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(filename, header, rows):
+    """
+    Respuesta CSV que se genera mientras se envía: la memoria no depende de
+    la cantidad de filas
+    """
+    writer = csv.writer(Echo())
+
+    def lines():
+        yield writer.writerow(header)
+        for row in rows:
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(lines(), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def exact_decimal(value):
+    # Importes como texto exacto, igual que los DecimalField de la API
+    if isinstance(value, Decimal):
+        return str(value)
+    return encode_default(value)
+
+
+def stream_ndjson(filename, header, rows):
+    """Como stream_csv, con un objeto JSON por línea (claves = header)"""
+    def lines():
+        for row in rows:
+            yield render_json(dict(zip(header, row)), default=exact_decimal) + b'\n'
+
+    response = StreamingHttpResponse(lines(), content_type='application/x-ndjson')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
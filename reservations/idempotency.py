@@ -0,0 +1,146 @@
+from datetime import timedelta
+from functools import wraps
+
+import orjson
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+from rest_framework import status
+from rest_framework.response import Response
+
+from reservations.models import IdempotencyKey
+from reservations.renderers import render_json
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+# Cabecera de las respuestas repetidas desde la tabla
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = IdempotencyKey._meta.get_field('key').max_length
+
+
+def request_fingerprint(request):
+    """
+    HMAC del método, la ruta y el cuerpo ya interpretado, con las claves
+    ordenadas: el cuerpo del registro incluye la contraseña
+    """
+    data = request.data
+    if hasattr(data, 'lists'):
+        data = dict(data.lists())
+    body = orjson.dumps(
+        data, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str)
+    value = f'{request.method} {request.path}\n'.encode() + body
+    return salted_hmac('reservations.idempotency', value, algorithm='sha256').hexdigest()
+
+
+def is_stale(record, now):
+    # Vencida, o sin respuesta desde hace más de IDEMPOTENCY_LOCK_TIMEOUT
+    if record.expires_at <= now:
+        return True
+    lock_timeout = timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT)
+    return record.status_code is None and record.locked_at <= now - lock_timeout
+
+
+def claim(scope, key, user, fingerprint):
+    """
+    Toma la clave para esta petición. Devuelve (registro, True) si la
+    petición debe ejecutarse y (registro existente o None, False) si no
+    """
+    now = timezone.now()
+    fields = {
+        'fingerprint': fingerprint,
+        'status_code': None,
+        'response_body': None,
+        'locked_at': now,
+        'expires_at': now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+    }
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(
+                scope=scope, key=key, user=user, **fields), True
+    except IntegrityError:
+        pass
+
+    record = IdempotencyKey.objects.filter(scope=scope, key=key, user=user).first()
+    if record is None or not is_stale(record, now):
+        return record, False
+
+    # Dos reintentos pueden encontrar la misma clave vencida: la toma el primero que la actualiza
+    taken = IdempotencyKey.objects.filter(
+        pk=record.pk, locked_at=record.locked_at).update(**fields)
+    if not taken:
+        return None, False
+    for name, value in fields.items():
+        setattr(record, name, value)
+    return record, True
+
+
+def replay(record, fingerprint):
+    """Respuesta guardada, o el error si la clave no corresponde a esta petición"""
+    if record is not None and record.fingerprint != fingerprint:
+        return Response(
+            {'detail': f'This {IDEMPOTENCY_HEADER} was already used with a different request.'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    if record is None or record.status_code is None:
+        return Response(
+            {'detail': f'A request with this {IDEMPOTENCY_HEADER} is still being processed.'},
+            status=status.HTTP_409_CONFLICT)
+    return Response(record.response_body, status=record.status_code,
+                    headers={REPLAYED_HEADER: 'true'})
+
+
+def idempotent_response(request, scope, handler):
+    """
+    Ejecuta handler() una sola vez por Idempotency-Key. Solo se guardan las
+    respuestas exitosas: tras un error la clave se libera y el cliente puede
+    corregir la petición y repetirla con la misma clave
+    """
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is None:
+        return handler()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        return Response(
+            {'detail': f'{IDEMPOTENCY_HEADER} must have between 1 and {MAX_KEY_LENGTH} characters.'},
+            status=status.HTTP_400_BAD_REQUEST)
+
+    user = request.user if request.user.is_authenticated else None
+    fingerprint = request_fingerprint(request)
+    record, claimed = claim(scope, key, user, fingerprint)
+    if not claimed:
+        return replay(record, fingerprint)
+
+    # Solo se toca el registro si otra petición no lo tomó por vencido
+    current = IdempotencyKey.objects.filter(pk=record.pk, locked_at=record.locked_at)
+    try:
+        response = handler()
+    except Exception:
+        current.delete()
+        raise
+
+    if status.is_success(response.status_code):
+        body = None if response.data is None else orjson.loads(render_json(response.data))
+        current.update(status_code=response.status_code, response_body=body)
+    else:
+        current.delete()
+    return response
+
+
+def idempotent(scope):
+    """Decorador de la acción create de un viewset (ver idempotent_response)"""
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            return idempotent_response(
+                request, scope, lambda: method(self, request, *args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def purge_expired(batch_size=1000, now=None):
+    """Borra las claves vencidas por bloques; devuelve cuántas borró"""
+    expired = IdempotencyKey.objects.filter(expires_at__lte=now or timezone.now())
+    purged = 0
+    while True:
+        batch = list(expired.values_list('pk', flat=True)[:batch_size])
+        if not batch:
+            return purged
+        purged += IdempotencyKey.objects.filter(pk__in=batch).delete()[0]
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from reservations.constraints import add_overlap_constraint, constraint_exists, format_overlaps
+from reservations.models import reset_overlap_constraint_installed
+
+
+class Command(BaseCommand):
+    help = (
+        'Crea la restricción de exclusión reservation_no_overlap en PostgreSQL '
+        'si no hay reservaciones activas solapadas; si las hay, las informa'
+    )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('La restricción de exclusión solo existe en PostgreSQL')
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            if constraint_exists(cursor):
+                self.stdout.write('La restricción reservation_no_overlap ya existe')
+                return
+            overlaps = add_overlap_constraint(cursor)
+        reset_overlap_constraint_installed()
+
+        if overlaps:
+            raise CommandError(
+                'Hay reservaciones activas solapadas; resolverlas (cancelar o mover '
+                'una de cada par) y volver a ejecutar:\n' + format_overlaps(overlaps))
+        self.stdout.write(self.style.SUCCESS('Restricción reservation_no_overlap creada'))
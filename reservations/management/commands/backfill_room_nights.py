@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from reservations.models import Reservation, RoomNight
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el inventario por noche (RoomNight) a partir de las reservaciones activas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Cantidad de noches por INSERT'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        # Por id, como la migración 0004: ante noches solapadas gana la
+        # reservación más antigua y las demás se reportan como conflicto
+        reservations = Reservation.objects.filter(
+            status__in=Reservation.ACTIVE_STATUSES
+        ).order_by('id').only('id', 'room_id', 'date_in', 'date_out', 'status')
+
+        with transaction.atomic():
+            RoomNight.objects.all().delete()
+
+            batch = []
+            for reservation in reservations.iterator(chunk_size=batch_size):
+                batch.extend(
+                    RoomNight(room_id=reservation.room_id, night=night,
+                              reservation_id=reservation.id)
+                    for night in reservation.get_nights()
+                )
+                if len(batch) >= batch_size:
+                    RoomNight.objects.bulk_create(batch, ignore_conflicts=True)
+                    batch = []
+            RoomNight.objects.bulk_create(batch, ignore_conflicts=True)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{RoomNight.objects.count()} noches registradas en el inventario'))
+
+        # Las reservaciones solapadas existentes no pueden registrar todas sus noches
+        conflicts = [
+            reservation.id
+            for reservation in reservations.annotate(
+                registered_nights=Count('room_nights'))
+            if reservation.registered_nights < len(reservation.get_nights())
+        ]
+        if conflicts:
+            self.stdout.write(self.style.WARNING(
+                f'Reservaciones con noches en conflicto: {conflicts}'))
@@ -0,0 +1,190 @@
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from reservations.availability import available_rooms_query, availability_row
+from reservations.cache import bump_inventory_version
+from reservations.models import Clients, Reservation, Room, RoomNight, amenity_mask
+from reservations.occupancy import ROOM_SAVED, OccupancyIndex
+
+
+class Rollback(Exception):
+    """Descarta los datos sintéticos al terminar la medición"""
+
+
+def legacy_availability(date_in, date_out, guests=1):
+    """
+    Búsqueda anterior: exclude(id__in=...) sobre Reservation y objetos Room
+    completos convertidos a diccionarios en Python
+    """
+    conflicting_reservations = Reservation.objects.filter(
+        date_in__lt=date_out,
+        date_out__gt=date_in,
+        status__in=Reservation.ACTIVE_STATUSES
+    ).values_list('room_id', flat=True)
+    rooms = Room.objects.filter(
+        status='available',
+        capacity__gte=guests
+    ).exclude(id__in=conflicting_reservations)
+
+    nights = (date_out - date_in).days
+    return [
+        {
+            'room_id': room.id,
+            'room_number': room.number,
+            'room_type': room.type,
+            'capacity': room.capacity,
+            'price_per_night': room.price_for_night,
+            'total_price': nights * room.price_for_night,
+            'nights': nights,
+            'description': room.description,
+            'amenities': room.amenities
+        }
+        for room in rooms
+    ]
+
+
+def current_availability(date_in, date_out, guests=1, limit=None, room_ids=None):
+    """Búsqueda actual: NOT EXISTS, precios en SQL y filas por bloques"""
+    rows = available_rooms_query(date_in, date_out, guests, room_ids=room_ids)
+    if limit is not None:
+        rows = rows[:limit]
+    return [availability_row(row) for row in rows.iterator(chunk_size=500)]
+
+
+def indexed_availability(index, date_in, date_out):
+    """Con OCCUPANCY_INDEX: habitaciones desde el índice, comprobando su versión"""
+    return current_availability(
+        date_in, date_out, room_ids=index.room_ids_for(date_in, date_out))
+
+
+def indexed_after_write(index, room_id, date_in, date_out):
+    """Una escritura de otro proceso antes de cada búsqueda: el índice la aplica"""
+    bump_inventory_version(change=[(ROOM_SAVED, room_id)])
+    return indexed_availability(index, date_in, date_out)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara la búsqueda de disponibilidad anterior (exclude/IN) con la actual '
+        '(NOT EXISTS) y con el índice de ocupación sobre datos sintéticos que se '
+        'descartan al terminar'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rooms', type=int, default=1000)
+        parser.add_argument('--reservations', type=int, default=1000000)
+        parser.add_argument('--searches', type=int, default=20,
+                            help='Ventanas de búsqueda medidas por variante')
+        parser.add_argument('--limit', type=int, default=50,
+                            help='Tamaño de página para la variante paginada')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Pases por variante; se informa el más rápido')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        try:
+            with transaction.atomic():
+                self.seed(options['rooms'], options['reservations'], options['batch_size'])
+                self.measure(options['searches'], options['limit'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, room_count, reservation_count, batch_size):
+        self.stdout.write(
+            f'Generando {room_count} habitaciones y {reservation_count} reservaciones...')
+        client = Clients.objects.create(
+            name='Benchmark', lastname='Benchmark', document_number='0',
+            street='-', city='-', state='-', country='-',
+            email='benchmark@example.com'
+        )
+        description = 'Habitación de prueba ' * 20
+        amenities = {'wifi': True, 'tv': True, 'air_conditioning': True, 'minibar': False}
+        # bulk_create no pasa por Room.save(): la máscara se calcula aquí
+        rooms = Room.objects.bulk_create([
+            Room(number=i + 1, type='double', price_for_night=Decimal(50 + i % 200),
+                 capacity=1 + i % 4, description=description, amenities=amenities,
+                 amenity_mask=amenity_mask(amenities))
+            for i in range(room_count)
+        ], batch_size=batch_size)
+
+        # Estadías consecutivas por habitación, centradas en la fecha actual
+        per_room = reservation_count // room_count
+        start = date.today() - timedelta(days=per_room * 2)
+        batch = []
+        for room in rooms:
+            date_in = start
+            for _ in range(per_room):
+                date_in += timedelta(days=self.random.randint(0, 2))
+                date_out = date_in + timedelta(days=self.random.randint(1, 3))
+                batch.append(Reservation(
+                    date_in=date_in, date_out=date_out, status='confirmed',
+                    client=client, room=room
+                ))
+                date_in = date_out
+                if len(batch) >= batch_size:
+                    self.save_batch(batch, batch_size)
+                    batch = []
+        self.save_batch(batch, batch_size)
+
+    def save_batch(self, reservations, batch_size):
+        # bulk_create no pasa por save(): las noches se registran aquí
+        Reservation.objects.bulk_create(reservations, batch_size=batch_size)
+        RoomNight.objects.bulk_create([
+            RoomNight(room_id=reservation.room_id, reservation_id=reservation.id, night=night)
+            for reservation in reservations
+            for night in reservation.get_nights()
+        ], batch_size=batch_size)
+
+    def measure(self, searches, limit, repeat):
+        windows = []
+        for _ in range(searches):
+            date_in = date.today() + timedelta(days=self.random.randint(1, 60))
+            windows.append((date_in, date_in + timedelta(days=self.random.randint(1, 7))))
+
+        # Estadísticas al día para el planificador, como en una base en uso
+        with connection.cursor() as cursor:
+            for model in (Room, Reservation, RoomNight):
+                cursor.execute(f'ANALYZE {model._meta.db_table}')
+
+        index = OccupancyIndex()
+        started = time.perf_counter()
+        index.build()
+        self.stdout.write(
+            f'Índice de ocupación construido en {(time.perf_counter() - started) * 1000:.0f} ms')
+        room_id = next(iter(index.room_ids))
+
+        variants = [
+            ('exclude(id__in=...)', legacy_availability),
+            ('NOT EXISTS', current_availability),
+            (f'NOT EXISTS limit={limit}',
+             lambda date_in, date_out: current_availability(date_in, date_out, limit=limit)),
+            ('índice', lambda date_in, date_out: indexed_availability(index, date_in, date_out)),
+            ('índice tras escritura',
+             lambda date_in, date_out: indexed_after_write(index, room_id, date_in, date_out)),
+        ]
+        self.stdout.write(f'{"variante":<28}{"ms/búsqueda":>14}{"KiB pico":>12}')
+        for name, search in variants:
+            # El mejor de varios pases; la memoria en un pase aparte porque
+            # tracemalloc encarece sobre todo el código Python
+            elapsed = min(self.run(search, windows) for _ in range(repeat))
+            tracemalloc.start()
+            self.run(search, windows)
+            peak = tracemalloc.get_traced_memory()[1] / 1024
+            tracemalloc.stop()
+            self.stdout.write(f'{name:<28}{elapsed:>14.2f}{peak:>12.1f}')
+
+    @staticmethod
+    def run(search, windows):
+        started = time.perf_counter()
+        for date_in, date_out in windows:
+            search(date_in, date_out)
+        return (time.perf_counter() - started) * 1000 / len(windows)
@@ -0,0 +1,87 @@
+import asyncio
+import statistics
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+async def fetch(host, port, request):
+    """Una petición GET con Connection: close; devuelve el código de estado"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(request)
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera carga concurrente contra una URL de un servidor en marcha, p. ej. para '
+        'comparar la búsqueda de disponibilidad bajo WSGI (gunicorn) y ASGI (uvicorn)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help='URL completa, con los parámetros de la búsqueda')
+        parser.add_argument('--concurrency', type=int, default=200)
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--username',
+                            help='Usuario para el que se emite un token de acceso JWT')
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        if url.scheme != 'http':
+            raise CommandError('Solo se admiten URLs http://')
+
+        headers = [
+            f'GET {url.path}?{url.query} HTTP/1.1',
+            f'Host: {url.netloc}',
+            'Connection: close',
+        ]
+        if options['username']:
+            user = User.objects.get(username=options['username'])
+            headers.append(f'Authorization: Bearer {RefreshToken.for_user(user).access_token}')
+        request = ('\r\n'.join(headers) + '\r\n\r\n').encode()
+
+        latencies, statuses, elapsed = asyncio.run(self.run(
+            url.hostname, url.port or 80, request,
+            options['concurrency'], options['requests']
+        ))
+
+        latencies.sort()
+        codes = ', '.join(
+            f'{code or "sin respuesta"}: {count}' for code, count in Counter(statuses).most_common())
+        self.stdout.write(f'Peticiones: {len(latencies)} ({codes})')
+        self.stdout.write(f'Concurrencia: {options["concurrency"]}')
+        self.stdout.write(f'Rendimiento: {len(latencies) / elapsed:.1f} peticiones/s')
+        self.stdout.write(
+            f'Latencia ms: p50 {statistics.median(latencies):.1f}'
+            f'  p95 {latencies[int(len(latencies) * 0.95) - 1]:.1f}'
+            f'  máx {latencies[-1]:.1f}'
+        )
+
+    async def run(self, host, port, request, concurrency, total):
+        latencies = []
+        statuses = []
+        pending = iter(range(total))
+
+        async def worker():
+            # Cada cliente repite peticiones hasta agotar el total
+            for _ in pending:
+                started = time.perf_counter()
+                try:
+                    statuses.append(await fetch(host, port, request))
+                except (OSError, IndexError, ValueError):
+                    statuses.append(None)
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return latencies, statuses, time.perf_counter() - started
@@ -0,0 +1,84 @@
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reservations.management.commands.benchmark_availability import Rollback
+from reservations.models import Clients, Reservation, Room, amenity_mask
+from reservations.read_serializers import values_serializer
+from reservations.serializers import ClientSerializer, ReservationSerializer, RoomSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara el coste por fila de los ModelSerializer con ValuesSerializer '
+        '(values() y accesores precompilados) sobre datos sintéticos que se descartan'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000)
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Repeticiones por variante; se toma la más rápida')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.seed(options['rows'], options['batch_size'])
+                self.measure(options['rows'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, count, batch_size):
+        self.stdout.write(f'Generando {count} clientes, habitaciones y reservaciones...')
+        clients = Clients.objects.bulk_create([
+            Clients(name=f'Cliente {i}', lastname='Benchmark', document_number=f'B{i}',
+                    street='-', city='-', state='-', country='-',
+                    email=f'cliente{i}@example.com', phone='+12125552368')
+            for i in range(count)
+        ], batch_size=batch_size)
+        amenities = {'wifi': True}
+        rooms = Room.objects.bulk_create([
+            Room(number=100000 + i, type='double', price_for_night=Decimal('120.00'),
+                 capacity=2, description='Habitación de prueba', amenities=amenities,
+                 amenity_mask=amenity_mask(amenities))
+            for i in range(count)
+        ], batch_size=batch_size)
+        # Sin save(): no se registran noches ni se valida el solapamiento
+        start = date.today()
+        Reservation.objects.bulk_create([
+            Reservation(date_in=start, date_out=start + timedelta(days=2),
+                        total_price=Decimal('240.00'), client=client, room=room)
+            for client, room in zip(clients, rooms)
+        ], batch_size=batch_size)
+
+    def measure(self, count, repeat):
+        cases = [
+            ('Clients', ClientSerializer, Clients.objects.select_related('user')),
+            ('Room', RoomSerializer, Room.objects.all()),
+            ('Reservation', ReservationSerializer,
+             Reservation.objects.select_related('client', 'room')),
+        ]
+        self.stdout.write(f'{"modelo":<14}{"µs/fila DRF":>14}{"µs/fila values()":>20}')
+        for name, serializer_class, queryset in cases:
+            queryset = queryset.order_by('id')[:count]
+            reader = values_serializer(serializer_class())
+
+            drf = self.best(repeat, lambda: serializer_class(queryset.all(), many=True).data)
+            fast = self.best(repeat, lambda: reader.from_values(reader.values(queryset.all())))
+            rows = queryset.count()
+            self.stdout.write(
+                f'{name:<14}{drf * 1e6 / rows:>14.1f}{fast * 1e6 / rows:>20.1f}')
+
+    @staticmethod
+    def best(repeat, serialize):
+        # Incluye la consulta: values() también ahorra la construcción de modelos
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            serialize()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
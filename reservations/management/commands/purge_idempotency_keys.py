@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from reservations.idempotency import purge_expired
+
+
+class Command(BaseCommand):
+    help = 'Borra las claves Idempotency-Key vencidas y sus respuestas guardadas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Cantidad de claves por DELETE'
+        )
+
+    def handle(self, *args, **options):
+        purged = purge_expired(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{purged} claves vencidas borradas'))
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['room', 'status', 'date_in', 'date_out'], name='reservation_room_overlap_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['status', 'date_out', 'date_in'], name='reservation_dates_overlap_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+from reservations.constraints import DROP_CONSTRAINT, add_overlap_constraint, format_overlaps
+
+
+def create_constraint(apps, schema_editor):
+    # La restricción de exclusión con daterange solo existe en PostgreSQL
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    # Con reservaciones solapadas el ALTER TABLE fallaría: se informan y la
+    # restricción se agrega después con manage.py add_overlap_constraint
+    with schema_editor.connection.cursor() as cursor:
+        overlaps = add_overlap_constraint(cursor)
+    if overlaps:
+        print(
+            '\n  Restricción reservation_no_overlap NO creada: hay reservaciones '
+            'activas solapadas.\n' + format_overlaps(overlaps) +
+            '\n  Resolverlas y ejecutar: python manage.py add_overlap_constraint'
+        )
+
+
+def drop_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_CONSTRAINT)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0002_reservation_overlap_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_constraint, drop_constraint),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:08
+
+import django.db.models.deletion
+from datetime import timedelta
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_room_nights(apps, schema_editor):
+    Reservation = apps.get_model('reservations', 'Reservation')
+    RoomNight = apps.get_model('reservations', 'RoomNight')
+
+    active = Reservation.objects.filter(status__in=['pending', 'confirmed'])
+    # En orden de id: ante un solapamiento, la noche queda para la reservación más antigua
+    reservations = active.order_by('id').values_list('id', 'room_id', 'date_in', 'date_out')
+
+    batch = []
+    for reservation_id, room_id, date_in, date_out in reservations.iterator(chunk_size=1000):
+        batch.extend(
+            RoomNight(room_id=room_id, night=date_in + timedelta(days=offset),
+                      reservation_id=reservation_id)
+            for offset in range((date_out - date_in).days)
+        )
+        if len(batch) >= 1000:
+            RoomNight.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    RoomNight.objects.bulk_create(batch, ignore_conflicts=True)
+
+    # Las reservaciones solapadas existentes no pueden registrar todas sus
+    # noches: se informan como en manage.py backfill_room_nights
+    registered = active.annotate(registered_nights=Count('room_nights')).values_list(
+        'id', 'date_in', 'date_out', 'registered_nights')
+    conflicts = [
+        reservation_id
+        for reservation_id, date_in, date_out, registered_nights in registered.iterator(chunk_size=1000)
+        if registered_nights < (date_out - date_in).days
+    ]
+    if conflicts:
+        print(
+            f'\n  Reservaciones con noches en conflicto: {conflicts}'
+            '\n  Resolverlas y ejecutar: python manage.py backfill_room_nights'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0003_reservation_no_overlap_constraint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomNight',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('night', models.DateField()),
+                ('reservation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='room_nights', to='reservations.reservation')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='room_nights', to='reservations.room')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['night', 'room'], name='room_night_night_idx')],
+                'constraints': [models.UniqueConstraint(fields=('room', 'night'), name='room_night_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_room_nights, migrations.RunPython.noop),
+    ]
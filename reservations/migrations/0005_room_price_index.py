@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0004_roomnight'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(fields=['price_for_night', 'number'], name='room_price_idx'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:47
+
+from django.db import migrations, models
+
+# Orden de reservations.models.AMENITIES al crear la columna
+AMENITIES = (
+    'wifi',
+    'air_conditioning',
+    'minibar',
+    'jacuzzi',
+    'tv',
+    'breakfast_included'
+)
+
+# jsonb_path_ops solo admite @>, el operador de amenities__contains
+CREATE_GIN_INDEX = """
+    CREATE INDEX IF NOT EXISTS room_amenities_gin
+        ON reservations_room USING gin (amenities jsonb_path_ops);
+"""
+
+DROP_GIN_INDEX = """
+    DROP INDEX IF EXISTS room_amenities_gin;
+"""
+
+
+def fill_amenity_mask(apps, schema_editor):
+    Room = apps.get_model('reservations', 'Room')
+    rooms = list(Room.objects.only('id', 'amenities'))
+    for room in rooms:
+        amenities = room.amenities if isinstance(room.amenities, dict) else {}
+        room.amenity_mask = sum(
+            1 << bit for bit, key in enumerate(AMENITIES) if amenities.get(key))
+    Room.objects.bulk_update(rooms, ['amenity_mask'], batch_size=1000)
+
+
+def create_gin_index(apps, schema_editor):
+    # Índice GIN sobre jsonb solo en PostgreSQL
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_GIN_INDEX)
+
+
+def drop_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_GIN_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0005_room_price_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='amenity_mask',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_amenity_mask, migrations.RunPython.noop),
+        migrations.RunPython(create_gin_index, drop_gin_index),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0006_room_amenity_mask'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clients',
+            name='modified_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='reservation',
+            name='modified_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='modified_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
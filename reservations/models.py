@@ -1,7 +1,20 @@
-from django.db import models
+from django.db import models, connection, transaction, IntegrityError
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from phonenumber_field.modelfields import PhoneNumberField
 from django.contrib.auth.models import User
+from datetime import timedelta
+from reservations.constraints import OVERLAP_CONSTRAINT, constraint_exists
+
+
+def with_modified_at(kwargs, *fields):
+    """
+    save(update_fields=...) solo escribe esos campos: se agregan modified_at
+    (auto_now, del que dependen los ETag) y los `fields` que save recalcula
+    """
+    update_fields = kwargs.get('update_fields')
+    if update_fields:
+        kwargs['update_fields'] = {*update_fields, 'modified_at', *fields}
 
 
 class Clients(models.Model):
@@ -16,6 +29,12 @@ class Clients(models.Model):
     email = models.EmailField(blank=True, unique=True, null=True)
     phone = PhoneNumberField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Última modificación: las reservaciones muestran el nombre del cliente
+    modified_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def save(self, *args, **kwargs):
+        with_modified_at(kwargs)
+        super().save(*args, **kwargs)
 
     def clean(self):
         super().clean()
@@ -27,19 +46,34 @@ class Clients(models.Model):
         return self.name
 
 
+# Amenities requeridos; la posición de cada clave es su bit en Room.amenity_mask
+AMENITIES = (
+    'wifi',
+    'air_conditioning',
+    'minibar',
+    'jacuzzi',
+    'tv',
+    'breakfast_included'
+)
+
+
 def validate_amenities(value):
-    required_keys = {
-        'wifi',
-        'air_conditioning',
-        'minibar',
-        'jacuzzi',
-        'tv',
-        'breakfast_included'
-    }
+    required_keys = set(AMENITIES)
     if not all(key in value for key in required_keys):
         raise ValidationError("Faltan claves requeridas en los amenities.")
 
 
+def amenity_mask(amenities):
+    """Bits de los amenities de AMENITIES presentes (valor verdadero)"""
+    if not isinstance(amenities, dict):
+        return 0
+    return sum(
+        1 << bit
+        for bit, key in enumerate(AMENITIES)
+        if amenities.get(key)
+    )
+
+
 class Room (models.Model):
     TYPE_ROOM = [
         ('single', 'Single'),
@@ -65,10 +99,63 @@ class Room (models.Model):
     description = models.TextField(blank=True)
     capacity = models.IntegerField()
     amenities = models.JSONField(default=dict, validators=[validate_amenities])
+    # Copia desnormalizada de amenities para filtrar con un AND de enteros
+    amenity_mask = models.PositiveIntegerField(default=0, editable=False)
+    # Última modificación, para ETag / Last-Modified (ver conditional.py)
+    modified_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Orden y tope de precio de la búsqueda de disponibilidad
+            models.Index(
+                fields=['price_for_night', 'number'],
+                name='room_price_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.type
 
+    def save(self, *args, **kwargs):
+        self.amenity_mask = amenity_mask(self.amenities)
+        update_fields = kwargs.get('update_fields') or ()
+        with_modified_at(kwargs, *(['amenity_mask'] if 'amenities' in update_fields else []))
+        super().save(*args, **kwargs)
+
+
+# Si la restricción existe en esta base de datos; se consulta una vez por proceso
+_overlap_constraint_installed = None
+
+
+def overlap_constraint_installed():
+    """
+    La migración 0003 no crea la restricción si ya había reservaciones
+    solapadas (ver manage.py add_overlap_constraint)
+    """
+    global _overlap_constraint_installed
+    if _overlap_constraint_installed is None:
+        with connection.cursor() as cursor:
+            _overlap_constraint_installed = constraint_exists(cursor)
+    return _overlap_constraint_installed
+
+
+def reset_overlap_constraint_installed():
+    global _overlap_constraint_installed
+    _overlap_constraint_installed = None
+
+
+def overlap_constraint_enabled():
+    """
+    Modo opcional de PostgreSQL: la restricción de exclusión impide los
+    solapamientos y se omiten los SELECT previos al INSERT. Sin la
+    restricción creada el ajuste no tiene efecto
+    """
+    return (
+        connection.vendor == 'postgresql'
+        and getattr(settings, 'RESERVATION_OVERLAP_CONSTRAINT', False)
+        and overlap_constraint_installed()
+    )
+
 
 class Reservation(models.Model):
     STATUS_RESERVATION = [
@@ -77,6 +164,9 @@ class Reservation(models.Model):
         ('cancelled', 'Cancelled')
     ]
 
+    # Estados que ocupan la habitación
+    ACTIVE_STATUSES = ['pending', 'confirmed']
+
     date_in = models.DateField()
     date_out = models.DateField()
     number_of_guests = models.IntegerField(default=1)
@@ -88,15 +178,42 @@ class Reservation(models.Model):
     total_price = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
     created_at = models.DateField(auto_now_add=True)
     updated_at = models.DateField(auto_now=True)
+    # updated_at solo guarda el día: no distingue dos cambios de la misma fecha
+    modified_at = models.DateTimeField(auto_now=True, db_index=True)
     client = models.ForeignKey(
         Clients, on_delete=models.CASCADE, related_name='reservations')
     room = models.ForeignKey(
         Room, on_delete=models.CASCADE, related_name='reservations')
 
+    class Meta:
+        indexes = [
+            # Chequeo de solapamiento por habitación (clean / serializer).
+            # El estado va en la clave y no como índice parcial: SQLite no
+            # usa un índice parcial cuando el IN de la consulta es parametrizado.
+            models.Index(
+                fields=['room', 'status', 'date_in', 'date_out'],
+                name='reservation_room_overlap_idx',
+            ),
+            # Conflictos de todas las habitaciones en un rango (availability)
+            models.Index(
+                fields=['status', 'date_out', 'date_in'],
+                name='reservation_dates_overlap_idx',
+            ),
+        ]
+
     def __str__(self):
         return self.status
 
     def clean(self):
+        self.clean_stay()
+
+        # Verificar disponibilidad de la habitación en el inventario por noche
+        if not overlap_constraint_enabled():
+            self.check_availability()
+
+        self.clean_room()
+
+    def clean_stay(self):
         if self.date_out <= self.date_in:
             raise ValidationError(
                 "The departure date must be after the arrival date.")
@@ -106,18 +223,18 @@ class Reservation(models.Model):
             raise ValidationError(
                 "The number of guests must be at least 1.")
 
-        # Verificar disponibilidad de la habitación
-        overlapping_reservations = Reservation.objects.filter(
+    def check_availability(self):
+        occupied_nights = RoomNight.objects.filter(
             room=self.room,
-            date_in__lt=self.date_out,
-            date_out__gt=self.date_in,
-            status__in=['pending', 'confirmed']
-        ).exclude(id=self.id)
+            night__gte=self.date_in,
+            night__lt=self.date_out
+        ).exclude(reservation_id=self.id)
 
-        if overlapping_reservations.exists():
+        if occupied_nights.exists():
             raise ValidationError(
                 "The room is not available for the selected dates.")
 
+    def clean_room(self):
         # Verificar que la habitación esté disponible (no en mantenimiento o limpieza)
         if self.room.status not in ['available']:
             raise ValidationError(
@@ -128,11 +245,143 @@ class Reservation(models.Model):
             raise ValidationError(
                 "The room does not have capacity for the number of guests.")
 
-    def save(self, *args, **kwargs):
+    def loaded_relations(self):
+        """Claves foráneas con el objeto ya leído: su existencia no se vuelve a consultar"""
+        return [
+            field.name for field in self._meta.concrete_fields
+            if field.many_to_one and field.is_cached(self)
+        ]
+
+    def set_total_price(self):
         # Calcular precio total automáticamente
         if not self.total_price:
             days = (self.date_out - self.date_in).days
             self.total_price = days * self.room.price_for_night
 
-        self.full_clean()
-        super().save(*args, **kwargs)
+    def save(self, *args, availability_checked=False, **kwargs):
+        """
+        availability_checked: quien guarda ya consultó las noches ocupadas
+        (reservations.booking.book, con la habitación bloqueada). Las
+        validaciones sin consultas se repiten igual; el registro de RoomNight
+        sigue rechazando el solapamiento
+        """
+        self.set_total_price()
+        with_modified_at(kwargs)
+
+        exclude = self.loaded_relations()
+        if availability_checked:
+            self.clean_fields(exclude=exclude)
+            self.clean_stay()
+            self.clean_room()
+        else:
+            self.full_clean(exclude=exclude)
+
+        # La reservación y su inventario por noche se guardan juntos. En
+        # PostgreSQL la restricción de exclusión rechaza además el solapamiento
+        # aunque dos escrituras concurrentes pasen la validación
+        adding = self._state.adding
+        try:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                self.sync_nights(clear=not adding)
+        except IntegrityError as e:
+            if OVERLAP_CONSTRAINT in str(e):
+                raise ValidationError(
+                    "The room is not available for the selected dates.")
+            raise
+
+    def get_nights(self):
+        """
+        Noches ocupadas por la reservación: desde date_in hasta la noche
+        anterior a date_out
+        """
+        return [
+            self.date_in + timedelta(days=offset)
+            for offset in range((self.date_out - self.date_in).days)
+        ]
+
+    def sync_nights(self, clear=True):
+        """
+        Mantener el inventario por noche (RoomNight) de la reservación.
+        Las reservaciones canceladas no ocupan noches.
+        """
+        if clear:
+            RoomNight.objects.filter(reservation=self).delete()
+
+        if self.status not in self.ACTIVE_STATUSES:
+            return
+
+        # La clave única (room, night) impide el doble registro aunque dos
+        # reservaciones concurrentes pasen la validación
+        try:
+            RoomNight.objects.bulk_create([
+                RoomNight(room_id=self.room_id, night=night, reservation=self)
+                for night in self.get_nights()
+            ])
+        except IntegrityError:
+            raise ValidationError(
+                "The room is not available for the selected dates.")
+
+
+class RoomNight(models.Model):
+    """
+    Inventario por noche: una fila por cada noche ocupada de una habitación.
+    Consultar disponibilidad cuesta lo que dura la estadía y no lo que mide
+    el historial de reservaciones.
+    """
+    room = models.ForeignKey(
+        Room, on_delete=models.CASCADE, related_name='room_nights')
+    night = models.DateField()
+    reservation = models.ForeignKey(
+        Reservation, on_delete=models.CASCADE, related_name='room_nights')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['room', 'night'], name='room_night_unique'),
+        ]
+        indexes = [
+            # Noches ocupadas de todas las habitaciones (availability)
+            models.Index(fields=['night', 'room'], name='room_night_night_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.room_id} - {self.night}'
+
+
+class IdempotencyKey(models.Model):
+    """
+    Respuesta guardada de un POST con cabecera Idempotency-Key: un reintento
+    con la misma clave y el mismo cuerpo la recibe sin volver a ejecutarse.
+    Mientras la petición original está en curso, status_code es nulo.
+    """
+    key = models.CharField(max_length=255)
+    # Acción a la que pertenece la clave, por ejemplo 'reservation-create'
+    scope = models.CharField(max_length=50)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
+    # sha256 del método, la ruta y el cuerpo de la petición
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+    locked_at = models.DateTimeField()
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['scope', 'user', 'key'],
+                condition=models.Q(user__isnull=False),
+                name='idempotency_key_user_unique'),
+            # Registro de usuarios: peticiones anónimas
+            models.UniqueConstraint(
+                fields=['scope', 'key'],
+                condition=models.Q(user__isnull=True),
+                name='idempotency_key_anonymous_unique'),
+        ]
+        indexes = [
+            # Purga de claves vencidas (purge_idempotency_keys)
+            models.Index(fields=['expires_at'], name='idempotency_key_expires_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.scope} - {self.key}'
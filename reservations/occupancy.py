@@ -0,0 +1,225 @@
+import threading
+import time
+from collections import namedtuple
+from datetime import date, timedelta
+
+from django.conf import settings
+
+from reservations.cache import inventory_changes, inventory_version
+from reservations.models import Reservation, Room
+
+# Cambios que registran las señales con cada versión del inventario
+# (reservations.cache.bump_inventory_version) y que el índice aplica
+RESERVATION_SAVED = 'reservation'
+RESERVATION_DELETED = 'reservation_deleted'
+ROOM_SAVED = 'room'
+ROOM_DELETED = 'room_deleted'
+
+# Versiones atrasadas a partir de las cuales reconstruir sale más barato
+MAX_CHANGES = 1000
+
+# La lista más corta entre las habitaciones libres (free=True) y las ocupadas
+RoomIds = namedtuple('RoomIds', ['ids', 'free'])
+
+
+def occupancy_index_enabled():
+    return getattr(settings, 'OCCUPANCY_INDEX', False)
+
+
+def night_mask(first_night, date_in, date_out):
+    """
+    Máscara de bits de las noches [date_in, date_out): el bit i corresponde
+    a la noche first_night + i
+    """
+    offset = (date_in - first_night).days
+    nights = (date_out - date_in).days
+    return ((1 << nights) - 1) << offset
+
+
+def reservation_change(reservation):
+    return (RESERVATION_SAVED, reservation.id, reservation.room_id, reservation.status,
+            reservation.date_in, reservation.date_out)
+
+
+class OccupancyIndex:
+    """
+    Índice en memoria de las noches ocupadas de cada habitación dentro de un
+    horizonte móvil. Cada habitación es un entero usado como arreglo de bits,
+    así que saber si está libre en un rango es un único AND.
+
+    La base de datos sigue siendo la fuente de verdad. Cada escritura de Room
+    o Reservation de cualquier proceso incrementa la versión del inventario y
+    guarda en la caché lo que cambió; el índice se pone al día aplicando esos
+    cambios y solo se reconstruye si falta alguno, al cambiar el día o al
+    superar su antigüedad máxima.
+    """
+
+    def __init__(self, horizon_days=365, max_age=300):
+        self.horizon_days = horizon_days
+        self.max_age = max_age
+        self.first_night = None
+        self.built_at = None
+        # Versión del inventario que refleja
+        self.version = None
+        # IDs de todas las habitaciones
+        self.room_ids = set()
+        # room_id -> bits de noches ocupadas
+        self.rooms = {}
+        # reservation_id -> (room_id, bits) para poder liberar sus noches
+        self.reservations = {}
+        self.lock = threading.Lock()
+        # Una sola reconstrucción o puesta al día a la vez por proceso
+        self.refresh_lock = threading.Lock()
+
+    def build(self):
+        first_night = date.today()
+        last_night = first_night + timedelta(days=self.horizon_days)
+
+        # Antes de leer: los cambios confirmados durante la lectura quedan en
+        # versiones posteriores y se aplican después
+        version = inventory_version()
+        room_ids = set(Room.objects.values_list('id', flat=True))
+        rooms = {}
+        reservations = {}
+        queryset = Reservation.objects.filter(
+            status__in=Reservation.ACTIVE_STATUSES,
+            date_in__lt=last_night,
+            date_out__gt=first_night
+        ).values_list('id', 'room_id', 'date_in', 'date_out')
+
+        for reservation_id, room_id, date_in, date_out in queryset.iterator():
+            bits = night_mask(
+                first_night,
+                max(date_in, first_night),
+                min(date_out, last_night)
+            )
+            reservations[reservation_id] = (room_id, bits)
+            rooms[room_id] = rooms.get(room_id, 0) | bits
+
+        with self.lock:
+            self.first_night = first_night
+            self.room_ids = room_ids
+            self.rooms = rooms
+            self.reservations = reservations
+            self.version = version
+            self.built_at = time.monotonic()
+
+    def is_stale(self):
+        return (
+            self.built_at is None
+            or self.first_night != date.today()
+            or time.monotonic() - self.built_at > self.max_age
+        )
+
+    def is_current(self, version):
+        return not self.is_stale() and version == self.version
+
+    def refresh(self):
+        """Aplica los cambios de las versiones nuevas, o reconstruye si faltan"""
+        version = inventory_version()
+        if self.is_current(version):
+            return
+
+        with self.refresh_lock:
+            # Otro hilo pudo haberlo puesto al día mientras se esperaba
+            version = inventory_version()
+            if self.is_current(version):
+                return
+
+            changes = None
+            if not self.is_stale() and 0 < version - self.version <= MAX_CHANGES:
+                changes = inventory_changes(self.version + 1, version)
+            if changes is None:
+                self.build()
+                return
+
+            with self.lock:
+                for change in changes:
+                    for entry in change:
+                        self.apply(entry)
+                self.version = version
+
+    def covers(self, date_in, date_out):
+        last_night = self.first_night + timedelta(days=self.horizon_days)
+        return self.first_night <= date_in and date_out <= last_night
+
+    def occupied_rooms(self, date_in, date_out):
+        """
+        IDs de las habitaciones con alguna noche ocupada en [date_in, date_out).
+        Devuelve None si el rango está fuera del horizonte del índice.
+        """
+        room_ids = self.room_ids_for(date_in, date_out, shortest=False)
+        return None if room_ids is None else room_ids.ids
+
+    def room_ids_for(self, date_in, date_out, shortest=True):
+        """
+        RoomIds con las habitaciones libres en [date_in, date_out) o, si es
+        más corta (shortest), con las ocupadas: lo que filtra la consulta de
+        disponibilidad. None si el rango está fuera del horizonte del índice.
+        """
+        self.refresh()
+
+        if not self.covers(date_in, date_out):
+            return None
+
+        mask = night_mask(self.first_night, date_in, date_out)
+        with self.lock:
+            occupied = [room_id for room_id, bits in self.rooms.items() if bits & mask]
+            if not shortest or len(occupied) * 2 <= len(self.room_ids):
+                return RoomIds(occupied, free=False)
+            occupied = set(occupied)
+            return RoomIds([room_id for room_id in self.room_ids if room_id not in occupied],
+                           free=True)
+
+    def apply(self, entry):
+        kind, *values = entry
+        if kind == RESERVATION_SAVED:
+            self._update(*values)
+        elif kind == RESERVATION_DELETED:
+            self._release(*values)
+        elif kind == ROOM_SAVED:
+            self.room_ids.add(*values)
+        elif kind == ROOM_DELETED:
+            room_id, = values
+            self.room_ids.discard(room_id)
+            self.rooms.pop(room_id, None)
+
+    def _update(self, reservation_id, room_id, status, date_in, date_out):
+        self._release(reservation_id)
+
+        if status not in Reservation.ACTIVE_STATUSES:
+            return
+
+        last_night = self.first_night + timedelta(days=self.horizon_days)
+        date_in = max(date_in, self.first_night)
+        date_out = min(date_out, last_night)
+        if date_in >= date_out:
+            return
+
+        bits = night_mask(self.first_night, date_in, date_out)
+        self.reservations[reservation_id] = (room_id, bits)
+        self.rooms[room_id] = self.rooms.get(room_id, 0) | bits
+
+    def _release(self, reservation_id):
+        entry = self.reservations.pop(reservation_id, None)
+        if entry:
+            room_id, bits = entry
+            self.rooms[room_id] &= ~bits
+
+
+_index = None
+
+
+def get_occupancy_index():
+    global _index
+    if _index is None:
+        _index = OccupancyIndex(
+            horizon_days=getattr(settings, 'OCCUPANCY_INDEX_HORIZON_DAYS', 365),
+            max_age=getattr(settings, 'OCCUPANCY_INDEX_MAX_AGE', 300),
+        )
+    return _index
+
+
+def reset_occupancy_index():
+    global _index
+    _index = None
@@ -0,0 +1,12 @@
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Paginación por cursor sobre la clave primaria: cada página es un
+    WHERE id < cursor ORDER BY id DESC LIMIT n, sin OFFSET
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = '-id'
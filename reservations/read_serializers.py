@@ -0,0 +1,159 @@
+from types import SimpleNamespace
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.fields import SerializerMethodField, empty
+from rest_framework.relations import PrimaryKeyRelatedField, RelatedField
+from rest_framework.serializers import BaseSerializer
+
+
+# Marca de un campo que DRF omitiría (relación nula en un campo de solo lectura)
+SKIP = object()
+
+
+class NotCompilable(Exception):
+    """El serializer tiene campos que ValuesSerializer no sabe leer de values()"""
+
+
+def identity(value):
+    return value
+
+
+class ValuesSerializer:
+    """
+    Serializer de lectura equivalente a un ModelSerializer ya construido (con
+    los campos de ?fields= / ?omit= aplicados): cada campo se compila una vez
+    a una clave de values() o atributo del modelo y a su to_representation,
+    así las filas se convierten sin instanciar modelos ni recorrer los
+    get_attribute de DRF. El JSON resultante es el mismo.
+
+    Los SerializerMethodField necesitan declarar en el serializer las columnas
+    que leen: read_sources = {'campo': ('columna', ...)}.
+    """
+
+    def __init__(self, serializer):
+        self.model = serializer.Meta.model
+        self.lookups = [self.model._meta.pk.name]
+        self.value_readers = []
+        self.instance_readers = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            value_reader, instance_reader = self.compile(serializer, name, field)
+            self.value_readers.append((name, value_reader))
+            self.instance_readers.append((name, instance_reader))
+
+    def add_lookup(self, lookup):
+        if lookup not in self.lookups:
+            self.lookups.append(lookup)
+        return lookup
+
+    def compile(self, serializer, name, field):
+        if isinstance(field, SerializerMethodField):
+            return self.compile_method(serializer, name, field)
+        if isinstance(field, BaseSerializer) or field.source == '*':
+            raise NotCompilable(name)
+
+        to_representation = field.to_representation
+        if isinstance(field, RelatedField):
+            # Solo la clave primaria: values() ya la devuelve sin leer la relación
+            if not isinstance(field, PrimaryKeyRelatedField) or field.pk_field is not None:
+                raise NotCompilable(name)
+            to_representation = identity
+
+        attrs = field.source_attrs
+        model_field = self.model_field(self.model, attrs[0], name)
+        if len(attrs) == 1:
+            if model_field.many_to_many or model_field.one_to_many:
+                raise NotCompilable(name)
+            key = self.add_lookup(attrs[0])
+            attname = model_field.attname
+            return (
+                self.plain_reader(lambda row: row[key], to_representation),
+                self.plain_reader(lambda obj: getattr(obj, attname), to_representation),
+            )
+
+        # relacion.campo: con la relación nula DRF devuelve None u omite el campo
+        if len(attrs) != 2 or not (model_field.many_to_one or model_field.one_to_one):
+            raise NotCompilable(name)
+        self.model_field(model_field.related_model, attrs[1], name)
+        if field.default is not empty:
+            raise NotCompilable(name)
+        if field.allow_null:
+            missing = None
+        elif not field.required:
+            missing = SKIP
+        else:
+            raise NotCompilable(name)
+
+        relation_key = self.add_lookup(attrs[0])
+        key = self.add_lookup('__'.join(attrs))
+        relation, attr = attrs
+
+        def read_value(row):
+            if row[relation_key] is None:
+                return missing
+            value = row[key]
+            return None if value is None else to_representation(value)
+
+        def read_instance(obj):
+            related = getattr(obj, relation)
+            if related is None:
+                return missing
+            value = getattr(related, attr)
+            return None if value is None else to_representation(value)
+
+        return read_value, read_instance
+
+    def compile_method(self, serializer, name, field):
+        sources = getattr(serializer, 'read_sources', {}).get(name)
+        if sources is None:
+            raise NotCompilable(name)
+        method = getattr(serializer, field.method_name)
+        keys = [self.add_lookup(source) for source in sources]
+
+        def read_value(row):
+            return method(SimpleNamespace(**{key: row[key] for key in keys}))
+
+        return read_value, method
+
+    @staticmethod
+    def model_field(model, name, field_name):
+        try:
+            return model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # Propiedades y métodos del modelo: solo con el serializer de DRF
+            raise NotCompilable(field_name)
+
+    @staticmethod
+    def plain_reader(get, to_representation):
+        def read(row):
+            value = get(row)
+            return None if value is None else to_representation(value)
+        return read
+
+    def values(self, queryset):
+        """Las columnas que necesitan los campos, como diccionarios"""
+        return queryset.values(*self.lookups)
+
+    def serialize(self, readers, row):
+        data = {}
+        for name, read in readers:
+            value = read(row)
+            if value is not SKIP:
+                data[name] = value
+        return data
+
+    def from_values(self, rows):
+        readers = self.value_readers
+        return [self.serialize(readers, row) for row in rows]
+
+    def from_instance(self, instance):
+        return self.serialize(self.instance_readers, instance)
+
+
+def values_serializer(serializer):
+    """ValuesSerializer del serializer, o None si algún campo no se puede compilar"""
+    try:
+        return ValuesSerializer(serializer)
+    except NotCompilable:
+        return None
@@ -0,0 +1,61 @@
+import msgpack
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+# Tipos que orjson y msgpack no conocen (Decimal, textos traducibles,
+# querysets...): se convierten igual que con el JSONRenderer de DRF
+encode_default = JSONEncoder().default
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def render_json(data, indent=False, default=encode_default):
+    """JSON en bytes con orjson; fechas y diccionarios anidados sin pasar por Python"""
+    options = ORJSON_OPTIONS | orjson.OPT_INDENT_2 if indent else ORJSON_OPTIONS
+    return orjson.dumps(data, default=default, option=options)
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    JSONRenderer con orjson: Decimal como número (igual que DRF) y fechas en
+    ISO 8601. ?format=json o Accept: application/json; indent=N sangra la salida
+    """
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        indent = renderer_context.get('indent')
+        if indent is None and accepted_media_type:
+            indent = 'indent=' in accepted_media_type
+        return render_json(data, indent=bool(indent))
+
+
+class ORJSONParser(BaseParser):
+    media_type = 'application/json'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Accept: application/msgpack; mismos valores que la respuesta JSON"""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encode_default, use_bin_type=True, datetime=False)
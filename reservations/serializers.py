@@ -1,10 +1,49 @@
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError as DjangoValidationError
 from reservations.models import Clients, Room, Reservation
+from reservations.availability import ALTERNATIVES_LIMIT
+from reservations.booking import RoomUnavailable, book, book_group
 
+from datetime import date
 import re
 
 
+def query_param_list(request, name):
+    """Nombres separados por comas de un parámetro de la consulta"""
+    value = request.query_params.get(name, '')
+    return {item.strip() for item in value.split(',') if item.strip()}
+
+
+class SparseFieldsMixin:
+    """
+    ?fields=a,b y ?omit=c en lecturas: los campos no pedidos se quitan del
+    serializer, así que no se calculan ni se leen sus relaciones
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return
+
+        fields = query_param_list(request, 'fields')
+        omit = query_param_list(request, 'omit')
+        for name in list(self.fields):
+            if (fields and name not in fields) or name in omit:
+                self.fields.pop(name)
+
+    def related_fields(self):
+        """Relaciones que necesitan los campos restantes (source='relacion.campo')"""
+        return {
+            field.source.split('.')[0]
+            for field in self.fields.values()
+            if '.' in field.source
+        }
+
+
 class UserSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
     confirm_password = serializers.CharField(write_only=True)
@@ -76,7 +115,7 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
 
-class ClientSerializer(serializers.ModelSerializer):
+class ClientSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user_username = serializers.CharField(
         source='user.username', read_only=True)
     user_email = serializers.EmailField(source='user.email', read_only=True)
@@ -114,13 +153,27 @@ class ClientSerializer(serializers.ModelSerializer):
         return value
 
 
-class RoomSerializer(serializers.ModelSerializer):
+class RoomSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Room
-        fields = '__all__'
+        # amenity_mask y modified_at son internos: la máscara se deriva de
+        # amenities y la versión viaja en ETag / Last-Modified
+        fields = [
+            'id',
+            'number',
+            'type',
+            'price_for_night',
+            'is_reserved',
+            'status',
+            'description',
+            'capacity',
+            'amenities'
+        ]
 
 
-class ReservationSerializer(serializers.ModelSerializer):
+class ReservationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    # Solo la clave: la habitación se lee una vez, bloqueada, en book
+    room = serializers.IntegerField(source='room_id', min_value=1)
     client_name = serializers.CharField(source='client.name', read_only=True)
     client_lastname = serializers.CharField(
         source='client.lastname', read_only=True)
@@ -153,56 +206,187 @@ class ReservationSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ('created_at', 'updated_at', 'total_price')
 
+    # Columnas que lee get_total_nights (ValuesSerializer)
+    read_sources = {'total_nights': ('date_in', 'date_out')}
+
     def get_total_nights(self, obj):
         return (obj.date_out - obj.date_in).days
 
     def validate(self, data):
+        # En PATCH los campos ausentes conservan el valor de la reservación
+        current = self.instance
+        date_in = data.get('date_in', current.date_in if current else None)
+        date_out = data.get('date_out', current.date_out if current else None)
+        guests = data.get(
+            'number_of_guests', current.number_of_guests if current else 1)
+
         # Validar que la fecha de salida sea posterior a la de entrada
-        if data['date_out'] <= data['date_in']:
+        if date_in is None or date_out is None or date_out <= date_in:
             raise serializers.ValidationError(
                 "The departure date must be after the arrival date."
             )
 
         # Validar número de huéspedes
-        if data.get('number_of_guests', 1) <= 0:
+        if guests <= 0:
             raise serializers.ValidationError(
                 "The number of guests must be at least 1."
             )
 
-        # Validar capacidad de la habitación
-        room = data.get('room')
-        if room and room.capacity < data.get('number_of_guests', 1):
+        return data
+
+    def create(self, validated_data):
+        # El precio total se calculará automáticamente en el método save del modelo
+        return self.save_reservation(Reservation(**validated_data))
+
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        return self.save_reservation(instance)
+
+    def check_room(self, reservation):
+        # Con la fila bloqueada por book, no la leída al validar
+        room = reservation.room
+        if room.capacity < reservation.number_of_guests:
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                f"The room capacity is {room.capacity}, but you requested "
+                f"{reservation.number_of_guests} guests."
+            ]})
+
+        if room.status not in ['available']:
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                f"The room is not available due to its current status: {room.get_status_display()}"
+            ]})
+
+    def save_reservation(self, reservation):
+        try:
+            # Disponibilidad, capacidad y estado con la habitación bloqueada;
+            # ver reservations.booking
+            book(reservation, check_room=self.check_room)
+        except RoomUnavailable as e:
+            # Proponer las fechas libres más cercanas para no reintentar a ciegas
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: e.messages,
+                'alternatives': [
+                    {
+                        'date_in': alternative['date_in'].isoformat(),
+                        'date_out': alternative['date_out'].isoformat()
+                    }
+                    for alternative in e.alternatives
+                ]
+            })
+        except DjangoValidationError as e:
+            if hasattr(e, 'error_dict'):
+                raise serializers.ValidationError(e.message_dict)
             raise serializers.ValidationError(
-                f"The room capacity is {room.capacity}, but you requested {data.get('number_of_guests', 1)} guests."
-            )
+                {api_settings.NON_FIELD_ERRORS_KEY: e.messages})
+        return reservation
 
-        # Validar disponibilidad de la habitación
-        if room:
-            overlapping_reservations = Reservation.objects.filter(
-                room=room,
-                date_in__lt=data['date_out'],
-                date_out__gt=data['date_in'],
-                status__in=['pending', 'confirmed']
-            )
 
-            # Excluir la reservación actual si estamos actualizando
-            if self.instance:
-                overlapping_reservations = overlapping_reservations.exclude(
-                    id=self.instance.id)
+class GroupBookingItemSerializer(serializers.Serializer):
+    # La habitación se lee y bloquea junto con las demás en book_group, no por ítem
+    room = serializers.IntegerField(min_value=1)
+    date_in = serializers.DateField()
+    date_out = serializers.DateField()
+    number_of_guests = serializers.IntegerField(default=1)
 
-            if overlapping_reservations.exists():
-                raise serializers.ValidationError(
-                    "The room is not available for the selected dates."
-                )
 
-            # Verificar estado de la habitación
-            if room.status not in ['available']:
+class GroupBookingSerializer(serializers.Serializer):
+    # Reservas de agencias: varias habitaciones para un mismo cliente
+    MAX_ITEMS = 50
+
+    client = serializers.PrimaryKeyRelatedField(queryset=Clients.objects.all())
+    status = serializers.ChoiceField(
+        choices=Reservation.ACTIVE_STATUSES, default='pending')
+    items = GroupBookingItemSerializer(
+        many=True, allow_empty=False, max_length=MAX_ITEMS)
+
+    def create(self, validated_data):
+        items = validated_data['items']
+        try:
+            return book_group(
+                validated_data['client'], items, status=validated_data['status'])
+        except DjangoValidationError as e:
+            if not hasattr(e, 'error_dict'):
                 raise serializers.ValidationError(
-                    f"The room is not available due to its current status: {room.get_status_display()}"
-                )
+                    {api_settings.NON_FIELD_ERRORS_KEY: e.messages})
+            # Errores por posición, como los de un ListSerializer
+            raise serializers.ValidationError({'items': [
+                {api_settings.NON_FIELD_ERRORS_KEY: e.message_dict[position]}
+                if position in e.message_dict else {}
+                for position in range(len(items))
+            ]})
+
+
+class AvailabilityWindowSerializer(serializers.Serializer):
+    date_in = serializers.DateField()
+    date_out = serializers.DateField()
 
+    def validate(self, data):
+        if data['date_out'] <= data['date_in']:
+            raise serializers.ValidationError("date_out must be after date_in")
+        if data['date_in'] < date.today():
+            raise serializers.ValidationError("date_in cannot be in the past")
         return data
 
-    def create(self, validated_data):
-        # El precio total se calculará automáticamente en el método save del modelo
-        return super().create(validated_data)
+
+class AvailabilityBatchSerializer(serializers.Serializer):
+    # Búsqueda de fechas flexibles: varias ventanas candidatas por petición
+    MAX_WINDOWS = 60
+
+    windows = AvailabilityWindowSerializer(
+        many=True, allow_empty=False, max_length=MAX_WINDOWS)
+    guests = serializers.IntegerField(min_value=1, default=1)
+    room_type = serializers.ChoiceField(
+        choices=Room.TYPE_ROOM, required=False, allow_null=True)
+
+
+class CalendarQuerySerializer(serializers.Serializer):
+    MAX_DAYS = 366
+
+    start = serializers.DateField()
+    end = serializers.DateField()
+    encoding = serializers.ChoiceField(
+        choices=['bitstring', 'runs'], default='bitstring')
+
+    def validate(self, data):
+        if data['end'] <= data['start']:
+            raise serializers.ValidationError("end must be after start")
+        if (data['end'] - data['start']).days > self.MAX_DAYS:
+            raise serializers.ValidationError(
+                f"The calendar cannot span more than {self.MAX_DAYS} days")
+        return data
+
+
+class AlternativesQuerySerializer(AvailabilityWindowSerializer):
+    MAX_LIMIT = 10
+
+    room = serializers.PrimaryKeyRelatedField(
+        queryset=Room.objects.all(), required=False)
+    room_type = serializers.ChoiceField(
+        choices=Room.TYPE_ROOM, required=False)
+    guests = serializers.IntegerField(min_value=1, default=1)
+    limit = serializers.IntegerField(
+        min_value=1, max_value=MAX_LIMIT, default=ALTERNATIVES_LIMIT)
+
+
+class ReservationExportQuerySerializer(serializers.Serializer):
+    # Rango inclusivo sobre date_in; status admite varios valores separados por comas
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    status = serializers.CharField(required=False)
+    export_format = serializers.ChoiceField(
+        choices=['csv', 'ndjson'], default='csv')
+
+    def validate_status(self, value):
+        statuses = [item.strip() for item in value.split(',') if item.strip()]
+        valid = dict(Reservation.STATUS_RESERVATION)
+        invalid = [item for item in statuses if item not in valid]
+        if invalid:
+            raise serializers.ValidationError(
+                f"Invalid status: {', '.join(invalid)}. Valid options are: {', '.join(valid)}")
+        return statuses
+
+    def validate(self, data):
+        if 'date_from' in data and 'date_to' in data and data['date_to'] < data['date_from']:
+            raise serializers.ValidationError("date_to must not be before date_from")
+        return data
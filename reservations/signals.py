@@ -0,0 +1,30 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from reservations.models import Reservation, Room
+from reservations.occupancy import (
+    RESERVATION_DELETED, ROOM_DELETED, ROOM_SAVED, reservation_change)
+from reservations.cache import record_inventory_change
+
+
+# Cada escritura invalida las respuestas cacheadas y llega, al confirmarse,
+# a los índices de ocupación de todos los procesos (reservations.occupancy)
+
+@receiver(post_save, sender=Reservation)
+def reservation_saved(sender, instance, **kwargs):
+    record_inventory_change([reservation_change(instance)])
+
+
+@receiver(post_delete, sender=Reservation)
+def reservation_deleted(sender, instance, **kwargs):
+    record_inventory_change([(RESERVATION_DELETED, instance.id)])
+
+
+@receiver(post_save, sender=Room)
+def room_saved(sender, instance, **kwargs):
+    record_inventory_change([(ROOM_SAVED, instance.id)])
+
+
+@receiver(post_delete, sender=Room)
+def room_deleted(sender, instance, **kwargs):
+    record_inventory_change([(ROOM_DELETED, instance.id)])
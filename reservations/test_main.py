@@ -312,8 +312,8 @@ class ReservationAPITestCase(APITestCase):
 
         response = self.client.get('/reservation/my_reservations/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['id'], reservation.id)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['id'], reservation.id)
 
 
 class UserRegistrationTestCase(APITestCase):
@@ -3,12 +3,15 @@ from django.contrib.auth.models import User
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.core.management import call_command
+from django.core.cache import cache
+from reservations.tests.query_budget import QueryBudget
 
 
 @pytest.fixture(autouse=True)
 def setup_test_database(django_db_setup, django_db_blocker):
     with django_db_blocker.unblock():
         call_command('flush', '--no-input')
+    cache.clear()
 
 
 @pytest.fixture
@@ -50,3 +53,9 @@ def auth_admin_client(api_client, admin_user):
     refresh = RefreshToken.for_user(admin_user)
     api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
     return api_client
+
+
+@pytest.fixture
+def query_budget(db):
+    """Presupuesto de consultas por endpoint (ver query_budget.QueryBudget)"""
+    return QueryBudget()
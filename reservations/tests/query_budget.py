@@ -0,0 +1,46 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Filas con las que se mide cada endpoint: la cantidad de consultas no debe variar
+DEFAULT_SIZES = (10, 1000)
+
+
+class QueryBudget:
+    """
+    Cuenta las consultas de una petición a varios tamaños de datos. Falla si
+    la cantidad crece con las filas (N+1) o si supera el máximo declarado
+    """
+
+    def __init__(self, sizes=DEFAULT_SIZES):
+        self.sizes = sizes
+
+    def capture(self, send):
+        """Consultas de send(), incluidas las de una respuesta en streaming"""
+        with CaptureQueriesContext(connection) as context:
+            response = send()
+            if getattr(response, 'streaming', False):
+                b''.join(response.streaming_content)
+        assert response.status_code < 400, (
+            f'Respuesta {response.status_code}: {response.content[:500]!r}')
+        return [query['sql'] for query in context.captured_queries]
+
+    def check(self, budget, seed, prepare):
+        """
+        seed(size) deja `size` filas; prepare(size) devuelve la petición a
+        medir (lo que prepara no se cuenta). Devuelve las consultas por tamaño
+        """
+        captured = {}
+        for size in self.sizes:
+            seed(size)
+            captured[size] = self.capture(prepare(size))
+
+        counts = {size: len(queries) for size, queries in captured.items()}
+        largest = captured[self.sizes[-1]]
+        if len(set(counts.values())) > 1:
+            raise AssertionError(
+                f'Las consultas crecen con las filas {counts}:\n' + '\n'.join(largest))
+        if counts[self.sizes[-1]] > budget:
+            raise AssertionError(
+                f'{counts[self.sizes[-1]]} consultas, presupuesto {budget}:\n'
+                + '\n'.join(largest))
+        return counts
@@ -0,0 +1,134 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+from reservations.models import Room, Reservation, Clients
+from reservations.occupancy import get_occupancy_index, reset_occupancy_index
+from datetime import date, timedelta
+from decimal import Decimal
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def test_client():
+    return Clients.objects.create(
+        name='John',
+        lastname='Doe',
+        document_number='12345678',
+        street='123 Main St',
+        city='New York',
+        state='NY',
+        country='USA',
+        email='john@example.com'
+    )
+
+
+@pytest.fixture
+def test_rooms():
+    return [
+        Room.objects.create(
+            number=101 + i,
+            type='double',
+            price_for_night=Decimal(price),
+            status='available',
+            capacity=2,
+            amenities={}
+        )
+        for i, price in enumerate(['200.00', '100.00', '150.00'])
+    ]
+
+
+@pytest.fixture
+def params():
+    return {
+        'date_in': (date.today() + timedelta(days=1)).isoformat(),
+        'date_out': (date.today() + timedelta(days=3)).isoformat(),
+    }
+
+
+@pytest.fixture
+def async_url():
+    return reverse('reservations:room-availability-async')
+
+
+class TestAsyncAvailability:
+    def test_requires_authentication(self, api_client, async_url, params):
+        response = api_client.get(async_url, params)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response['WWW-Authenticate'].startswith('Bearer')
+
+    def test_rejects_invalid_token(self, api_client, async_url, params):
+        api_client.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+        response = api_client.get(async_url, params)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response.json()['code'] == 'token_not_valid'
+
+    def test_rejects_inactive_user(self, api_client, normal_user, async_url, params):
+        token = RefreshToken.for_user(normal_user).access_token
+        normal_user.is_active = False
+        normal_user.save()
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        response = api_client.get(async_url, params)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_matches_sync_view(self, auth_api_client, async_url, params, test_client, test_rooms):
+        Reservation.objects.create(
+            date_in=date.today() + timedelta(days=2),
+            date_out=date.today() + timedelta(days=4),
+            client=test_client,
+            room=test_rooms[0]
+        )
+        query = {**params, 'ordering': 'price', 'limit': 5}
+
+        sync_response = auth_api_client.get(reverse('reservations:room-availability'), query)
+        async_response = auth_api_client.get(async_url, query)
+
+        assert async_response.status_code == status.HTTP_200_OK
+        assert async_response.json() == sync_response.json()
+        assert [room['room_number'] for room in async_response.json()['available_rooms']] == [102, 103]
+        assert async_response.json()['total_available'] == 2
+
+    def test_invalid_params(self, auth_api_client, async_url):
+        response = auth_api_client.get(async_url, {'date_in': 'invalid-date', 'date_out': 'x'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json() == {'error': 'Invalid date format. Use YYYY-MM-DD'}
+
+    def test_only_get(self, auth_api_client, async_url):
+        response = auth_api_client.post(async_url, {})
+        assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+
+    def test_runs_under_asgi_handler(self, async_client, async_url, params, test_rooms,
+                                     normal_user):
+        token = RefreshToken.for_user(normal_user).access_token
+        response = async_to_sync(async_client.get)(
+            async_url, params, headers={'Authorization': f'Bearer {token}'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['total_available'] == 3
+
+    def test_occupancy_index_built_off_event_loop(self, settings, async_client, async_url,
+                                                  params, test_client, test_rooms,
+                                                  normal_user):
+        settings.OCCUPANCY_INDEX = True
+        reset_occupancy_index()
+        Reservation.objects.create(
+            date_in=date.today() + timedelta(days=2),
+            date_out=date.today() + timedelta(days=4),
+            client=test_client,
+            room=test_rooms[0]
+        )
+        token = RefreshToken.for_user(normal_user).access_token
+
+        try:
+            # El índice vacío se construye dentro de la petición
+            response = async_to_sync(async_client.get)(
+                async_url, params, headers={'Authorization': f'Bearer {token}'})
+            assert get_occupancy_index().built_at is not None
+        finally:
+            reset_occupancy_index()
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [room['room_number'] for room in response.json()['available_rooms']] == [102, 103]
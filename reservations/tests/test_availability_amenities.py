@@ -0,0 +1,140 @@
+import pytest
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+from reservations.models import Room, amenity_mask
+from reservations.availability import filter_amenities
+from datetime import date, timedelta
+from decimal import Decimal
+
+pytestmark = pytest.mark.django_db
+
+
+def amenities(**overrides):
+    values = {
+        'wifi': False,
+        'air_conditioning': False,
+        'minibar': False,
+        'jacuzzi': False,
+        'tv': False,
+        'breakfast_included': False,
+    }
+    values.update(overrides)
+    return values
+
+
+@pytest.fixture
+def test_rooms():
+    rooms = [
+        amenities(wifi=True),
+        amenities(wifi=True, jacuzzi=True),
+        amenities(wifi=True, jacuzzi=True, breakfast_included=True, balcony=True),
+        amenities(jacuzzi=True, balcony=False),
+    ]
+    return [
+        Room.objects.create(
+            number=101 + i,
+            type='double',
+            price_for_night=Decimal('150.00'),
+            status='available',
+            capacity=2,
+            amenities=room_amenities
+        )
+        for i, room_amenities in enumerate(rooms)
+    ]
+
+
+@pytest.fixture
+def params():
+    return {
+        'date_in': (date.today() + timedelta(days=1)).isoformat(),
+        'date_out': (date.today() + timedelta(days=3)).isoformat(),
+    }
+
+
+def room_numbers(response):
+    return [room['room_number'] for room in response.json()['available_rooms']]
+
+
+class TestAmenityMask:
+    def test_mask_follows_amenities(self, test_rooms):
+        assert test_rooms[0].amenity_mask == amenity_mask({'wifi': True}) == 1
+        assert test_rooms[3].amenity_mask == amenity_mask({'jacuzzi': True})
+
+    def test_mask_updated_on_save(self, test_rooms):
+        room = test_rooms[0]
+        room.amenities = amenities(tv=True)
+        room.save(update_fields=['amenities'])
+
+        room.refresh_from_db()
+        assert room.amenity_mask == amenity_mask({'tv': True})
+
+    def test_mask_is_read_only_in_api(self, auth_admin_client, test_rooms):
+        url = reverse('reservations:room-detail', args=[test_rooms[0].id])
+        response = auth_admin_client.patch(url, {'amenity_mask': 0xff}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        test_rooms[0].refresh_from_db()
+        assert test_rooms[0].amenity_mask == 1
+
+    def test_internal_columns_not_in_api(self, auth_admin_client, test_rooms):
+        list_url = reverse('reservations:room-list')
+        detail_url = reverse('reservations:room-detail', args=[test_rooms[0].id])
+        created = auth_admin_client.post(list_url, {
+            'number': 201, 'type': 'single', 'price_for_night': '80.00',
+            'capacity': 1, 'amenities': amenities(wifi=True)}, format='json')
+        assert created.status_code == status.HTTP_201_CREATED
+
+        for room in [created.json(), auth_admin_client.get(detail_url).json(),
+                     *auth_admin_client.get(list_url).json()['results']]:
+            assert 'amenity_mask' not in room
+            assert 'modified_at' not in room
+            assert room['amenities']
+
+
+class TestAmenitiesFilter:
+    def test_known_amenities_use_bitmask(self, test_rooms):
+        rooms = filter_amenities(Room.objects.all(), ['wifi', 'jacuzzi'])
+
+        assert '&' in str(rooms.query)
+        assert sorted(room.number for room in rooms) == [102, 103]
+
+    def test_unknown_amenity_uses_json(self, test_rooms):
+        rooms = filter_amenities(Room.objects.all(), ['balcony'])
+
+        if connection.vendor == 'postgresql':
+            assert '@>' in str(rooms.query)
+        assert [room.number for room in rooms] == [103]
+
+    @pytest.mark.parametrize('query,expected', [
+        ({'amenities': 'wifi'}, [101, 102, 103]),
+        ({'amenities': 'wifi,jacuzzi'}, [102, 103]),
+        ({'amenities': ['jacuzzi', 'breakfast_included']}, [103]),
+        ({'amenities': 'jacuzzi,balcony'}, [103]),
+    ])
+    def test_availability_filter(self, auth_api_client, params, test_rooms, query, expected):
+        response = auth_api_client.get(
+            reverse('reservations:room-availability'), {**params, **query})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert room_numbers(response) == expected
+
+    def test_async_availability_filter(self, auth_api_client, params, test_rooms):
+        response = auth_api_client.get(
+            reverse('reservations:room-availability-async'),
+            {**params, 'amenities': 'wifi,jacuzzi'})
+        assert room_numbers(response) == [102, 103]
+
+    @pytest.mark.parametrize('value', ['Wi-Fi', 'wifi;drop', 'a b'])
+    def test_invalid_amenity_names(self, auth_api_client, params, value):
+        response = auth_api_client.get(
+            reverse('reservations:room-availability'), {**params, 'amenities': value})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.skipif(connection.vendor != 'postgresql', reason='Índice GIN solo en PostgreSQL')
+    def test_gin_index_exists(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT indexdef FROM pg_indexes WHERE indexname = 'room_amenities_gin'")
+            indexdef = cursor.fetchone()[0]
+        assert 'gin (amenities jsonb_path_ops)' in indexdef
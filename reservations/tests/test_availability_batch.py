@@ -0,0 +1,122 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from reservations.models import Room, Reservation, Clients
+from datetime import date, timedelta
+from decimal import Decimal
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def test_client():
+    return Clients.objects.create(
+        name='John',
+        lastname='Doe',
+        document_number='12345678',
+        street='123 Main St',
+        city='New York',
+        state='NY',
+        country='USA',
+        email='john@example.com'
+    )
+
+
+@pytest.fixture
+def test_rooms():
+    return [
+        Room.objects.create(
+            number=101,
+            type='single',
+            price_for_night=Decimal('100.00'),
+            status='available',
+            capacity=1,
+            amenities={}
+        ),
+        Room.objects.create(
+            number=201,
+            type='suit',
+            price_for_night=Decimal('300.00'),
+            status='available',
+            capacity=4,
+            amenities={}
+        ),
+    ]
+
+
+def days(n):
+    return (date.today() + timedelta(days=n)).isoformat()
+
+
+@pytest.fixture
+def url():
+    return reverse('reservations:room-availability-batch')
+
+
+class TestAvailabilityBatch:
+    def test_requires_authentication(self, api_client, url):
+        response = api_client.post(url, {'windows': []}, format='json')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_windows_are_computed_independently(self, api_client, normal_user, url,
+                                                 test_client, test_rooms):
+        Reservation.objects.create(
+            date_in=date.today() + timedelta(days=3),
+            date_out=date.today() + timedelta(days=5),
+            client=test_client,
+            room=test_rooms[0]
+        )
+        api_client.force_authenticate(user=normal_user)
+
+        response = api_client.post(url, {
+            'windows': [
+                {'date_in': days(1), 'date_out': days(3)},
+                {'date_in': days(2), 'date_out': days(4)},
+                {'date_in': days(5), 'date_out': days(8)},
+            ]
+        }, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        windows = response.json()['windows']
+        assert [window['total_available'] for window in windows] == [2, 1, 2]
+        assert windows[1]['available_rooms'][0]['room_id'] == test_rooms[1].id
+        assert windows[2]['available_rooms'][0]['nights'] == 3
+        assert Decimal(str(windows[2]['available_rooms'][0]['total_price'])) == Decimal('300.00')
+
+    def test_guest_and_type_filters(self, api_client, normal_user, url, test_rooms):
+        api_client.force_authenticate(user=normal_user)
+
+        response = api_client.post(url, {
+            'windows': [{'date_in': days(1), 'date_out': days(3)}],
+            'guests': 2,
+            'room_type': 'suit'
+        }, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        rooms = response.json()['windows'][0]['available_rooms']
+        assert [room['room_id'] for room in rooms] == [test_rooms[1].id]
+
+    def test_query_count_does_not_grow_with_windows(self, api_client, normal_user, url,
+                                                    test_rooms, django_assert_num_queries):
+        api_client.force_authenticate(user=normal_user)
+        windows = [{'date_in': days(i), 'date_out': days(i + 2)} for i in range(1, 31)]
+
+        with django_assert_num_queries(2):
+            response = api_client.post(url, {'windows': windows}, format='json')
+        assert len(response.json()['windows']) == 30
+
+    @pytest.mark.parametrize('window', [
+        {'date_in': days(3), 'date_out': days(1)},
+        {'date_in': days(-2), 'date_out': days(1)},
+        {'date_in': 'invalid-date', 'date_out': days(1)},
+    ])
+    def test_invalid_windows(self, api_client, normal_user, url, window):
+        api_client.force_authenticate(user=normal_user)
+        response = api_client.post(url, {'windows': [window]}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'windows' in response.json()
+
+    def test_empty_windows(self, api_client, normal_user, url):
+        api_client.force_authenticate(user=normal_user)
+        response = api_client.post(url, {'windows': []}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
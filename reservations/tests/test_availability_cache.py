@@ -0,0 +1,179 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from reservations.models import Room, Reservation, Clients
+from reservations import async_views, views
+from reservations.cache import availability_cache_key, cache_availability, inventory_version
+from datetime import date, timedelta
+from decimal import Decimal
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def availability_cache(settings):
+    settings.AVAILABILITY_CACHE_TTL = 60
+
+
+@pytest.fixture
+def test_client():
+    return Clients.objects.create(
+        name='John',
+        lastname='Doe',
+        document_number='12345678',
+        street='123 Main St',
+        city='New York',
+        state='NY',
+        country='USA',
+        email='john@example.com'
+    )
+
+
+@pytest.fixture
+def test_room():
+    return Room.objects.create(
+        number=101,
+        type='double',
+        price_for_night=Decimal('150.00'),
+        status='available',
+        capacity=2,
+        amenities={}
+    )
+
+
+@pytest.fixture
+def availability_params():
+    return {
+        'date_in': (date.today() + timedelta(days=1)).isoformat(),
+        'date_out': (date.today() + timedelta(days=3)).isoformat(),
+        'guests': 1,
+    }
+
+
+class TestAvailabilityCache:
+    def test_identical_query_is_served_from_cache(self, availability_cache, api_client, admin_user,
+                                                  test_room, availability_params,
+                                                  django_assert_num_queries):
+        api_client.force_authenticate(user=admin_user)
+        url = reverse('reservations:room-availability')
+
+        first = api_client.get(url, availability_params)
+        with django_assert_num_queries(0):
+            second = api_client.get(url, availability_params)
+
+        assert second.status_code == status.HTTP_200_OK
+        assert second.json() == first.json()
+
+    def test_reservation_write_invalidates(self, availability_cache, api_client, admin_user,
+                                           test_client, test_room, availability_params):
+        api_client.force_authenticate(user=admin_user)
+        url = reverse('reservations:room-availability')
+
+        response = api_client.get(url, availability_params)
+        assert response.json()['total_available'] == 1
+
+        Reservation.objects.create(
+            date_in=date.today() + timedelta(days=1),
+            date_out=date.today() + timedelta(days=3),
+            client=test_client,
+            room=test_room
+        )
+
+        response = api_client.get(url, availability_params)
+        assert response.json()['total_available'] == 0
+
+    @pytest.mark.parametrize('view_module, url_name', [
+        (views, 'reservations:room-availability'),
+        (async_views, 'reservations:room-availability-async'),
+    ])
+    def test_write_during_query_is_not_cached(self, availability_cache, auth_admin_client,
+                                              test_client, test_room, availability_params,
+                                              monkeypatch, view_module, url_name):
+        url = reverse(url_name)
+
+        # Una reservación confirmada entre la consulta de habitaciones y el cache.set
+        def write_then_cache(*args):
+            Reservation.objects.create(
+                date_in=date.today() + timedelta(days=1),
+                date_out=date.today() + timedelta(days=3),
+                client=test_client,
+                room=test_room
+            )
+            cache_availability(*args)
+        monkeypatch.setattr(view_module, 'cache_availability', write_then_cache)
+        response = auth_admin_client.get(url, availability_params)
+        assert response.json()['total_available'] == 1
+        monkeypatch.undo()
+
+        response = auth_admin_client.get(url, availability_params)
+        assert response.json()['total_available'] == 0
+
+    def test_room_write_invalidates(self, availability_cache, api_client, admin_user,
+                                    test_room, availability_params):
+        api_client.force_authenticate(user=admin_user)
+        url = reverse('reservations:room-availability')
+
+        api_client.get(url, availability_params)
+        test_room.status = 'maintenance'
+        test_room.save()
+
+        response = api_client.get(url, availability_params)
+        assert response.json()['total_available'] == 0
+
+    def test_key_is_normalized_and_versioned(self):
+        params = {'date_in': date(2030, 1, 1), 'date_out': date(2030, 1, 3),
+                  'guests': 2, 'room_type': None}
+        reordered = dict(reversed(list(params.items())))
+
+        assert availability_cache_key(params) == availability_cache_key(reordered)
+        assert f'availability:{inventory_version()}:' in availability_cache_key(params)
+
+    def test_key_is_valid_for_memcached(self):
+        params = {'date_in': date(2030, 1, 1), 'date_out': date(2030, 1, 3),
+                  'amenities': ['wifi'] * 200, 'room_type': None}
+
+        key = availability_cache_key(params)
+
+        assert len(key) < 250
+        assert not any(character.isspace() for character in key)
+        assert key != availability_cache_key({**params, 'amenities': ['wifi']})
+
+    @pytest.mark.parametrize('url_name', [
+        'reservations:room-availability', 'reservations:room-availability-async'])
+    def test_unknown_room_type_is_rejected(self, availability_cache, auth_admin_client,
+                                           availability_params, url_name):
+        response = auth_admin_client.get(reverse(url_name),
+                                         {**availability_params, 'room_type': 'two words'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'room_type' in response.json()['error']
+
+    def test_stats_count_hits_and_misses(self, availability_cache, api_client, admin_user,
+                                         test_room, availability_params):
+        api_client.force_authenticate(user=admin_user)
+        url = reverse('reservations:room-availability')
+
+        api_client.get(url, availability_params)
+        api_client.get(url, availability_params)
+        api_client.get(url, availability_params)
+
+        response = api_client.get(reverse('reservations:room-availability-cache'))
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data['hits'] == 2
+        assert data['misses'] == 1
+
+    def test_stats_require_admin(self, api_client, normal_user):
+        api_client.force_authenticate(user=normal_user)
+        response = api_client.get(reverse('reservations:room-availability-cache'))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_disabled_without_ttl(self, api_client, admin_user, test_client, test_room,
+                                  availability_params, django_assert_num_queries):
+        api_client.force_authenticate(user=admin_user)
+        url = reverse('reservations:room-availability')
+
+        api_client.get(url, availability_params)
+        # La consulta se recalcula en cada petición
+        with django_assert_num_queries(1):
+            api_client.get(url, availability_params)
@@ -0,0 +1,144 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from reservations.models import Room, Reservation, Clients
+from datetime import date, timedelta
+from decimal import Decimal
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def test_client():
+    return Clients.objects.create(
+        name='John',
+        lastname='Doe',
+        document_number='12345678',
+        street='123 Main St',
+        city='New York',
+        state='NY',
+        country='USA',
+        email='john@example.com'
+    )
+
+
+@pytest.fixture
+def test_rooms():
+    prices = ['300.00', '100.00', '200.00', '150.00']
+    return [
+        Room.objects.create(
+            number=101 + i,
+            type='double',
+            price_for_night=Decimal(price),
+            status='available',
+            capacity=2,
+            amenities={}
+        )
+        for i, price in enumerate(prices)
+    ]
+
+
+@pytest.fixture
+def params():
+    return {
+        'date_in': (date.today() + timedelta(days=1)).isoformat(),
+        'date_out': (date.today() + timedelta(days=3)).isoformat(),
+    }
+
+
+@pytest.fixture
+def url():
+    return reverse('reservations:room-availability')
+
+
+def room_numbers(response):
+    return [room['room_number'] for room in response.json()['available_rooms']]
+
+
+class TestAvailabilityPagination:
+    def test_default_order_is_room_number(self, api_client, normal_user, url, params, test_rooms):
+        api_client.force_authenticate(user=normal_user)
+        response = api_client.get(url, params)
+
+        assert room_numbers(response) == [101, 102, 103, 104]
+        assert response.json()['total_available'] == 4
+        assert 'limit' not in response.json()
+
+    @pytest.mark.parametrize('ordering,expected', [
+        ('price', [102, 104, 103, 101]),
+        ('-price', [101, 103, 104, 102]),
+    ])
+    def test_ordering_by_price(self, api_client, normal_user, url, params, test_rooms,
+                               ordering, expected):
+        api_client.force_authenticate(user=normal_user)
+        response = api_client.get(url, {**params, 'ordering': ordering})
+        assert room_numbers(response) == expected
+
+    def test_limit_and_offset(self, api_client, normal_user, url, params, test_client, test_rooms):
+        Reservation.objects.create(
+            date_in=date.today() + timedelta(days=2),
+            date_out=date.today() + timedelta(days=4),
+            client=test_client,
+            room=test_rooms[1]
+        )
+        api_client.force_authenticate(user=normal_user)
+        response = api_client.get(url, {**params, 'ordering': 'price', 'limit': 2, 'offset': 1})
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert room_numbers(response) == [103, 101]
+        # El total cuenta todas las habitaciones libres, no solo la página
+        assert data['total_available'] == 3
+        assert (data['limit'], data['offset']) == (2, 1)
+
+    @pytest.mark.parametrize('extra', [
+        {'ordering': 'capacity'},
+        {'limit': 0},
+        {'limit': 'ten'},
+        {'offset': -1},
+    ])
+    def test_invalid_pagination(self, api_client, normal_user, url, params, extra):
+        api_client.force_authenticate(user=normal_user)
+        response = api_client.get(url, {**params, **extra})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'error' in response.json()
+
+
+class TestAvailabilityPricing:
+    def test_total_price_comes_from_query(self, api_client, normal_user, url, params, test_rooms):
+        api_client.force_authenticate(user=normal_user)
+        response = api_client.get(url, {**params, 'ordering': '-total_price'})
+
+        rooms = response.json()['available_rooms']
+        assert [room['room_number'] for room in rooms] == [101, 103, 104, 102]
+        assert [Decimal(str(room['total_price'])) for room in rooms] == [
+            Decimal('600.00'), Decimal('400.00'), Decimal('300.00'), Decimal('200.00')
+        ]
+        assert all(room['nights'] == 2 for room in rooms)
+
+    def test_max_price_applies_to_total(self, api_client, normal_user, url, params, test_rooms):
+        api_client.force_authenticate(user=normal_user)
+        response = api_client.get(url, {**params, 'max_price': '400', 'ordering': 'total_price'})
+
+        assert room_numbers(response) == [102, 104, 103]
+        assert response.json()['total_available'] == 3
+
+    def test_max_price_rounds_down_per_night(self, api_client, normal_user, url, test_rooms):
+        # 3 noches con tope 450.02: 150.00 entra (450.00) y 150.01 no (450.03)
+        Room.objects.create(number=105, type='double', price_for_night=Decimal('150.01'),
+                            status='available', capacity=2, amenities={})
+        api_client.force_authenticate(user=normal_user)
+        response = api_client.get(url, {
+            'date_in': (date.today() + timedelta(days=1)).isoformat(),
+            'date_out': (date.today() + timedelta(days=4)).isoformat(),
+            'max_price': '450.02',
+            'ordering': 'total_price'
+        })
+
+        assert room_numbers(response) == [102, 104]
+
+    @pytest.mark.parametrize('max_price', ['cheap', '-1', 'NaN'])
+    def test_invalid_max_price(self, api_client, normal_user, url, params, max_price):
+        api_client.force_authenticate(user=normal_user)
+        response = api_client.get(url, {**params, 'max_price': max_price})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
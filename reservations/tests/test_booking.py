@@ -0,0 +1,235 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.db import OperationalError, connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from reservations import booking
+from reservations.booking import book, run_with_retry
+from reservations.models import Room, Reservation, RoomNight, Clients
+from reservations.serializers import ReservationSerializer
+from datetime import date, timedelta
+from decimal import Decimal
+
+requires_postgresql = pytest.mark.skipif(
+    connection.vendor != 'postgresql',
+    reason='SELECT ... FOR UPDATE y las escrituras concurrentes necesitan PostgreSQL'
+)
+
+# Intentos simultáneos sobre la misma habitación y conexiones abiertas a la vez
+CONCURRENT_BOOKINGS = 200
+BOOKING_THREADS = 25
+
+
+@pytest.fixture
+def test_client():
+    return Clients.objects.create(
+        name='John',
+        lastname='Doe',
+        document_number='12345678',
+        street='123 Main St',
+        city='New York',
+        state='NY',
+        country='USA',
+        email='john@example.com'
+    )
+
+
+@pytest.fixture
+def test_room():
+    return Room.objects.create(
+        number=101,
+        type='double',
+        price_for_night=Decimal('150.00'),
+        status='available',
+        capacity=2,
+        amenities={}
+    )
+
+
+@pytest.fixture
+def new_reservation(test_client, test_room):
+    return Reservation(
+        date_in=date.today() + timedelta(days=1),
+        date_out=date.today() + timedelta(days=3),
+        client=test_client,
+        room=test_room
+    )
+
+
+class PostgresError(Exception):
+    def __init__(self, pgcode):
+        super().__init__(pgcode)
+        self.pgcode = pgcode
+
+
+def database_error(pgcode):
+    error = OperationalError(pgcode)
+    error.__cause__ = PostgresError(pgcode)
+    return error
+
+
+@pytest.mark.django_db
+class TestBook:
+    def test_reads_current_room_state(self, new_reservation, test_room):
+        # Otro proceso pone la habitación en mantenimiento tras la validación
+        Room.objects.filter(pk=test_room.pk).update(status='maintenance')
+
+        with pytest.raises(ValidationError, match='current status'):
+            book(new_reservation)
+        assert not Reservation.objects.exists()
+
+    def test_price_from_locked_room(self, new_reservation, test_room):
+        Room.objects.filter(pk=test_room.pk).update(price_for_night=Decimal('90.00'))
+
+        book(new_reservation)
+
+        assert new_reservation.total_price == Decimal('180.00')
+        assert RoomNight.objects.filter(reservation=new_reservation).count() == 2
+
+    @requires_postgresql
+    def test_locks_only_the_room_row(self, new_reservation, test_room):
+        with CaptureQueriesContext(connection) as context:
+            book(new_reservation)
+
+        locks = [query['sql'] for query in context.captured_queries if 'FOR UPDATE' in query['sql']]
+        assert len(locks) == 1
+        assert 'FROM "reservations_room"' in locks[0]
+        assert f'"reservations_room"."id" = {test_room.pk}' in locks[0]
+
+    def test_no_retry_inside_outer_transaction(self):
+        calls = []
+
+        def operation():
+            calls.append(1)
+            raise database_error('40P01')
+
+        with pytest.raises(OperationalError):
+            run_with_retry(operation, delay=0)
+        assert len(calls) == 1
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAvailabilityUnderLock:
+    def record_queries(self, operation):
+        """(sql, transacción externa en curso) de cada consulta"""
+        queries = []
+
+        def record(execute, sql, params, many, context):
+            atomic = connection.atomic_blocks[0] if connection.atomic_blocks else None
+            queries.append((sql, atomic))
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record):
+            operation()
+        return queries
+
+    def test_overlap_checked_after_room_lock(self, test_client, test_room):
+        serializer = ReservationSerializer(data={
+            'date_in': date.today() + timedelta(days=1),
+            'date_out': date.today() + timedelta(days=3),
+            'client': test_client.id,
+            'room': test_room.id,
+        })
+
+        queries = self.record_queries(lambda: serializer.is_valid() and serializer.save())
+
+        nights = [i for i, (sql, _) in enumerate(queries)
+                  if 'FROM "reservations_roomnight"' in sql and sql.startswith('SELECT')]
+        assert len(nights) == 1
+        rooms = [i for i, (sql, _) in enumerate(queries) if 'FROM "reservations_room"' in sql]
+        # La única lectura de la habitación es la que la bloquea, antes de la
+        # consulta de noches ocupadas y en la misma transacción
+        assert len(rooms) == 1 and rooms[0] < nights[0]
+        lock, availability = queries[rooms[0]], queries[nights[0]]
+        if connection.features.has_select_for_update:
+            assert 'FOR UPDATE' in lock[0]
+        assert lock[1] is not None and lock[1] is availability[1]
+        assert serializer.instance.pk is not None
+
+
+@pytest.mark.django_db(transaction=True)
+class TestRetry:
+    def test_retries_deadlock_and_serialization_failure(self):
+        errors = [database_error('40P01'), database_error('40001')]
+
+        def operation():
+            if errors:
+                raise errors.pop(0)
+            return 'ok'
+
+        assert run_with_retry(operation, delay=0) == 'ok'
+
+    def test_other_errors_are_not_retried(self):
+        calls = []
+
+        def operation():
+            calls.append(1)
+            raise database_error('53300')
+
+        with pytest.raises(OperationalError):
+            run_with_retry(operation, delay=0)
+        assert len(calls) == 1
+
+    def test_gives_up_after_attempts(self):
+        calls = []
+
+        def operation():
+            calls.append(1)
+            raise database_error('40P01')
+
+        with pytest.raises(OperationalError):
+            run_with_retry(operation, attempts=3, delay=0)
+        assert len(calls) == 3
+
+    def test_retry_after_rolled_back_insert(self, new_reservation, monkeypatch):
+        # El primer intento inserta y luego aborta: el segundo vuelve a insertar
+        original_sync = Reservation.sync_nights
+        failures = [database_error('40P01')]
+
+        def sync_nights(self, clear=True):
+            original_sync(self, clear=clear)
+            if failures:
+                raise failures.pop()
+        monkeypatch.setattr(Reservation, 'sync_nights', sync_nights)
+        monkeypatch.setattr(booking, 'BOOKING_RETRY_DELAY', 0)
+
+        book(new_reservation)
+
+        assert Reservation.objects.get().pk == new_reservation.pk
+        assert RoomNight.objects.count() == 2
+
+
+@requires_postgresql
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_creates_for_same_room(admin_user, test_client, test_room):
+    url = reverse('reservations:reservation-list')
+    data = {
+        'room': test_room.id,
+        'client': test_client.id,
+        'date_in': (date.today() + timedelta(days=5)).isoformat(),
+        'date_out': (date.today() + timedelta(days=8)).isoformat(),
+    }
+    start = threading.Barrier(BOOKING_THREADS)
+
+    def attempt(index):
+        if index < BOOKING_THREADS:
+            start.wait()
+        api_client = APIClient()
+        api_client.force_authenticate(user=admin_user)
+        try:
+            return api_client.post(url, data, format='json').status_code
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=BOOKING_THREADS) as executor:
+        statuses = list(executor.map(attempt, range(CONCURRENT_BOOKINGS)))
+
+    assert statuses.count(status.HTTP_201_CREATED) == 1
+    assert statuses.count(status.HTTP_400_BAD_REQUEST) == CONCURRENT_BOOKINGS - 1
+    assert Reservation.objects.count() == 1
+    assert RoomNight.objects.count() == 3
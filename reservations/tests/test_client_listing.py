@@ -0,0 +1,92 @@
+import csv
+import io
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from reservations.models import Clients
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def make_clients(db):
+    def make(count):
+        start = Clients.objects.count()
+        for i in range(start, start + count):
+            Clients.objects.create(
+                user=User.objects.create(username=f'user{i}'),
+                name=f'Name{i}',
+                lastname='Doe',
+                document_number=str(10000000 + i),
+                street='123 Main St',
+                city='New York',
+                state='NY',
+                country='USA',
+                email=f'client{i}@example.com'
+            )
+    return make
+
+
+@pytest.fixture
+def url():
+    return reverse('reservations:client-list')
+
+
+class TestClientListing:
+    def test_listing_is_paginated(self, api_client, admin_user, make_clients, url):
+        make_clients(5)
+        api_client.force_authenticate(user=admin_user)
+
+        response = api_client.get(url, {'page_size': 2})
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        # Los más recientes primero
+        assert [client['name'] for client in data['results']] == ['Name4', 'Name3']
+        assert data['results'][0]['user_username'] == 'user4'
+
+        names = [client['name'] for client in data['results']]
+        while data['next']:
+            data = api_client.get(data['next']).json()
+            names.extend(client['name'] for client in data['results'])
+        assert names == [f'Name{i}' for i in reversed(range(5))]
+
+    def test_listing_query_count_is_flat(self, api_client, admin_user, make_clients, url):
+        api_client.force_authenticate(user=admin_user)
+
+        make_clients(2)
+        with CaptureQueriesContext(connection) as few:
+            api_client.get(url)
+        make_clients(20)
+        with CaptureQueriesContext(connection) as many:
+            response = api_client.get(url)
+
+        assert len(response.json()['results']) == 22
+        assert len(many.captured_queries) == len(few.captured_queries)
+
+
+class TestClientExport:
+    def test_export_requires_admin(self, api_client, normal_user):
+        api_client.force_authenticate(user=normal_user)
+        response = api_client.get(reverse('reservations:client-export'))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_export_streams_csv(self, api_client, admin_user, make_clients):
+        make_clients(3)
+        Clients.objects.create(name='Walk-in', lastname='Guest', document_number='1',
+                               street='-', city='-', state='-', country='-')
+        api_client.force_authenticate(user=admin_user)
+
+        response = api_client.get(reverse('reservations:client-export'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response['Content-Type'] == 'text/csv'
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        assert rows[0][:4] == ['id', 'name', 'lastname', 'document_number']
+        assert 'user_username' in rows[0]
+        assert [row[1] for row in rows[1:]] == ['Name0', 'Name1', 'Name2', 'Walk-in']
+        # Cliente sin usuario: columnas de usuario vacías
+        assert rows[-1][rows[0].index('user_username')] == ''
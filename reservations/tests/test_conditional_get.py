@@ -0,0 +1,198 @@
+import time
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework import status
+from reservations.models import Room, Reservation, Clients
+from reservations.read_serializers import ValuesSerializer
+from datetime import date, timedelta
+from decimal import Decimal
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def test_client(normal_user):
+    return Clients.objects.create(
+        user=normal_user,
+        name='John',
+        lastname='Doe',
+        document_number='12345678',
+        street='123 Main St',
+        city='New York',
+        state='NY',
+        country='USA',
+        email='john@example.com'
+    )
+
+
+@pytest.fixture
+def test_rooms():
+    return [
+        Room.objects.create(
+            number=101 + i,
+            type='double',
+            price_for_night=Decimal('150.00'),
+            status='available',
+            capacity=2,
+            amenities={}
+        )
+        for i in range(3)
+    ]
+
+
+@pytest.fixture
+def test_reservation(test_client, test_rooms):
+    return Reservation.objects.create(
+        date_in=date.today() + timedelta(days=1),
+        date_out=date.today() + timedelta(days=3),
+        client=test_client,
+        room=test_rooms[0]
+    )
+
+
+@pytest.fixture
+def room_list_url():
+    return reverse('reservations:room-list')
+
+
+def fail_serialization(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError('una respuesta 304 no serializa el cuerpo')
+    monkeypatch.setattr(ValuesSerializer, 'from_values', fail)
+    monkeypatch.setattr(ValuesSerializer, 'from_instance', fail)
+
+
+class TestRoomConditionalGet:
+    def test_validators_and_not_modified(self, auth_api_client, room_list_url, test_rooms,
+                                         monkeypatch):
+        response = auth_api_client.get(room_list_url)
+        assert response.status_code == status.HTTP_200_OK
+        etag = response['ETag']
+        assert etag.startswith('W/"')
+        # Una baja no cambia la última modificación: el listado solo tiene ETag
+        assert 'Last-Modified' not in response
+        assert 'Authorization' in response['Vary']
+
+        fail_serialization(monkeypatch)
+        response = auth_api_client.get(room_list_url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b''
+        assert response['ETag'] == etag
+
+    def test_if_modified_since(self, auth_api_client, test_rooms):
+        url = reverse('reservations:room-detail', args=[test_rooms[0].id])
+        last_modified = auth_api_client.get(url)['Last-Modified']
+
+        response = auth_api_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_list_ignores_if_modified_since_after_delete(self, auth_api_client, room_list_url,
+                                                         test_rooms):
+        since = http_date(time.time() + 60)
+
+        test_rooms[0].delete()
+        response = auth_api_client.get(room_list_url, HTTP_IF_MODIFIED_SINCE=since)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()['results']) == 2
+
+    def test_update_and_delete_change_etag(self, auth_api_client, room_list_url, test_rooms):
+        etag = auth_api_client.get(room_list_url)['ETag']
+
+        test_rooms[1].capacity = 3
+        test_rooms[1].save()
+        response = auth_api_client.get(room_list_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != etag
+        etag = response['ETag']
+
+        # Borrar una fila que no es la última modificada: cambia la cantidad
+        test_rooms[0].delete()
+        response = auth_api_client.get(room_list_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()['results']) == 2
+
+    def test_update_fields_change_etag(self, auth_api_client, test_rooms):
+        url = reverse('reservations:room-detail', args=[test_rooms[0].id])
+        etag = auth_api_client.get(url)['ETag']
+
+        test_rooms[0].capacity = 3
+        test_rooms[0].save(update_fields=['capacity'])
+        response = auth_api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['capacity'] == 3
+
+    def test_etag_depends_on_query_and_format(self, auth_api_client, room_list_url, test_rooms):
+        etag = auth_api_client.get(room_list_url)['ETag']
+
+        assert auth_api_client.get(room_list_url, {'fields': 'id'})['ETag'] != etag
+        assert auth_api_client.get(
+            room_list_url, HTTP_ACCEPT='application/msgpack')['ETag'] != etag
+
+    def test_detail(self, auth_api_client, test_rooms):
+        url = reverse('reservations:room-detail', args=[test_rooms[0].id])
+        etag = auth_api_client.get(url)['ETag']
+
+        response = auth_api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+class TestReservationConditionalGet:
+    def test_related_change_changes_etag(self, auth_api_client, test_reservation, test_client):
+        url = reverse('reservations:reservation-detail', args=[test_reservation.id])
+        etag = auth_api_client.get(url)['ETag']
+        sparse_etag = auth_api_client.get(url, {'fields': 'id,status'})['ETag']
+
+        test_client.name = 'Johnny'
+        test_client.save()
+
+        response = auth_api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['client_name'] == 'Johnny'
+        # Sin campos del cliente, el cambio no invalida la versión
+        response = auth_api_client.get(
+            url, {'fields': 'id,status'}, HTTP_IF_NONE_MATCH=sparse_etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_list_not_modified(self, auth_api_client, test_reservation):
+        url = reverse('reservations:reservation-my-reservations')
+        etag = auth_api_client.get(url)['ETag']
+
+        response = auth_api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_permission_checked_before_validators(self, api_client, create_user, normal_user,
+                                                  test_reservation):
+        url = reverse('reservations:reservation-detail', args=[test_reservation.id])
+        api_client.force_authenticate(user=normal_user)
+        etag = api_client.get(url)['ETag']
+
+        api_client.force_authenticate(user=create_user(username='other'))
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.parametrize('relation, field, value', [
+    ('client', 'name', 'Jane'),
+    ('room', 'capacity', 3),
+    (None, 'number_of_guests', 2),
+])
+def test_update_fields_write_modified_at(test_reservation, relation, field, value):
+    instance = getattr(test_reservation, relation) if relation else test_reservation
+    model = type(instance)
+    model.objects.filter(pk=instance.pk).update(modified_at=timezone.now() - timedelta(days=1))
+    before = model.objects.get(pk=instance.pk).modified_at
+
+    setattr(instance, field, value)
+    instance.save(update_fields=[field])
+
+    assert model.objects.get(pk=instance.pk).modified_at > before
@@ -0,0 +1,119 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from reservations.models import Room, Reservation, Clients
+from datetime import date, timedelta
+from decimal import Decimal
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def own_client(normal_user):
+    return Clients.objects.create(
+        user=normal_user,
+        name='John',
+        lastname='Doe',
+        document_number='12345678',
+        street='123 Main St',
+        city='New York',
+        state='NY',
+        country='USA',
+        email='john@example.com'
+    )
+
+
+@pytest.fixture
+def other_client():
+    return Clients.objects.create(
+        name='Jane',
+        lastname='Roe',
+        document_number='87654321',
+        street='456 Side St',
+        city='Boston',
+        state='MA',
+        country='USA',
+        email='jane@example.com'
+    )
+
+
+@pytest.fixture
+def rooms():
+    return [
+        Room.objects.create(
+            number=100 + i,
+            type='double',
+            price_for_night=Decimal('150.00'),
+            status='available',
+            capacity=2,
+            amenities={}
+        )
+        for i in range(7)
+    ]
+
+
+@pytest.fixture
+def reservations(rooms, own_client, other_client):
+    # Habitaciones alternas entre el cliente propio y otro cliente
+    return [
+        Reservation.objects.create(
+            date_in=date.today() + timedelta(days=1),
+            date_out=date.today() + timedelta(days=3),
+            client=own_client if i % 2 == 0 else other_client,
+            room=room
+        )
+        for i, room in enumerate(rooms)
+    ]
+
+
+def collect_ids(api_client, url, page_size=2):
+    """Recorre todas las páginas siguiendo `next`"""
+    data = api_client.get(url, {'page_size': page_size}).json()
+    ids = [item['id'] for item in data['results']]
+    while data['next']:
+        data = api_client.get(data['next']).json()
+        ids.extend(item['id'] for item in data['results'])
+    return ids
+
+
+class TestCursorPagination:
+    def test_rooms(self, api_client, normal_user, rooms):
+        api_client.force_authenticate(user=normal_user)
+        ids = collect_ids(api_client, reverse('reservations:room-list'))
+        assert ids == sorted((room.id for room in rooms), reverse=True)
+
+    def test_reservations_for_staff(self, api_client, admin_user, reservations):
+        api_client.force_authenticate(user=admin_user)
+        ids = collect_ids(api_client, reverse('reservations:reservation-list'))
+        assert ids == sorted((r.id for r in reservations), reverse=True)
+
+    @pytest.mark.parametrize('url_name', [
+        'reservations:reservation-list',
+        'reservations:reservation-my_reservations',
+    ])
+    def test_reservations_keep_user_filter(self, api_client, normal_user, own_client,
+                                           reservations, url_name):
+        api_client.force_authenticate(user=normal_user)
+        ids = collect_ids(api_client, reverse(url_name))
+        assert ids == sorted(
+            (r.id for r in reservations if r.client_id == own_client.id), reverse=True)
+
+    def test_page_uses_keyset_not_offset(self, api_client, admin_user, reservations):
+        api_client.force_authenticate(user=admin_user)
+        url = reverse('reservations:reservation-list')
+        first = api_client.get(url, {'page_size': 2}).json()
+
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(first['next'])
+
+        assert response.status_code == status.HTTP_200_OK
+        page_sql = context.captured_queries[-1]['sql']
+        assert 'OFFSET' not in page_sql.upper()
+        assert f'< {first["results"][-1]["id"]}' in page_sql
+
+    def test_invalid_cursor(self, api_client, admin_user):
+        api_client.force_authenticate(user=admin_user)
+        response = api_client.get(reverse('reservations:room-list'), {'cursor': 'bogus'})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,204 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from reservations.cache import inventory_version
+from reservations.models import Room, Reservation, RoomNight, Clients
+from reservations.occupancy import get_occupancy_index, reset_occupancy_index
+from reservations.serializers import GroupBookingSerializer
+from datetime import date, timedelta
+from decimal import Decimal
+
+pytestmark = pytest.mark.django_db
+
+
+def days(offset):
+    return date.today() + timedelta(days=offset)
+
+
+@pytest.fixture
+def test_client():
+    return Clients.objects.create(
+        name='Tour',
+        lastname='Operator',
+        document_number='12345678',
+        street='123 Main St',
+        city='New York',
+        state='NY',
+        country='USA',
+        email='tours@example.com'
+    )
+
+
+@pytest.fixture
+def test_rooms():
+    return [
+        Room.objects.create(
+            number=101 + i,
+            type='double',
+            price_for_night=Decimal('100.00') + i,
+            status='available',
+            capacity=2,
+            amenities={}
+        )
+        for i in range(25)
+    ]
+
+
+@pytest.fixture
+def group_url():
+    return reverse('reservations:reservation-group')
+
+
+def item(room, date_in=1, date_out=3, guests=2):
+    return {'room': room.id, 'date_in': days(date_in).isoformat(),
+            'date_out': days(date_out).isoformat(), 'number_of_guests': guests}
+
+
+def group(client, items, **data):
+    return {'client': client.id, 'items': items, **data}
+
+
+class TestGroupBooking:
+    def test_books_all_rooms(self, auth_admin_client, group_url, test_client, test_rooms):
+        items = [item(room) for room in test_rooms[:3]]
+
+        response = auth_admin_client.post(
+            group_url, group(test_client, items, status='confirmed'), format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        data = response.json()
+        assert [reservation['room'] for reservation in data['reservations']] == [
+            room.id for room in test_rooms[:3]]
+        assert [reservation['total_price'] for reservation in data['reservations']] == [
+            '200.00', '202.00', '204.00']
+        assert data['total_price'] == '606.00'
+        assert set(Reservation.objects.values_list('status', flat=True)) == {'confirmed'}
+        assert RoomNight.objects.count() == 6
+
+    def test_price_matches_single_reservation(self, test_client, test_rooms):
+        single = Reservation.objects.create(
+            date_in=days(1), date_out=days(4), client=test_client, room=test_rooms[0])
+        serializer = GroupBookingSerializer(
+            data=group(test_client, [item(test_rooms[1], 1, 4)]))
+        assert serializer.is_valid(), serializer.errors
+        Room.objects.filter(pk=test_rooms[1].pk).update(price_for_night=Decimal('100.00'))
+
+        reservation, = serializer.save()
+
+        # Con el precio de la fila bloqueada, no el de la validación
+        assert reservation.total_price == single.total_price == Decimal('300.00')
+
+    def test_all_or_nothing(self, auth_admin_client, group_url, test_client, test_rooms):
+        Reservation.objects.create(
+            date_in=days(2), date_out=days(5), client=test_client, room=test_rooms[1])
+        items = [item(room) for room in test_rooms[:3]]
+
+        response = auth_admin_client.post(group_url, group(test_client, items), format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()['items'] == [
+            {}, {'non_field_errors': ['The room is not available for the selected dates.']}, {}]
+        assert Reservation.objects.count() == 1
+        assert RoomNight.objects.count() == 3
+
+    def test_item_errors(self, auth_admin_client, group_url, test_client, test_rooms):
+        test_rooms[1].status = 'maintenance'
+        test_rooms[1].save()
+        items = [
+            item(test_rooms[0]),
+            item(test_rooms[1]),
+            item(test_rooms[2], guests=3),
+            {**item(test_rooms[3]), 'room': 99999},
+            item(test_rooms[4], date_in=3, date_out=3),
+            item(test_rooms[5]),
+            # Misma habitación y noches que el ítem anterior
+            item(test_rooms[5], date_in=2, date_out=4),
+        ]
+
+        response = auth_admin_client.post(group_url, group(test_client, items), format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        errors = [error.get('non_field_errors') for error in response.json()['items']]
+        assert errors == [
+            None,
+            ['The room is not available due to its current status.'],
+            ['The room does not have capacity for the number of guests.'],
+            ['The room does not exist.'],
+            ['The departure date must be after the arrival date.'],
+            None,
+            ['The room is booked more than once for the same nights.'],
+        ]
+        assert not Reservation.objects.exists()
+
+    def test_same_room_consecutive_stays(self, auth_admin_client, group_url, test_client,
+                                         test_rooms):
+        items = [item(test_rooms[0], 1, 3), item(test_rooms[0], 3, 5)]
+
+        response = auth_admin_client.post(group_url, group(test_client, items), format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert RoomNight.objects.filter(room=test_rooms[0]).count() == 4
+
+    def test_queries_do_not_grow_with_items(self, auth_admin_client, group_url, test_client,
+                                            test_rooms):
+        counts = []
+        for offset, rooms in ((0, test_rooms[:2]), (10, test_rooms[2:25])):
+            items = [item(room, offset + 1, offset + 3) for room in rooms]
+            with CaptureQueriesContext(connection) as context:
+                response = auth_admin_client.post(
+                    group_url, group(test_client, items), format='json')
+            assert response.status_code == status.HTTP_201_CREATED
+            counts.append(len(context.captured_queries))
+
+        assert counts[0] == counts[1]
+        overlap_queries = [query['sql'] for query in context.captured_queries
+                           if 'FROM "reservations_roomnight"' in query['sql']]
+        assert len(overlap_queries) == 1
+
+    def test_too_many_items(self, auth_admin_client, group_url, test_client, test_rooms):
+        items = [item(test_rooms[0], 2 * i + 1, 2 * i + 2)
+                 for i in range(GroupBookingSerializer.MAX_ITEMS + 1)]
+
+        response = auth_admin_client.post(group_url, group(test_client, items), format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'items' in response.json()
+
+    def test_cancelled_status_not_allowed(self, auth_admin_client, group_url, test_client,
+                                          test_rooms):
+        response = auth_admin_client.post(
+            group_url, group(test_client, [item(test_rooms[0])], status='cancelled'),
+            format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'status' in response.json()
+
+    def test_admin_only(self, auth_api_client, group_url, test_client, test_rooms):
+        response = auth_api_client.post(
+            group_url, group(test_client, [item(test_rooms[0])]), format='json')
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert not Reservation.objects.exists()
+
+    def test_updates_cache_and_occupancy_index(self, settings, auth_admin_client, group_url,
+                                               test_client, test_rooms,
+                                               django_capture_on_commit_callbacks):
+        settings.OCCUPANCY_INDEX = True
+        reset_occupancy_index()
+        index = get_occupancy_index()
+        index.build()
+        version = inventory_version()
+
+        try:
+            with django_capture_on_commit_callbacks(execute=True):
+                auth_admin_client.post(
+                    group_url, group(test_client, [item(room) for room in test_rooms[:2]]),
+                    format='json')
+
+            assert inventory_version() > version
+            assert sorted(index.occupied_rooms(days(1), days(3))) == [
+                test_rooms[0].id, test_rooms[1].id]
+        finally:
+            reset_occupancy_index()
@@ -0,0 +1,220 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from reservations.idempotency import REPLAYED_HEADER
+from reservations.models import Room, Reservation, Clients, IdempotencyKey
+from reservations.serializers import ReservationSerializer
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from django.contrib.auth.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def test_client():
+    return Clients.objects.create(
+        name='John',
+        lastname='Doe',
+        document_number='12345678',
+        street='123 Main St',
+        city='New York',
+        state='NY',
+        country='USA',
+        email='john@example.com'
+    )
+
+
+@pytest.fixture
+def test_room():
+    return Room.objects.create(
+        number=101,
+        type='double',
+        price_for_night=Decimal('150.00'),
+        status='available',
+        capacity=2,
+        amenities={}
+    )
+
+
+@pytest.fixture
+def reservation_data(test_client, test_room):
+    return {
+        'room': test_room.id,
+        'client': test_client.id,
+        'date_in': (date.today() + timedelta(days=1)).isoformat(),
+        'date_out': (date.today() + timedelta(days=3)).isoformat(),
+    }
+
+
+@pytest.fixture
+def reservation_url():
+    return reverse('reservations:reservation-list')
+
+
+@pytest.fixture
+def register_data():
+    return {
+        'username': 'newuser',
+        'email': 'newuser@example.com',
+        'password': 'Secret123!',
+        'confirm_password': 'Secret123!',
+        'first_name': 'New',
+        'last_name': 'User',
+    }
+
+
+def post(client, url, data, key):
+    return client.post(url, data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+
+def fail_create(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError('un reintento no vuelve a ejecutar la acción')
+    monkeypatch.setattr(ReservationSerializer, 'create', fail)
+
+
+class TestReservationIdempotency:
+    def test_retry_replays_stored_response(self, auth_admin_client, reservation_url,
+                                           reservation_data, monkeypatch):
+        response = post(auth_admin_client, reservation_url, reservation_data, 'key-1')
+        assert response.status_code == status.HTTP_201_CREATED
+        assert REPLAYED_HEADER not in response
+
+        fail_create(monkeypatch)
+        retry = post(auth_admin_client, reservation_url, reservation_data, 'key-1')
+
+        assert retry.status_code == status.HTTP_201_CREATED
+        assert retry[REPLAYED_HEADER] == 'true'
+        assert retry.json() == response.json()
+        assert Reservation.objects.count() == 1
+
+    def test_different_body_is_rejected(self, auth_admin_client, reservation_url,
+                                        reservation_data):
+        post(auth_admin_client, reservation_url, reservation_data, 'key-1')
+
+        response = post(auth_admin_client, reservation_url,
+                        {**reservation_data, 'number_of_guests': 2}, 'key-1')
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert Reservation.objects.count() == 1
+
+    def test_key_order_does_not_change_fingerprint(self, auth_admin_client, reservation_url,
+                                                   reservation_data):
+        post(auth_admin_client, reservation_url, reservation_data, 'key-1')
+
+        reordered = dict(reversed(list(reservation_data.items())))
+        response = post(auth_admin_client, reservation_url, reordered, 'key-1')
+
+        assert response[REPLAYED_HEADER] == 'true'
+
+    def test_without_header_nothing_is_stored(self, auth_admin_client, reservation_url,
+                                              reservation_data):
+        response = auth_admin_client.post(reservation_url, reservation_data, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert not IdempotencyKey.objects.exists()
+
+    def test_error_releases_key(self, auth_admin_client, reservation_url, reservation_data):
+        invalid = {**reservation_data, 'date_out': reservation_data['date_in']}
+        response = post(auth_admin_client, reservation_url, invalid, 'key-1')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not IdempotencyKey.objects.exists()
+
+        # El cliente corrige la petición y la repite con la misma clave
+        response = post(auth_admin_client, reservation_url, reservation_data, 'key-1')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert REPLAYED_HEADER not in response
+
+    def test_request_in_progress(self, auth_admin_client, reservation_url, reservation_data):
+        post(auth_admin_client, reservation_url, reservation_data, 'key-1')
+        # Como si la petición original todavía no hubiera terminado
+        IdempotencyKey.objects.update(status_code=None, response_body=None)
+
+        response = post(auth_admin_client, reservation_url, reservation_data, 'key-1')
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+    def test_abandoned_and_expired_keys_are_taken_over(self, auth_admin_client,
+                                                       reservation_url, reservation_data,
+                                                       settings):
+        post(auth_admin_client, reservation_url, reservation_data, 'key-1')
+        Reservation.objects.all().delete()
+        now = timezone.now()
+
+        # Proceso caído: sin respuesta desde antes de IDEMPOTENCY_LOCK_TIMEOUT
+        IdempotencyKey.objects.update(
+            status_code=None, locked_at=now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT + 1))
+        response = post(auth_admin_client, reservation_url, reservation_data, 'key-1')
+        assert response.status_code == status.HTTP_201_CREATED
+        assert REPLAYED_HEADER not in response
+
+        # Vencida: la clave se puede usar para otra petición
+        Reservation.objects.all().delete()
+        IdempotencyKey.objects.update(expires_at=now)
+        response = post(auth_admin_client, reservation_url,
+                        {**reservation_data, 'number_of_guests': 2}, 'key-1')
+        assert response.status_code == status.HTTP_201_CREATED
+        assert IdempotencyKey.objects.get().status_code == status.HTTP_201_CREATED
+
+    def test_keys_are_scoped_per_user(self, api_client, create_user, reservation_url,
+                                      reservation_data):
+        api_client.force_authenticate(user=create_user(username='admin1', is_staff=True))
+        post(api_client, reservation_url, reservation_data, 'key-1')
+
+        api_client.force_authenticate(user=create_user(username='admin2', is_staff=True))
+        response = post(api_client, reservation_url, reservation_data, 'key-1')
+
+        # Se ejecuta: la habitación ya está ocupada
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert REPLAYED_HEADER not in response
+
+    def test_key_too_long(self, auth_admin_client, reservation_url, reservation_data):
+        response = post(auth_admin_client, reservation_url, reservation_data, 'k' * 256)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not Reservation.objects.exists()
+
+
+class TestRegisterIdempotency:
+    def test_retry_skips_validation_and_hashing(self, api_client, register_data, monkeypatch):
+        url = reverse('reservations:register-list')
+        response = post(api_client, url, register_data, 'register-1')
+        assert response.status_code == status.HTTP_201_CREATED
+
+        def fail(*args, **kwargs):
+            raise AssertionError('un reintento no vuelve a crear el usuario')
+        monkeypatch.setattr(User.objects, 'create_user', fail)
+        retry = post(api_client, url, register_data, 'register-1')
+
+        assert retry.status_code == status.HTTP_201_CREATED
+        assert retry[REPLAYED_HEADER] == 'true'
+        assert retry.json() == response.json()
+        assert User.objects.filter(username='newuser').count() == 1
+
+    def test_fingerprint_does_not_store_password(self, api_client, register_data):
+        post(api_client, reverse('reservations:register-list'), register_data, 'register-1')
+
+        record = IdempotencyKey.objects.get()
+        assert record.user is None
+        assert 'Secret123!' not in str(record.response_body)
+        assert 'Secret123!' not in record.fingerprint
+
+
+def test_purge_expired_keys():
+    now = timezone.now()
+    for index, expires_at in enumerate([now - timedelta(hours=1), now - timedelta(seconds=1),
+                                        now + timedelta(hours=1)]):
+        IdempotencyKey.objects.create(
+            key=f'key-{index}', scope='reservation-create', fingerprint='-',
+            locked_at=now, expires_at=expires_at)
+    out = StringIO()
+
+    call_command('purge_idempotency_keys', '--batch-size', '1', stdout=out)
+
+    assert '2 claves vencidas borradas' in out.getvalue()
+    assert list(IdempotencyKey.objects.values_list('key', flat=True)) == ['key-2']
@@ -0,0 +1,203 @@
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.core.exceptions import ValidationError
+from reservations.models import Room, Reservation, RoomNight, Clients
+from datetime import date, timedelta
+from decimal import Decimal
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def test_client():
+    return Clients.objects.create(
+        name='John',
+        lastname='Doe',
+        document_number='12345678',
+        street='123 Main St',
+        city='New York',
+        state='NY',
+        country='USA',
+        email='john@example.com'
+    )
+
+
+@pytest.fixture
+def test_room():
+    return Room.objects.create(
+        number=101,
+        type='double',
+        price_for_night=Decimal('150.00'),
+        status='available',
+        capacity=2,
+        amenities={}
+    )
+
+
+@pytest.fixture
+def reservation(test_client, test_room):
+    return Reservation.objects.create(
+        date_in=date.today() + timedelta(days=1),
+        date_out=date.today() + timedelta(days=4),
+        number_of_guests=1,
+        client=test_client,
+        room=test_room
+    )
+
+
+def nights_of(reservation):
+    return list(
+        RoomNight.objects.filter(reservation=reservation)
+        .order_by('night')
+        .values_list('night', flat=True)
+    )
+
+
+class TestRoomNightLedger:
+    def test_create_registers_each_night(self, reservation):
+        assert nights_of(reservation) == [
+            date.today() + timedelta(days=1),
+            date.today() + timedelta(days=2),
+            date.today() + timedelta(days=3),
+        ]
+
+    def test_cancel_releases_nights(self, reservation):
+        reservation.status = 'cancelled'
+        reservation.save()
+        assert nights_of(reservation) == []
+
+    def test_date_change_moves_nights(self, reservation):
+        reservation.date_in = date.today() + timedelta(days=10)
+        reservation.date_out = date.today() + timedelta(days=12)
+        reservation.save()
+        assert nights_of(reservation) == [
+            date.today() + timedelta(days=10),
+            date.today() + timedelta(days=11),
+        ]
+
+    def test_delete_removes_nights(self, reservation):
+        reservation.delete()
+        assert RoomNight.objects.count() == 0
+
+    def test_checkout_day_is_free(self, reservation, test_client, test_room):
+        """La noche de salida puede reservarse para la siguiente estadía"""
+        following = Reservation.objects.create(
+            date_in=reservation.date_out,
+            date_out=reservation.date_out + timedelta(days=2),
+            client=test_client,
+            room=test_room
+        )
+        assert len(nights_of(following)) == 2
+
+    def test_ledger_rejects_double_booking(self, reservation, test_client, test_room):
+        """La clave única impide el doble registro aunque se omita la validación"""
+        night = date.today() + timedelta(days=20)
+        # Noche tomada por una escritura concurrente que ya validó
+        RoomNight.objects.create(room=test_room, night=night, reservation=reservation)
+
+        late = Reservation(
+            date_in=night,
+            date_out=night + timedelta(days=1),
+            client=test_client,
+            room=test_room,
+            total_price=Decimal('150.00')
+        )
+        super(Reservation, late).save()
+
+        with pytest.raises(ValidationError):
+            late.sync_nights(clear=False)
+
+
+class TestBackfillRoomNights:
+    def test_backfill_existing_reservations(self, test_client, test_room):
+        Reservation.objects.bulk_create([
+            Reservation(
+                date_in=date(2030, 1, 1),
+                date_out=date(2030, 1, 3),
+                total_price=Decimal('300.00'),
+                client=test_client,
+                room=test_room
+            ),
+            Reservation(
+                date_in=date(2030, 1, 5),
+                date_out=date(2030, 1, 6),
+                status='cancelled',
+                total_price=Decimal('150.00'),
+                client=test_client,
+                room=test_room
+            ),
+        ])
+        assert RoomNight.objects.count() == 0
+
+        out = StringIO()
+        call_command('backfill_room_nights', stdout=out)
+
+        assert sorted(RoomNight.objects.values_list('night', flat=True)) == [
+            date(2030, 1, 1),
+            date(2030, 1, 2),
+        ]
+        assert 'conflicto' not in out.getvalue()
+
+    @pytest.mark.skipif(
+        connection.vendor == 'postgresql',
+        reason='La restricción de exclusión impide guardar reservaciones solapadas'
+    )
+    def test_backfill_reports_conflicts(self, test_client, test_room):
+        Reservation.objects.bulk_create([
+            Reservation(
+                date_in=date(2030, 1, 1),
+                date_out=date(2030, 1, 3),
+                total_price=Decimal('300.00'),
+                client=test_client,
+                room=test_room
+            ),
+            Reservation(
+                date_in=date(2030, 1, 2),
+                date_out=date(2030, 1, 4),
+                total_price=Decimal('300.00'),
+                client=test_client,
+                room=test_room
+            ),
+        ])
+
+        out = StringIO()
+        call_command('backfill_room_nights', stdout=out)
+
+        assert RoomNight.objects.count() == 3
+        assert 'conflicto' in out.getvalue()
+
+    @pytest.mark.skipif(
+        connection.vendor == 'postgresql',
+        reason='La restricción de exclusión impide guardar reservaciones solapadas'
+    )
+    def test_backfill_oldest_reservation_keeps_night(self, test_client, test_room):
+        # La más nueva va primero en el índice por estado ('confirmed' < 'pending')
+        # y se inserta primero: sin ordenar por id se quedaría con la noche
+        newer, older = Reservation.objects.bulk_create([
+            Reservation(
+                id=2,
+                date_in=date(2030, 1, 2),
+                date_out=date(2030, 1, 4),
+                status='confirmed',
+                total_price=Decimal('300.00'),
+                client=test_client,
+                room=test_room
+            ),
+            Reservation(
+                id=1,
+                date_in=date(2030, 1, 1),
+                date_out=date(2030, 1, 3),
+                total_price=Decimal('300.00'),
+                client=test_client,
+                room=test_room
+            ),
+        ])
+
+        out = StringIO()
+        call_command('backfill_room_nights', stdout=out)
+
+        assert RoomNight.objects.get(night=date(2030, 1, 2)).reservation_id == older.id
+        assert sorted(newer.room_nights.values_list('night', flat=True)) == [date(2030, 1, 3)]
+        assert f'conflicto: [{newer.id}]' in out.getvalue()
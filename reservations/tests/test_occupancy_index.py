@@ -0,0 +1,224 @@
+import threading
+import time
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from reservations.availability import available_rooms_query
+from reservations.cache import bump_inventory_version, inventory_version
+from reservations.models import Room, Reservation, Clients
+from reservations.occupancy import (
+    OccupancyIndex, RoomIds, get_occupancy_index, reservation_change, reset_occupancy_index)
+from datetime import date, timedelta
+from decimal import Decimal
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def occupancy_index(settings):
+    settings.OCCUPANCY_INDEX = True
+    reset_occupancy_index()
+    yield get_occupancy_index()
+    reset_occupancy_index()
+
+
+@pytest.fixture
+def test_client():
+    return Clients.objects.create(
+        name='John',
+        lastname='Doe',
+        document_number='12345678',
+        street='123 Main St',
+        city='New York',
+        state='NY',
+        country='USA',
+        email='john@example.com'
+    )
+
+
+@pytest.fixture
+def test_rooms():
+    return [
+        Room.objects.create(
+            number=100 + i,
+            type='double',
+            price_for_night=Decimal('150.00'),
+            status='available',
+            capacity=2,
+            amenities={}
+        )
+        for i in range(3)
+    ]
+
+
+def days(n):
+    return date.today() + timedelta(days=n)
+
+
+def fail_build():
+    raise AssertionError('el índice no debe reconstruirse')
+
+
+class TestOccupancyIndex:
+    def test_build_from_reservations(self, test_client, test_rooms):
+        Reservation.objects.create(
+            date_in=days(2), date_out=days(5), client=test_client, room=test_rooms[0])
+        Reservation.objects.create(
+            date_in=days(2), date_out=days(5), status='cancelled',
+            client=test_client, room=test_rooms[1])
+
+        index = OccupancyIndex()
+        index.build()
+
+        assert index.occupied_rooms(days(1), days(3)) == [test_rooms[0].id]
+        assert index.occupied_rooms(days(4), days(6)) == [test_rooms[0].id]
+        # La noche de salida queda libre
+        assert index.occupied_rooms(days(5), days(7)) == []
+        assert index.occupied_rooms(days(0), days(2)) == []
+
+    def test_range_outside_horizon(self):
+        index = OccupancyIndex(horizon_days=30)
+        assert index.occupied_rooms(days(25), days(35)) is None
+
+    def test_signals_keep_index_current(self, occupancy_index, test_client, test_rooms,
+                                        django_capture_on_commit_callbacks):
+        assert occupancy_index.occupied_rooms(days(1), days(3)) == []
+
+        with django_capture_on_commit_callbacks(execute=True):
+            reservation = Reservation.objects.create(
+                date_in=days(1), date_out=days(3), client=test_client, room=test_rooms[2])
+        assert occupancy_index.occupied_rooms(days(1), days(3)) == [test_rooms[2].id]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            reservation.date_in = days(10)
+            reservation.date_out = days(12)
+            reservation.save()
+        assert occupancy_index.occupied_rooms(days(1), days(3)) == []
+        assert occupancy_index.occupied_rooms(days(11), days(12)) == [test_rooms[2].id]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            reservation.status = 'cancelled'
+            reservation.save()
+        assert occupancy_index.occupied_rooms(days(10), days(12)) == []
+
+        with django_capture_on_commit_callbacks(execute=True):
+            reservation.status = 'confirmed'
+            reservation.save()
+        with django_capture_on_commit_callbacks(execute=True):
+            reservation.delete()
+        assert occupancy_index.occupied_rooms(days(10), days(12)) == []
+
+    def test_local_writes_do_not_rebuild(self, occupancy_index, test_client, test_rooms,
+                                         django_capture_on_commit_callbacks, monkeypatch):
+        occupancy_index.build()
+        monkeypatch.setattr(occupancy_index, 'build', fail_build)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Reservation.objects.create(
+                date_in=days(1), date_out=days(3), client=test_client, room=test_rooms[0])
+            Room.objects.filter(pk=test_rooms[1].pk).get().save()
+
+        assert occupancy_index.occupied_rooms(days(1), days(3)) == [test_rooms[0].id]
+        assert occupancy_index.version == inventory_version()
+
+    def test_applies_changes_from_another_process(self, occupancy_index, api_client,
+                                                  admin_user, test_client, test_rooms,
+                                                  monkeypatch):
+        api_client.force_authenticate(user=admin_user)
+        url = reverse('reservations:room-availability')
+        params = {'date_in': days(1).isoformat(), 'date_out': days(3).isoformat()}
+        assert len(api_client.get(url, params).json()['available_rooms']) == 3
+        monkeypatch.setattr(occupancy_index, 'build', fail_build)
+
+        # Otro proceso: sin señales en este, solo la versión y el cambio en la caché
+        reservation, = Reservation.objects.bulk_create([Reservation(
+            date_in=days(1), date_out=days(3), client=test_client, room=test_rooms[0])])
+        bump_inventory_version(change=[reservation_change(reservation)])
+
+        response = api_client.get(url, params)
+
+        room_ids = {room['room_id'] for room in response.json()['available_rooms']}
+        assert room_ids == {test_rooms[1].id, test_rooms[2].id}
+        assert occupancy_index.version == inventory_version()
+
+    def test_missing_change_rebuilds(self, occupancy_index, test_client, test_rooms):
+        occupancy_index.build()
+        built_at = occupancy_index.built_at
+
+        # Por ejemplo un queryset.update(): cambia la versión sin registrar el cambio
+        Reservation.objects.bulk_create([Reservation(
+            date_in=days(1), date_out=days(3), client=test_client, room=test_rooms[0])])
+        bump_inventory_version()
+
+        assert occupancy_index.occupied_rooms(days(1), days(3)) == [test_rooms[0].id]
+        assert occupancy_index.built_at != built_at
+
+    def test_room_ids_for_returns_shortest_list(self, occupancy_index, test_client, test_rooms,
+                                                django_capture_on_commit_callbacks):
+        Reservation.objects.create(
+            date_in=days(1), date_out=days(3), client=test_client, room=test_rooms[0])
+        assert occupancy_index.room_ids_for(days(1), days(3)) == RoomIds(
+            [test_rooms[0].id], free=False)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Reservation.objects.create(
+                date_in=days(1), date_out=days(3), client=test_client, room=test_rooms[1])
+            new_room = Room.objects.create(
+                number=200, type='single', price_for_night=Decimal('80.00'), capacity=1)
+            test_rooms[2].delete()
+
+        assert occupancy_index.room_ids_for(days(1), days(3)) == RoomIds(
+            [new_room.id], free=True)
+
+    def test_query_filters_free_or_occupied_ids(self, test_rooms):
+        def room_ids(ids, free):
+            rows = available_rooms_query(days(1), days(3), room_ids=RoomIds(ids, free))
+            return [row['id'] for row in rows]
+
+        assert room_ids([test_rooms[0].id], free=True) == [test_rooms[0].id]
+        assert room_ids([test_rooms[0].id], free=False) == [test_rooms[1].id, test_rooms[2].id]
+        assert room_ids([], free=True) == []
+
+    def test_concurrent_refresh_builds_once(self, occupancy_index, monkeypatch):
+        builds = []
+        started = threading.Barrier(5)
+
+        def build():
+            builds.append(1)
+            time.sleep(0.05)
+            occupancy_index.first_night = date.today()
+            occupancy_index.version = inventory_version()
+            occupancy_index.built_at = time.monotonic()
+
+        monkeypatch.setattr(occupancy_index, 'build', build)
+
+        def search():
+            started.wait()
+            occupancy_index.refresh()
+
+        threads = [threading.Thread(target=search) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(builds) == 1
+
+    def test_availability_uses_index(self, occupancy_index, api_client, admin_user,
+                                     test_client, test_rooms, django_assert_num_queries):
+        Reservation.objects.create(
+            date_in=days(1), date_out=days(3), client=test_client, room=test_rooms[0])
+        occupancy_index.build()
+
+        api_client.force_authenticate(user=admin_user)
+        url = reverse('reservations:room-availability')
+        params = {'date_in': days(2).isoformat(), 'date_out': days(4).isoformat()}
+
+        # Solo la consulta de habitaciones: los conflictos salen del índice
+        with django_assert_num_queries(1):
+            response = api_client.get(url, params)
+
+        assert response.status_code == status.HTTP_200_OK
+        room_ids = {room['room_id'] for room in response.json()['available_rooms']}
+        assert room_ids == {test_rooms[1].id, test_rooms[2].id}
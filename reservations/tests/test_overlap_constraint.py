@@ -0,0 +1,197 @@
+import importlib
+import pytest
+from types import SimpleNamespace
+from django.apps import apps
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from rest_framework import status
+from django.urls import reverse
+from reservations.constraints import DROP_CONSTRAINT, constraint_exists
+from reservations.models import (
+    Room, Reservation, RoomNight, Clients, overlap_constraint_enabled,
+    reset_overlap_constraint_installed
+)
+from django.core.exceptions import ValidationError
+from datetime import date, timedelta
+from decimal import Decimal
+
+pytestmark = pytest.mark.django_db
+
+requires_postgresql = pytest.mark.skipif(
+    connection.vendor != 'postgresql',
+    reason='La restricción de exclusión solo existe en PostgreSQL'
+)
+
+
+@pytest.fixture
+def test_client():
+    return Clients.objects.create(
+        name='John',
+        lastname='Doe',
+        document_number='12345678',
+        street='123 Main St',
+        city='New York',
+        state='NY',
+        country='USA',
+        email='john@example.com'
+    )
+
+
+@pytest.fixture
+def test_room():
+    return Room.objects.create(
+        number=101,
+        type='double',
+        price_for_night=Decimal('150.00'),
+        status='available',
+        capacity=2,
+        amenities={}
+    )
+
+
+@pytest.fixture
+def existing_reservation(test_client, test_room):
+    return Reservation.objects.create(
+        date_in=date.today() + timedelta(days=1),
+        date_out=date.today() + timedelta(days=4),
+        number_of_guests=1,
+        client=test_client,
+        room=test_room
+    )
+
+
+@pytest.fixture
+def constraint_mode(settings):
+    settings.RESERVATION_OVERLAP_CONSTRAINT = True
+
+
+@pytest.fixture
+def overlapping_reservations(test_client, test_room):
+    """Dos reservaciones activas solapadas, como las que ya hay en producción"""
+    reset_overlap_constraint_installed()
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(DROP_CONSTRAINT)
+    reservations = Reservation.objects.bulk_create([
+        Reservation(date_in=date.today() + timedelta(days=1 + offset),
+                    date_out=date.today() + timedelta(days=4 + offset),
+                    total_price=Decimal('450.00'), client=test_client, room=test_room)
+        for offset in (0, 2)
+    ])
+    if connection.vendor == 'postgresql':
+        # Sin claves foráneas diferidas pendientes: impedirían el ALTER TABLE
+        # dentro de la transacción de la prueba
+        with connection.cursor() as cursor:
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+    yield reservations
+    reset_overlap_constraint_installed()
+
+
+def migration(name):
+    return importlib.import_module(f'reservations.migrations.{name}')
+
+
+class TestOverlapConstraint:
+    def test_disabled_by_default(self):
+        assert overlap_constraint_enabled() is False
+
+    @pytest.mark.skipif(connection.vendor == 'postgresql', reason='Solo backends sin restricción')
+    def test_other_backends_keep_python_check(self, constraint_mode, test_client, test_room, existing_reservation):
+        """Fuera de PostgreSQL el ajuste no tiene efecto"""
+        assert overlap_constraint_enabled() is False
+
+        reservation = Reservation(
+            date_in=date.today() + timedelta(days=2),
+            date_out=date.today() + timedelta(days=5),
+            client=test_client,
+            room=test_room
+        )
+        with pytest.raises(ValidationError):
+            reservation.full_clean()
+
+    @requires_postgresql
+    def test_constraint_rejects_overlap(self, constraint_mode, test_client, test_room, existing_reservation):
+        reservation = Reservation(
+            date_in=date.today() + timedelta(days=2),
+            date_out=date.today() + timedelta(days=5),
+            client=test_client,
+            room=test_room
+        )
+        with pytest.raises(ValidationError) as exc_info:
+            reservation.save()
+        assert 'not available for the selected dates' in str(exc_info.value)
+        assert Reservation.objects.count() == 1
+
+    @requires_postgresql
+    def test_constraint_ignores_cancelled(self, constraint_mode, test_client, test_room, existing_reservation):
+        existing_reservation.status = 'cancelled'
+        existing_reservation.save()
+
+        Reservation.objects.create(
+            date_in=date.today() + timedelta(days=2),
+            date_out=date.today() + timedelta(days=5),
+            client=test_client,
+            room=test_room
+        )
+        assert Reservation.objects.count() == 2
+
+    @requires_postgresql
+    def test_api_maps_constraint_error(self, constraint_mode, api_client, admin_user, test_client, test_room, existing_reservation):
+        api_client.force_authenticate(user=admin_user)
+        url = reverse('reservations:reservation-list')
+        data = {
+            'date_in': (date.today() + timedelta(days=3)).isoformat(),
+            'date_out': (date.today() + timedelta(days=6)).isoformat(),
+            'number_of_guests': 1,
+            'client': test_client.id,
+            'room': test_room.id
+        }
+
+        response = api_client.post(url, data, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'not available for the selected dates' in str(response.data)
+
+
+class TestExistingOverlaps:
+    @requires_postgresql
+    def test_migration_reports_instead_of_failing(self, overlapping_reservations, capsys):
+        first, second = overlapping_reservations
+        schema_editor = SimpleNamespace(connection=connection)
+
+        migration('0003_reservation_no_overlap_constraint').create_constraint(apps, schema_editor)
+
+        with connection.cursor() as cursor:
+            assert not constraint_exists(cursor)
+        output = capsys.readouterr().out
+        assert 'NO creada' in output
+        assert f'reservaciones {first.id} y {second.id}' in output
+
+    @requires_postgresql
+    def test_setting_has_no_effect_without_constraint(self, constraint_mode,
+                                                      overlapping_reservations):
+        assert overlap_constraint_enabled() is False
+
+    @requires_postgresql
+    def test_command_adds_constraint_once_resolved(self, constraint_mode,
+                                                   overlapping_reservations):
+        first, second = overlapping_reservations
+        with pytest.raises(CommandError, match=f'reservaciones {first.id} y {second.id}'):
+            call_command('add_overlap_constraint')
+        assert overlap_constraint_enabled() is False
+
+        second.status = 'cancelled'
+        second.save(update_fields=['status'])
+        call_command('add_overlap_constraint')
+
+        assert overlap_constraint_enabled() is True
+
+    def test_room_nights_backfill_reports_conflicts(self, overlapping_reservations, capsys):
+        first, second = overlapping_reservations
+
+        migration('0004_roomnight').backfill_room_nights(apps, None)
+
+        # La reservación más antigua conserva sus noches
+        assert RoomNight.objects.filter(reservation=first).count() == 3
+        assert RoomNight.objects.filter(reservation=second).count() == 2
+        assert f'noches en conflicto: [{second.id}]' in capsys.readouterr().out
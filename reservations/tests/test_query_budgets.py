@@ -0,0 +1,250 @@
+from collections import namedtuple
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from reservations.models import AMENITIES, Room, Reservation, RoomNight, Clients, amenity_mask
+
+pytestmark = pytest.mark.django_db
+
+START = date.today() + timedelta(days=30)
+
+
+@pytest.fixture
+def owner_client(normal_user):
+    return Clients.objects.create(
+        user=normal_user,
+        name='John',
+        lastname='Doe',
+        document_number='12345678',
+        street='123 Main St',
+        city='New York',
+        state='NY',
+        country='USA',
+        email='john@example.com'
+    )
+
+
+@pytest.fixture
+def seed(owner_client):
+    """
+    Completa hasta `size` habitaciones, clientes y reservaciones (una por
+    habitación, la mitad del usuario normal) con bulk_create
+    """
+    amenities = {key: key == 'wifi' for key in AMENITIES}
+    seeded = 0
+
+    def grow(size):
+        # Los endpoints de borrado quitan filas: se cuenta lo sembrado
+        nonlocal seeded
+        start, seeded = seeded, size
+        rooms = Room.objects.bulk_create([
+            Room(number=1000 + i, type='double', price_for_night=Decimal('150.00'),
+                 capacity=2, amenities=amenities, amenity_mask=amenity_mask(amenities))
+            for i in range(start, size)
+        ])
+        clients = Clients.objects.bulk_create([
+            Clients(name=f'Client{i}', lastname='Budget', document_number=f'D{i}',
+                    street='-', city='-', state='-', country='-',
+                    email=f'client{i}@example.com')
+            for i in range(start, size)
+        ])
+        reservations = Reservation.objects.bulk_create([
+            Reservation(date_in=START, date_out=START + timedelta(days=2),
+                        total_price=Decimal('300.00'), status='confirmed',
+                        client=owner_client if i % 2 == 0 else client, room=room)
+            for i, (room, client) in enumerate(zip(rooms, clients), start)
+        ])
+        RoomNight.objects.bulk_create([
+            RoomNight(room_id=reservation.room_id, reservation_id=reservation.id, night=night)
+            for reservation in reservations
+            for night in reservation.get_nights()
+        ])
+    return grow
+
+
+def latest(model):
+    return model.objects.order_by('-id').first()
+
+
+def free_dates(size):
+    # Fechas que no ocupa ninguna reservación sembrada, distintas por tamaño
+    date_in = START + timedelta(days=10 + size)
+    return date_in.isoformat(), (date_in + timedelta(days=2)).isoformat()
+
+
+def create_reservation(size):
+    date_in, date_out = free_dates(size)
+    return {'room': latest(Room).id, 'client': latest(Clients).id,
+            'date_in': date_in, 'date_out': date_out, 'number_of_guests': 1}
+
+
+def update_reservation(size):
+    reservation = latest(Reservation)
+    date_in, date_out = free_dates(size)
+    return reservation.id, {'room': reservation.room_id, 'client': reservation.client_id,
+                            'date_in': date_in, 'date_out': date_out,
+                            'number_of_guests': 2, 'status': 'confirmed'}
+
+
+def idempotent(api, size, request, replay=False):
+    # Con Idempotency-Key; replay hace antes la petición original, fuera de la medición
+    api.defaults['HTTP_IDEMPOTENCY_KEY'] = f'budget-{size}'
+    method, url, data = request
+    if replay:
+        getattr(api, method)(url, data, format='json')
+    return method, url, data
+
+
+def group_booking(size):
+    # Cinco habitaciones sembradas en fechas libres
+    date_in, date_out = free_dates(size)
+    rooms = Room.objects.order_by('-id').values_list('id', flat=True)[:5]
+    return {'client': latest(Clients).id,
+            'items': [{'room': room, 'date_in': date_in, 'date_out': date_out}
+                      for room in rooms]}
+
+
+def client_data(size):
+    return {'name': 'New', 'lastname': 'Client', 'document_number': f'N{size}',
+            'street': '-', 'city': '-', 'state': '-', 'country': '-',
+            'email': f'new{size}@example.com'}
+
+
+def room_data(size):
+    return {'number': 5000 + size, 'type': 'single', 'price_for_night': '80.00',
+            'capacity': 1, 'amenities': {key: True for key in AMENITIES}}
+
+
+def availability_params(size):
+    date_in, date_out = free_dates(size)
+    return {'date_in': date_in, 'date_out': date_out}
+
+
+def new_user(size):
+    return User.objects.create_user(username=f'budget{size}', password='testpass')
+
+
+# client: fixture del conftest que hace la petición; request(size, client)
+# devuelve (método, URL, datos) y prepara lo necesario fuera de la medición
+Endpoint = namedtuple('Endpoint', 'name client budget request')
+
+ENDPOINTS = [
+    # RegisterUser
+    Endpoint('register-create', 'api_client', 6, lambda size, api: (
+        'post', reverse('reservations:register-list'),
+        {'username': f'newuser{size}', 'email': f'newuser{size}@example.com',
+         'password': 'Secret123!', 'confirm_password': 'Secret123!',
+         'first_name': 'New', 'last_name': 'User'})),
+    Endpoint('register-replay', 'api_client', 5, lambda size, api: idempotent(
+        api, size, ('post', reverse('reservations:register-list'),
+                    {'username': f'newuser{size}', 'email': f'newuser{size}@example.com',
+                     'password': 'Secret123!', 'confirm_password': 'Secret123!'}),
+        replay=True)),
+    # ClientViewSet
+    Endpoint('client-list', 'auth_admin_client', 2, lambda size, api: (
+        'get', reverse('reservations:client-list'), None)),
+    Endpoint('client-retrieve', 'auth_api_client', 2, lambda size, api: (
+        'get', reverse('reservations:client-detail',
+                       args=[Clients.objects.get(user__username='testuser').id]), None)),
+    Endpoint('client-create', 'api_client', 5, lambda size, api: (
+        api.force_authenticate(user=new_user(size)),
+        ('post', reverse('reservations:client-list'), client_data(size)))[1]),
+    Endpoint('client-update', 'auth_admin_client', 7, lambda size, api: (
+        'put', reverse('reservations:client-detail', args=[latest(Clients).id]),
+        client_data(size))),
+    Endpoint('client-partial-update', 'auth_admin_client', 5, lambda size, api: (
+        'patch', reverse('reservations:client-detail', args=[latest(Clients).id]),
+        {'city': f'City{size}'})),
+    Endpoint('client-destroy', 'auth_admin_client', 6, lambda size, api: (
+        'delete', reverse('reservations:client-detail', args=[latest(Clients).id]), None)),
+    Endpoint('client-export', 'auth_admin_client', 2, lambda size, api: (
+        'get', reverse('reservations:client-export'), None)),
+    # RoomViewSet
+    Endpoint('room-list', 'auth_api_client', 3, lambda size, api: (
+        'get', reverse('reservations:room-list'), None)),
+    Endpoint('room-retrieve', 'auth_api_client', 2, lambda size, api: (
+        'get', reverse('reservations:room-detail', args=[latest(Room).id]), None)),
+    Endpoint('room-create', 'auth_admin_client', 2, lambda size, api: (
+        'post', reverse('reservations:room-list'), room_data(size))),
+    Endpoint('room-update', 'auth_admin_client', 3, lambda size, api: (
+        'put', reverse('reservations:room-detail', args=[latest(Room).id]), room_data(size))),
+    Endpoint('room-partial-update', 'auth_admin_client', 3, lambda size, api: (
+        'patch', reverse('reservations:room-detail', args=[latest(Room).id]),
+        {'capacity': 3})),
+    Endpoint('room-destroy', 'auth_admin_client', 7, lambda size, api: (
+        'delete', reverse('reservations:room-detail', args=[latest(Room).id]), None)),
+    Endpoint('room-availability', 'auth_api_client', 2, lambda size, api: (
+        'get', reverse('reservations:room-availability'), availability_params(size))),
+    Endpoint('room-availability-paginated', 'auth_api_client', 3, lambda size, api: (
+        'get', reverse('reservations:room-availability'),
+        {**availability_params(size), 'limit': 20})),
+    Endpoint('room-availability-batch', 'auth_api_client', 3, lambda size, api: (
+        'post', reverse('reservations:room-availability-batch'),
+        {'windows': [dict(zip(('date_in', 'date_out'), free_dates(size + offset)))
+                     for offset in range(5)]})),
+    Endpoint('room-alternatives', 'auth_api_client', 3, lambda size, api: (
+        'get', reverse('reservations:room-alternatives'),
+        {'date_in': START.isoformat(), 'date_out': (START + timedelta(days=2)).isoformat()})),
+    Endpoint('room-calendar', 'auth_admin_client', 3, lambda size, api: (
+        'get', reverse('reservations:room-calendar'),
+        {'start': START.isoformat(), 'end': (START + timedelta(days=30)).isoformat()})),
+    Endpoint('room-availability-cache', 'auth_admin_client', 1, lambda size, api: (
+        'get', reverse('reservations:room-availability-cache'), None)),
+    # ReservationViewSet
+    Endpoint('reservation-list', 'auth_admin_client', 3, lambda size, api: (
+        'get', reverse('reservations:reservation-list'), None)),
+    Endpoint('reservation-list-own', 'auth_api_client', 3, lambda size, api: (
+        'get', reverse('reservations:reservation-list'), None)),
+    Endpoint('reservation-my-reservations', 'auth_api_client', 3, lambda size, api: (
+        'get', reverse('reservations:reservation-my-reservations'), None)),
+    Endpoint('reservation-retrieve', 'auth_admin_client', 2, lambda size, api: (
+        'get', reverse('reservations:reservation-detail', args=[latest(Reservation).id]),
+        None)),
+    Endpoint('reservation-create', 'auth_admin_client', 10, lambda size, api: (
+        'post', reverse('reservations:reservation-list'), create_reservation(size))),
+    Endpoint('reservation-create-idempotent', 'auth_admin_client', 14, lambda size, api: (
+        idempotent(api, size, ('post', reverse('reservations:reservation-list'),
+                               create_reservation(size))))),
+    Endpoint('reservation-create-replay', 'auth_admin_client', 6, lambda size, api: (
+        idempotent(api, size, ('post', reverse('reservations:reservation-list'),
+                               create_reservation(size)), replay=True))),
+    Endpoint('reservation-group', 'auth_admin_client', 8, lambda size, api: (
+        'post', reverse('reservations:reservation-group'), group_booking(size))),
+    Endpoint('reservation-update', 'auth_admin_client', 12, lambda size, api: (
+        lambda pk, data: ('put', reverse('reservations:reservation-detail', args=[pk]),
+                          data))(*update_reservation(size))),
+    Endpoint('reservation-partial-update', 'auth_admin_client', 11, lambda size, api: (
+        'patch', reverse('reservations:reservation-detail', args=[latest(Reservation).id]),
+        dict(zip(('date_in', 'date_out'), free_dates(size))))),
+    Endpoint('reservation-destroy', 'auth_admin_client', 4, lambda size, api: (
+        'delete', reverse('reservations:reservation-detail', args=[latest(Reservation).id]),
+        None)),
+    Endpoint('reservation-export', 'auth_admin_client', 2, lambda size, api: (
+        'get', reverse('reservations:reservation-export'), None)),
+]
+
+
+@pytest.mark.parametrize('endpoint', ENDPOINTS, ids=[endpoint.name for endpoint in ENDPOINTS])
+def test_query_budget(endpoint, request, query_budget, seed):
+    api_client = request.getfixturevalue(endpoint.client)
+
+    def prepare(size):
+        method, url, data = endpoint.request(size, api_client)
+        return lambda: getattr(api_client, method)(url, data, format='json')
+
+    query_budget.check(endpoint.budget, seed, prepare)
+
+
+def test_budget_detects_growth(query_budget, seed, auth_admin_client):
+    # Un listado sin select_related: una consulta por fila para el cliente
+    def prepare(size):
+        def send():
+            names = [reservation.client.name for reservation in Reservation.objects.all()]
+            return auth_admin_client.get(reverse('reservations:room-list'), {'n': len(names)})
+        return send
+
+    with pytest.raises(AssertionError, match='crecen con las filas'):
+        query_budget.check(100, seed, prepare)
@@ -0,0 +1,136 @@
+import pytest
+from django.db import connection
+from reservations.models import Room, Reservation, Clients
+from reservations.availability import available_rooms_query
+from datetime import date, timedelta
+from decimal import Decimal
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def seeded_reservations():
+    """
+    Historial de reservaciones: la mayoría ya finalizadas o canceladas,
+    como en una base de datos en producción.
+    """
+    client = Clients.objects.create(
+        name='John',
+        lastname='Doe',
+        document_number='12345678',
+        street='123 Main St',
+        city='New York',
+        state='NY',
+        country='USA',
+        email='john@example.com'
+    )
+    rooms = Room.objects.bulk_create([
+        Room(
+            number=100 + i,
+            type='single',
+            price_for_night=Decimal('100.00'),
+            capacity=2,
+            amenities={}
+        )
+        for i in range(20)
+    ])
+
+    start = date.today() - timedelta(days=730)
+    reservations = []
+    for room in rooms:
+        for i in range(100):
+            date_in = start + timedelta(days=i * 7)
+            reservations.append(Reservation(
+                date_in=date_in,
+                date_out=date_in + timedelta(days=3),
+                status='cancelled' if i % 4 == 0 else 'confirmed',
+                total_price=Decimal('300.00'),
+                client=client,
+                room=room
+            ))
+    Reservation.objects.bulk_create(reservations)
+
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+    return rooms
+
+
+OVERLAP_INDEXES = ('reservation_room_overlap_idx', 'reservation_dates_overlap_idx')
+
+
+def assert_uses_index(queryset):
+    """
+    Falla si el planificador recorre la tabla completa en lugar de usar
+    alguno de los índices de solapamiento
+    """
+    plan = queryset.explain()
+    if connection.vendor == 'postgresql':
+        assert 'Seq Scan' not in plan, plan
+    else:
+        assert f'SCAN {Reservation._meta.db_table}' not in plan, plan
+    assert any(index in plan for index in OVERLAP_INDEXES), plan
+
+
+class TestReservationQueryPlans:
+    def test_room_overlap_check_uses_index(self, seeded_reservations):
+        """La consulta de solapamiento de Reservation.clean no recorre la tabla"""
+        date_in = date.today() + timedelta(days=10)
+        date_out = date_in + timedelta(days=2)
+
+        queryset = Reservation.objects.filter(
+            room=seeded_reservations[0],
+            date_in__lt=date_out,
+            date_out__gt=date_in,
+            status__in=Reservation.ACTIVE_STATUSES
+        )
+
+        assert_uses_index(queryset)
+
+    def test_availability_conflicts_use_index(self, seeded_reservations):
+        """La consulta de conflictos de availability no recorre la tabla"""
+        date_in = date.today() + timedelta(days=10)
+        date_out = date_in + timedelta(days=2)
+
+        queryset = Reservation.objects.filter(
+            date_in__lt=date_out,
+            date_out__gt=date_in,
+            status__in=Reservation.ACTIVE_STATUSES
+        ).values_list('room_id', flat=True)
+
+        assert_uses_index(queryset)
+
+    def test_availability_is_anti_join(self, seeded_reservations):
+        """Las habitaciones ocupadas se descartan con NOT EXISTS sobre RoomNight"""
+        date_in = date.today() + timedelta(days=10)
+        date_out = date_in + timedelta(days=2)
+
+        queryset = available_rooms_query(date_in, date_out)
+        sql = str(queryset.query)
+        plan = queryset.explain()
+
+        assert 'NOT EXISTS' in sql
+        assert ' IN (SELECT' not in sql
+        # Solo las columnas de la respuesta, sin status ni is_reserved
+        assert '"is_reserved"' not in sql.split(' FROM ')[0]
+        if connection.vendor == 'postgresql':
+            assert 'Anti Join' in plan, plan
+        else:
+            # Sondeo por índice de (room, night) para cada habitación
+            assert 'SEARCH U0 USING COVERING INDEX' in plan, plan
+
+    def test_max_price_uses_room_price_index(self, seeded_reservations):
+        """El tope de precio se aplica a la columna indexada, no a total_price"""
+        date_in = date.today() + timedelta(days=10)
+        date_out = date_in + timedelta(days=2)
+
+        plan = available_rooms_query(
+            date_in, date_out, ordering='total_price', max_price=Decimal('150.00')
+        ).explain()
+
+        if connection.vendor == 'postgresql':
+            # Con 20 habitaciones PostgreSQL prefiere recorrer la tabla; basta
+            # con que el filtro sea sobre la columna y no sobre la expresión
+            assert '(price_for_night <= 75.00)' in plan, plan
+        else:
+            assert 'room_price_idx' in plan, plan
@@ -0,0 +1,125 @@
+import json
+
+import msgpack
+import pytest
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from reservations.models import Room, Reservation, Clients
+from reservations.renderers import MessagePackRenderer, ORJSONRenderer
+from datetime import date, timedelta
+from decimal import Decimal
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def test_room():
+    return Room.objects.create(
+        number=101,
+        type='double',
+        price_for_night=Decimal('150.00'),
+        status='available',
+        capacity=2,
+        description='Habitación con vista — ñandú',
+        amenities={'wifi': True}
+    )
+
+
+@pytest.fixture
+def test_reservation(test_room):
+    client = Clients.objects.create(
+        name='John', lastname='Doe', document_number='12345678', street='123 Main St',
+        city='New York', state='NY', country='USA', email='john@example.com'
+    )
+    return Reservation.objects.create(
+        date_in=date.today() + timedelta(days=1),
+        date_out=date.today() + timedelta(days=3),
+        client=client,
+        room=test_room
+    )
+
+
+@pytest.fixture
+def availability_params():
+    return {
+        'date_in': (date.today() + timedelta(days=5)).isoformat(),
+        'date_out': (date.today() + timedelta(days=7)).isoformat(),
+    }
+
+
+class TestORJSONRenderer:
+    def test_same_json_as_drf(self):
+        data = {
+            'price': Decimal('150.50'),
+            'day': date(2030, 1, 10),
+            'label': gettext_lazy('Reservation'),
+            'rows': ({'id': 1, 'text': 'ñandú'},),
+        }
+
+        assert json.loads(ORJSONRenderer().render(data)) == json.loads(JSONRenderer().render(data))
+
+    def test_indent_from_accept_header(self):
+        rendered = ORJSONRenderer().render(
+            {'a': 1}, accepted_media_type='application/json; indent=2')
+        assert rendered == b'{\n  "a": 1\n}'
+
+    def test_list_endpoint(self, auth_admin_client, test_reservation):
+        response = auth_admin_client.get(reverse('reservations:reservation-list'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == 'application/json'
+        assert response.json()['results'][0]['total_price'] == '300.00'
+
+    def test_availability_decimal_as_number(self, auth_api_client, test_room, availability_params):
+        response = auth_api_client.get(
+            reverse('reservations:room-availability'), availability_params)
+
+        room = response.json()['available_rooms'][0]
+        assert room['price_per_night'] == 150.0
+        assert room['total_price'] == 300.0
+
+
+class TestORJSONParser:
+    def test_json_body(self, auth_admin_client, test_room):
+        response = auth_admin_client.patch(
+            reverse('reservations:room-detail', args=[test_room.id]),
+            json.dumps({'capacity': 3}), content_type='application/json')
+
+        assert response.status_code == status.HTTP_200_OK
+        test_room.refresh_from_db()
+        assert test_room.capacity == 3
+
+    def test_malformed_json(self, auth_admin_client, test_room):
+        response = auth_admin_client.patch(
+            reverse('reservations:room-detail', args=[test_room.id]),
+            '{"capacity": ', content_type='application/json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()['detail'].startswith('JSON parse error')
+
+
+class TestMessagePackRenderer:
+    def test_accept_header(self, auth_api_client, test_room, availability_params):
+        url = reverse('reservations:room-availability')
+        json_data = auth_api_client.get(url, availability_params).json()
+
+        response = auth_api_client.get(
+            url, availability_params, HTTP_ACCEPT=MessagePackRenderer.media_type)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == 'application/msgpack'
+        assert msgpack.unpackb(response.content) == json_data
+        assert len(response.content) < len(json.dumps(json_data, separators=(',', ':')))
+
+    def test_format_param(self, auth_api_client, test_room):
+        response = auth_api_client.get(reverse('reservations:room-list'), {'format': 'msgpack'})
+
+        assert msgpack.unpackb(response.content)['results'][0]['price_for_night'] == '150.00'
+
+
+def test_no_browsable_api_without_debug(auth_api_client, test_room):
+    response = auth_api_client.get(reverse('reservations:room-list'), HTTP_ACCEPT='text/html')
+
+    assert response.status_code == status.HTTP_406_NOT_ACCEPTABLE
@@ -0,0 +1,132 @@
+import csv
+import io
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from reservations.models import Room, Reservation, Clients
+from datetime import date, timedelta
+from decimal import Decimal
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def test_client():
+    return Clients.objects.create(
+        name='John',
+        lastname='Doe',
+        document_number='12345678',
+        street='123 Main St',
+        city='New York',
+        state='NY',
+        country='USA',
+        email='john@example.com'
+    )
+
+
+@pytest.fixture
+def test_room():
+    return Room.objects.create(
+        number=101,
+        type='double',
+        price_for_night=Decimal('150.00'),
+        status='available',
+        capacity=2,
+        amenities={}
+    )
+
+
+@pytest.fixture
+def start():
+    return date.today() + timedelta(days=10)
+
+
+@pytest.fixture
+def test_reservations(test_client, test_room, start):
+    # Estadías de dos noches cada cinco días, con el estado alternando
+    statuses = ['confirmed', 'pending', 'cancelled', 'confirmed']
+    return [
+        Reservation.objects.create(
+            date_in=start + timedelta(days=i * 5),
+            date_out=start + timedelta(days=i * 5 + 2),
+            status=reservation_status,
+            client=test_client,
+            room=test_room
+        )
+        for i, reservation_status in enumerate(statuses)
+    ]
+
+
+@pytest.fixture
+def export_url():
+    return reverse('reservations:reservation-export')
+
+
+def read_content(response):
+    assert response.status_code == status.HTTP_200_OK
+    assert response.streaming
+    return b''.join(response.streaming_content).decode()
+
+
+class TestReservationExport:
+    def test_requires_admin(self, auth_api_client, export_url):
+        response = auth_api_client.get(export_url)
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_csv_with_related_columns(self, auth_admin_client, export_url, test_reservations):
+        response = auth_admin_client.get(export_url)
+
+        assert response['Content-Type'] == 'text/csv'
+        assert 'reservations.csv' in response['Content-Disposition']
+        rows = list(csv.DictReader(io.StringIO(read_content(response))))
+        assert [int(row['id']) for row in rows] == [r.id for r in test_reservations]
+        assert rows[0]['client_lastname'] == 'Doe'
+        assert rows[0]['room_number'] == '101'
+        assert rows[0]['total_price'] == '300.00'
+
+    def test_ndjson(self, auth_admin_client, export_url, test_reservations, start):
+        response = auth_admin_client.get(export_url, {'export_format': 'ndjson'})
+
+        assert response['Content-Type'] == 'application/x-ndjson'
+        lines = [json.loads(line) for line in read_content(response).splitlines()]
+        assert len(lines) == 4
+        assert lines[0]['date_in'] == start.isoformat()
+        assert lines[0]['total_price'] == '300.00'
+        assert lines[0]['room_price_for_night'] == '150.00'
+        assert lines[0]['client_name'] == 'John'
+
+    def test_date_range_and_status(self, auth_admin_client, export_url, test_reservations, start):
+        response = auth_admin_client.get(export_url, {
+            'export_format': 'ndjson',
+            'date_from': (start + timedelta(days=5)).isoformat(),
+            'date_to': (start + timedelta(days=15)).isoformat(),
+            'status': 'confirmed,pending',
+        })
+
+        lines = [json.loads(line) for line in read_content(response).splitlines()]
+        assert [line['id'] for line in lines] == [test_reservations[1].id, test_reservations[3].id]
+
+    def test_single_query(self, auth_admin_client, export_url, test_reservations):
+        with CaptureQueriesContext(connection) as context:
+            read_content(auth_admin_client.get(export_url))
+
+        export_queries = [
+            query['sql'] for query in context.captured_queries
+            if 'reservations_reservation' in query['sql']
+        ]
+        assert len(export_queries) == 1
+        assert 'JOIN' in export_queries[0]
+
+    @pytest.mark.parametrize('params', [
+        {'status': 'confirmed,lost'},
+        {'date_from': '2030-02-01', 'date_to': '2030-01-01'},
+        {'date_from': 'yesterday'},
+        {'export_format': 'xlsx'},
+    ])
+    def test_invalid_params(self, auth_admin_client, export_url, params):
+        response = auth_admin_client.get(export_url, params)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
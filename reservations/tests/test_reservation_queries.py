@@ -0,0 +1,179 @@
+import pytest
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from reservations.models import Room, Reservation, Clients
+from datetime import date, timedelta
+from decimal import Decimal
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def make_reservations(normal_user):
+    """Crea `count` reservaciones, cada una en su propia habitación"""
+    client = Clients.objects.create(
+        user=normal_user,
+        name='John',
+        lastname='Doe',
+        document_number='12345678',
+        street='123 Main St',
+        city='New York',
+        state='NY',
+        country='USA',
+        email='john@example.com'
+    )
+
+    def make(count):
+        start = Reservation.objects.count()
+        for i in range(start, start + count):
+            room = Room.objects.create(
+                number=100 + i,
+                type='double',
+                price_for_night=Decimal('150.00'),
+                status='available',
+                capacity=2,
+                amenities={}
+            )
+            Reservation.objects.create(
+                date_in=date.today() + timedelta(days=1),
+                date_out=date.today() + timedelta(days=3),
+                client=client,
+                room=room
+            )
+    return make
+
+
+def count_queries(api_client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    return len(context.captured_queries)
+
+
+class TestReservationQueryCount:
+    @pytest.mark.parametrize('user_fixture,url_name', [
+        ('admin_user', 'reservations:reservation-list'),
+        ('normal_user', 'reservations:reservation-list'),
+        ('normal_user', 'reservations:reservation-my_reservations'),
+    ])
+    def test_list_query_count_is_flat(self, request, api_client, make_reservations,
+                                      user_fixture, url_name):
+        api_client.force_authenticate(user=request.getfixturevalue(user_fixture))
+        url = reverse(url_name)
+
+        make_reservations(2)
+        few = count_queries(api_client, url)
+        make_reservations(20)
+        many = count_queries(api_client, url)
+
+        assert len(api_client.get(url).json()['results']) == 22
+        assert many == few
+
+    def test_retrieve_is_single_query(self, api_client, normal_user, make_reservations,
+                                      django_assert_num_queries):
+        make_reservations(1)
+        reservation = Reservation.objects.get()
+        api_client.force_authenticate(user=normal_user)
+
+        with django_assert_num_queries(1):
+            response = api_client.get(
+                reverse('reservations:reservation-detail', args=[reservation.id]))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['room_number'] == reservation.room.number
+
+
+@pytest.fixture
+def stay():
+    date_in = date.today() + timedelta(days=10)
+    return {'date_in': date_in, 'date_out': date_in + timedelta(days=2)}
+
+
+class TestReservationWriteQueries:
+    def test_create_checks_availability_once(self, api_client, admin_user, make_reservations,
+                                             stay):
+        make_reservations(1)
+        reservation = Reservation.objects.get()
+        api_client.force_authenticate(user=admin_user)
+
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.post(reverse('reservations:reservation-list'), {
+                'room': reservation.room_id, 'client': reservation.client_id,
+                'date_in': stay['date_in'].isoformat(), 'date_out': stay['date_out'].isoformat()
+            }, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        sql = [query['sql'] for query in context.captured_queries]
+        assert sum('FROM "reservations_roomnight"' in query for query in sql) == 1
+        # Solo la lectura bloqueada de reservations.booking
+        room_reads = [query for query in sql if 'FROM "reservations_room"' in query]
+        assert len(room_reads) == 1
+        if connection.features.has_select_for_update:
+            assert 'FOR UPDATE' in room_reads[0]
+        # Sin las comprobaciones de existencia de las claves foráneas de full_clean
+        assert not any(query.startswith('SELECT 1 AS "a" FROM "reservations_clients"')
+                       for query in sql)
+
+    def test_create_with_unknown_room(self, api_client, admin_user, make_reservations, stay):
+        make_reservations(1)
+        reservation = Reservation.objects.get()
+        api_client.force_authenticate(user=admin_user)
+
+        response = api_client.post(reverse('reservations:reservation-list'), {
+            'room': 99999, 'client': reservation.client_id,
+            'date_in': stay['date_in'].isoformat(), 'date_out': stay['date_out'].isoformat()
+        }, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json() == {'room': ['The room does not exist.']}
+        assert Reservation.objects.count() == 1
+
+    def test_partial_update_without_dates(self, api_client, admin_user, make_reservations):
+        make_reservations(1)
+        reservation = Reservation.objects.get()
+        api_client.force_authenticate(user=admin_user)
+
+        response = api_client.patch(
+            reverse('reservations:reservation-detail', args=[reservation.id]),
+            {'number_of_guests': 2}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        reservation.refresh_from_db()
+        assert reservation.number_of_guests == 2
+
+    def test_partial_update_checks_capacity(self, api_client, admin_user, make_reservations):
+        make_reservations(1)
+        reservation = Reservation.objects.get()
+        api_client.force_authenticate(user=admin_user)
+
+        response = api_client.patch(
+            reverse('reservations:reservation-detail', args=[reservation.id]),
+            {'number_of_guests': 5}, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'capacity is 2' in str(response.json())
+
+    def test_model_save_still_checks_overlap(self, make_reservations):
+        make_reservations(1)
+        reservation = Reservation.objects.get()
+        overlapping = Reservation(
+            date_in=reservation.date_in, date_out=reservation.date_out,
+            client_id=reservation.client_id, room_id=reservation.room_id)
+
+        with pytest.raises(ValidationError, match='not available for the selected dates'):
+            overlapping.save()
+
+    def test_checked_save_rejected_by_night_inventory(self, make_reservations):
+        # Aunque quien guarda afirme haber consultado, RoomNight impide el solapamiento
+        make_reservations(1)
+        reservation = Reservation.objects.get()
+        overlapping = Reservation(
+            date_in=reservation.date_in, date_out=reservation.date_out,
+            client=reservation.client, room=reservation.room)
+
+        with pytest.raises(ValidationError, match='not available for the selected dates'):
+            overlapping.save(availability_checked=True)
+        assert Reservation.objects.count() == 1
@@ -0,0 +1,158 @@
+import pytest
+from django.urls import reverse
+from rest_framework import serializers, status
+from reservations.models import Room, Reservation, Clients
+from reservations.availability import free_gaps, suggest_alternative_dates
+from reservations.serializers import ReservationSerializer
+from datetime import date, timedelta
+from decimal import Decimal
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def test_client():
+    return Clients.objects.create(
+        name='John',
+        lastname='Doe',
+        document_number='12345678',
+        street='123 Main St',
+        city='New York',
+        state='NY',
+        country='USA',
+        email='john@example.com'
+    )
+
+
+@pytest.fixture
+def test_rooms():
+    return [
+        Room.objects.create(
+            number=101,
+            type='double',
+            price_for_night=Decimal('150.00'),
+            status='available',
+            capacity=2,
+            amenities={}
+        ),
+        Room.objects.create(
+            number=102,
+            type='double',
+            price_for_night=Decimal('150.00'),
+            status='available',
+            capacity=2,
+            amenities={}
+        ),
+    ]
+
+
+def days(n):
+    return date.today() + timedelta(days=n)
+
+
+@pytest.fixture
+def booked_room(test_client, test_rooms):
+    # Ocupada las noches 10 a 14 y 16 a 19: la noche 15 queda suelta
+    Reservation.objects.create(
+        date_in=days(10), date_out=days(15), client=test_client, room=test_rooms[0])
+    Reservation.objects.create(
+        date_in=days(16), date_out=days(20), client=test_client, room=test_rooms[0])
+    return test_rooms[0]
+
+
+class TestSuggestAlternativeDates:
+    def test_free_gaps(self):
+        reservations = [(days(2), days(4)), (days(3), days(6)), (days(8), days(9))]
+        assert free_gaps(reservations, days(0), days(10)) == [
+            (days(0), days(2)), (days(6), days(8)), (days(9), days(10))
+        ]
+
+    def test_closest_windows_of_same_length(self, booked_room, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            alternatives = suggest_alternative_dates([booked_room], days(14), days(17))
+
+        # A igual distancia se prefiere la ventana anterior
+        assert [(a['date_in'], a['date_out']) for a in alternatives] == [
+            (days(20), days(23)), (days(7), days(10)), (days(21), days(24))
+        ]
+        assert [a['offset_days'] for a in alternatives] == [6, -7, 7]
+
+    def test_never_suggests_past_dates(self, booked_room):
+        alternatives = suggest_alternative_dates([booked_room], days(10), days(15), limit=10)
+        assert all(a['date_in'] >= date.today() for a in alternatives)
+
+    def test_room_type_uses_any_room(self, booked_room, test_rooms):
+        alternatives = suggest_alternative_dates(test_rooms, days(12), days(15), limit=1)
+        assert alternatives[0]['room_id'] == test_rooms[1].id
+        assert alternatives[0]['offset_days'] == 0
+
+    def test_excluded_reservation_frees_its_dates(self, booked_room):
+        reservation = booked_room.reservations.get(date_in=days(10))
+        alternatives = suggest_alternative_dates(
+            [booked_room], days(12), days(15), limit=1, exclude_reservation=reservation)
+        assert alternatives[0]['date_in'] == days(12)
+
+
+class TestAlternativesInErrors:
+    def test_serializer_error_includes_alternatives(self, booked_room, test_client):
+        serializer = ReservationSerializer(data={
+            'date_in': days(12),
+            'date_out': days(15),
+            'client': test_client.id,
+            'room': booked_room.id
+        })
+
+        assert serializer.is_valid(), serializer.errors
+        with pytest.raises(serializers.ValidationError) as error:
+            serializer.save()
+
+        errors = error.value.detail
+        assert 'not available for the selected dates' in str(errors['non_field_errors'])
+        assert errors['alternatives'][0] == {
+            'date_in': days(7).isoformat(), 'date_out': days(10).isoformat()
+        }
+
+
+class TestAlternativesAction:
+    def test_requires_authentication(self, api_client):
+        response = api_client.get(reverse('reservations:room-alternatives'))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_alternatives_for_room(self, api_client, normal_user, booked_room):
+        api_client.force_authenticate(user=normal_user)
+        response = api_client.get(reverse('reservations:room-alternatives'), {
+            'date_in': days(15).isoformat(),
+            'date_out': days(16).isoformat(),
+            'room': booked_room.id,
+            'limit': 2
+        })
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data['nights'] == 1
+        assert [(a['date_in'], a['room_number']) for a in data['alternatives']] == [
+            (days(15).isoformat(), 101), (days(20).isoformat(), 101)
+        ]
+
+    def test_alternatives_for_room_type(self, api_client, normal_user, booked_room, test_rooms):
+        api_client.force_authenticate(user=normal_user)
+        response = api_client.get(reverse('reservations:room-alternatives'), {
+            'date_in': days(12).isoformat(),
+            'date_out': days(15).isoformat(),
+            'room_type': 'double'
+        })
+
+        assert response.status_code == status.HTTP_200_OK
+        alternatives = response.json()['alternatives']
+        assert alternatives[0]['room_id'] == test_rooms[1].id
+        assert alternatives[0]['date_in'] == days(12).isoformat()
+
+    @pytest.mark.parametrize('params', [
+        {'date_in': days(3).isoformat(), 'date_out': days(1).isoformat()},
+        {'date_in': days(1).isoformat(), 'date_out': days(3).isoformat(), 'limit': 50},
+        {'date_in': days(1).isoformat(), 'date_out': days(3).isoformat(), 'room': 999},
+    ])
+    def test_invalid_params(self, api_client, normal_user, params):
+        api_client.force_authenticate(user=normal_user)
+        response = api_client.get(reverse('reservations:room-alternatives'), params)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,117 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from reservations.models import Room, Reservation, Clients
+from datetime import date, timedelta
+from decimal import Decimal
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def test_client():
+    return Clients.objects.create(
+        name='John',
+        lastname='Doe',
+        document_number='12345678',
+        street='123 Main St',
+        city='New York',
+        state='NY',
+        country='USA',
+        email='john@example.com'
+    )
+
+
+@pytest.fixture
+def test_rooms():
+    return [
+        Room.objects.create(
+            number=100 + i,
+            type='double',
+            price_for_night=Decimal('150.00'),
+            status='available',
+            capacity=2,
+            amenities={}
+        )
+        for i in range(2)
+    ]
+
+
+@pytest.fixture
+def reservations(test_client, test_rooms):
+    start = date.today() + timedelta(days=1)
+    # Empieza antes del rango consultado
+    Reservation.objects.create(
+        date_in=date.today(),
+        date_out=start + timedelta(days=2),
+        client=test_client,
+        room=test_rooms[0]
+    )
+    Reservation.objects.create(
+        date_in=start + timedelta(days=4),
+        date_out=start + timedelta(days=6),
+        client=test_client,
+        room=test_rooms[0]
+    )
+    # Las canceladas no ocupan
+    Reservation.objects.create(
+        date_in=start,
+        date_out=start + timedelta(days=3),
+        status='cancelled',
+        client=test_client,
+        room=test_rooms[1]
+    )
+    return start
+
+
+@pytest.fixture
+def url():
+    return reverse('reservations:room-calendar')
+
+
+class TestRoomCalendar:
+    def test_bitstring_matrix(self, api_client, admin_user, url, test_rooms, reservations,
+                              django_assert_num_queries):
+        api_client.force_authenticate(user=admin_user)
+        params = {
+            'start': reservations.isoformat(),
+            'end': (reservations + timedelta(days=7)).isoformat()
+        }
+
+        with django_assert_num_queries(2):
+            response = api_client.get(url, params)
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data['days'] == 7
+        assert [room['room_id'] for room in data['rooms']] == [room.id for room in test_rooms]
+        assert data['rooms'][0]['occupancy'] == '1100110'
+        assert data['rooms'][1]['occupancy'] == '0000000'
+
+    def test_runs_encoding(self, api_client, admin_user, url, test_rooms, reservations):
+        api_client.force_authenticate(user=admin_user)
+        response = api_client.get(url, {
+            'start': reservations.isoformat(),
+            'end': (reservations + timedelta(days=7)).isoformat(),
+            'encoding': 'runs'
+        })
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['rooms'][0]['occupancy'] == [[0, 2], [4, 2]]
+        assert response.json()['rooms'][1]['occupancy'] == []
+
+    def test_requires_admin(self, api_client, normal_user, url):
+        api_client.force_authenticate(user=normal_user)
+        response = api_client.get(url, {'start': '2030-01-01', 'end': '2030-02-01'})
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    @pytest.mark.parametrize('params', [
+        {'start': '2030-02-01', 'end': '2030-01-01'},
+        {'start': '2030-01-01', 'end': '2031-06-01'},
+        {'start': '2030-01-01'},
+        {'start': '2030-01-01', 'end': '2030-02-01', 'encoding': 'png'},
+    ])
+    def test_invalid_params(self, api_client, admin_user, url, params):
+        api_client.force_authenticate(user=admin_user)
+        response = api_client.get(url, params)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
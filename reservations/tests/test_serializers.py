@@ -1,4 +1,5 @@
 import pytest
+from rest_framework import serializers
 from django.contrib.auth.models import User
 from reservations.models import Clients, Room, Reservation
 from datetime import date
@@ -479,10 +480,13 @@ class TestReservationSerializer:
             'room': test_room.id
         }
 
+        # Se comprueba con la habitación bloqueada, al guardar
         serializer = ReservationSerializer(data=data)
-        assert not serializer.is_valid()
-        assert 'non_field_errors' in serializer.errors
-        assert 'capacity' in str(serializer.errors['non_field_errors'])
+        assert serializer.is_valid(), serializer.errors
+        with pytest.raises(serializers.ValidationError) as error:
+            serializer.save()
+        assert 'non_field_errors' in error.value.detail
+        assert 'capacity' in str(error.value.detail['non_field_errors'])
 
     def test_room_not_available_status(self, test_client):
         """Test room not available due to status"""
@@ -510,10 +514,13 @@ class TestReservationSerializer:
             'room': maintenance_room.id
         }
 
+        # Se comprueba con la habitación bloqueada, al guardar
         serializer = ReservationSerializer(data=data)
-        assert not serializer.is_valid()
-        assert 'non_field_errors' in serializer.errors
-        assert 'current status' in str(serializer.errors['non_field_errors'])
+        assert serializer.is_valid(), serializer.errors
+        with pytest.raises(serializers.ValidationError) as error:
+            serializer.save()
+        assert 'non_field_errors' in error.value.detail
+        assert 'current status' in str(error.value.detail['non_field_errors'])
 
     def test_overlapping_reservation(self, test_client, test_room):
         """Test overlapping reservation validation"""
@@ -536,10 +543,13 @@ class TestReservationSerializer:
             'room': test_room.id
         }
 
+        # Se comprueba con la habitación bloqueada, al guardar
         serializer = ReservationSerializer(data=data)
-        assert not serializer.is_valid()
-        assert 'non_field_errors' in serializer.errors
-        assert 'not available for the selected dates' in str(serializer.errors['non_field_errors'])
+        assert serializer.is_valid(), serializer.errors
+        with pytest.raises(serializers.ValidationError) as error:
+            serializer.save()
+        assert 'non_field_errors' in error.value.detail
+        assert 'not available for the selected dates' in str(error.value.detail['non_field_errors'])
 
     def test_readonly_fields(self, test_client, test_room):
         """Test readonly fields are not updated"""
@@ -0,0 +1,120 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from reservations.models import Room, Reservation, Clients
+from reservations.serializers import ReservationSerializer
+from datetime import date, timedelta
+from decimal import Decimal
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def test_client(normal_user):
+    return Clients.objects.create(
+        user=normal_user,
+        name='John',
+        lastname='Doe',
+        document_number='12345678',
+        street='123 Main St',
+        city='New York',
+        state='NY',
+        country='USA',
+        email='john@example.com'
+    )
+
+
+@pytest.fixture
+def test_room():
+    return Room.objects.create(
+        number=101,
+        type='double',
+        price_for_night=Decimal('150.00'),
+        status='available',
+        capacity=2,
+        amenities={}
+    )
+
+
+@pytest.fixture
+def test_reservation(test_client, test_room):
+    return Reservation.objects.create(
+        date_in=date.today() + timedelta(days=1),
+        date_out=date.today() + timedelta(days=3),
+        client=test_client,
+        room=test_room
+    )
+
+
+def get_with_sql(api_client, url, params):
+    with CaptureQueriesContext(connection) as context:
+        response = api_client.get(url, params)
+    assert response.status_code == status.HTTP_200_OK
+    return response, ' '.join(query['sql'] for query in context.captured_queries)
+
+
+class TestSparseFields:
+    def test_reservation_fields(self, api_client, admin_user, test_reservation, monkeypatch):
+        def fail(self, obj):
+            raise AssertionError('total_nights no debe calcularse')
+        monkeypatch.setattr(ReservationSerializer, 'get_total_nights', fail)
+        api_client.force_authenticate(user=admin_user)
+
+        response, sql = get_with_sql(api_client, reverse('reservations:reservation-list'),
+                                     {'fields': 'id,date_in,date_out,status'})
+
+        assert list(response.json()['results'][0]) == ['id', 'date_in', 'date_out', 'status']
+        assert 'JOIN' not in sql
+
+    def test_reservation_omit(self, api_client, admin_user, test_reservation):
+        api_client.force_authenticate(user=admin_user)
+
+        response, sql = get_with_sql(
+            api_client, reverse('reservations:reservation-detail', args=[test_reservation.id]),
+            {'omit': 'client_name,client_lastname'})
+
+        data = response.json()
+        assert 'client_name' not in data and 'client_lastname' not in data
+        assert data['room_number'] == 101
+        assert '"reservations_room"' in sql
+        assert 'JOIN "reservations_clients"' not in sql
+
+    def test_default_keeps_all_fields_and_joins(self, api_client, admin_user, test_reservation):
+        api_client.force_authenticate(user=admin_user)
+
+        response, sql = get_with_sql(api_client, reverse('reservations:reservation-list'), {})
+
+        assert response.json()['results'][0]['total_nights'] == 2
+        assert 'JOIN "reservations_clients"' in sql
+        assert 'JOIN "reservations_room"' in sql
+
+    def test_client_without_user_fields(self, api_client, admin_user, test_client):
+        api_client.force_authenticate(user=admin_user)
+
+        response, sql = get_with_sql(api_client, reverse('reservations:client-list'),
+                                     {'fields': 'id,name,email'})
+
+        assert response.json()['results'] == [
+            {'id': test_client.id, 'name': 'John', 'email': 'john@example.com'}]
+        assert 'JOIN "auth_user"' not in sql
+
+    def test_room_fields(self, api_client, normal_user, test_room):
+        api_client.force_authenticate(user=normal_user)
+        response = api_client.get(reverse('reservations:room-list'),
+                                  {'fields': 'id,number', 'omit': 'number'})
+        assert response.json()['results'] == [{'id': test_room.id}]
+
+    def test_writes_ignore_fields(self, api_client, admin_user, test_reservation):
+        api_client.force_authenticate(user=admin_user)
+        url = reverse('reservations:reservation-detail', args=[test_reservation.id])
+
+        response = api_client.patch(f'{url}?fields=id', {
+            'date_in': test_reservation.date_in.isoformat(),
+            'date_out': test_reservation.date_out.isoformat(),
+            'status': 'confirmed'
+        }, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['status'] == 'confirmed'
@@ -0,0 +1,125 @@
+import pytest
+from django.urls import reverse
+from rest_framework import serializers, status
+from rest_framework.renderers import JSONRenderer
+from reservations.models import Room, Reservation, Clients
+from reservations.read_serializers import values_serializer
+from reservations.serializers import ClientSerializer, RoomSerializer, ReservationSerializer
+from datetime import date, timedelta
+from decimal import Decimal
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def test_clients(normal_user):
+    return [
+        Clients.objects.create(
+            user=normal_user, name='John', lastname='Doe', document_number='12345678',
+            street='123 Main St', city='New York', state='NY', country='USA',
+            email='john@example.com', phone='+12125552368'
+        ),
+        # Sin usuario, sin email ni teléfono: user_username y user_email se omiten
+        Clients.objects.create(
+            name='Jane', lastname='Roe', document_number='87654321',
+            street='1 Side St', city='Boston', state='MA', country='USA'
+        ),
+    ]
+
+
+@pytest.fixture
+def test_rooms():
+    return [
+        Room.objects.create(
+            number=101, type='double', price_for_night=Decimal('150.00'), capacity=2,
+            description='Vista al mar', amenities={'wifi': True, 'tv': False}
+        ),
+        Room.objects.create(
+            number=102, type='suite', price_for_night=Decimal('320.50'), capacity=4,
+            status='maintenance', amenities={}
+        ),
+    ]
+
+
+@pytest.fixture
+def test_reservations(test_clients, test_rooms):
+    return [
+        Reservation.objects.create(
+            date_in=date.today() + timedelta(days=1 + i * 5),
+            date_out=date.today() + timedelta(days=3 + i * 5),
+            number_of_guests=2,
+            client=test_clients[i % 2],
+            room=test_rooms[0]
+        )
+        for i in range(3)
+    ]
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+@pytest.mark.parametrize('serializer_class,model', [
+    (ClientSerializer, Clients),
+    (RoomSerializer, Room),
+    (ReservationSerializer, Reservation),
+])
+def test_same_json_as_model_serializer(serializer_class, model, test_reservations):
+    queryset = model.objects.order_by('id')
+    reader = values_serializer(serializer_class())
+
+    expected = serializer_class(queryset, many=True).data
+
+    assert render(reader.from_values(reader.values(queryset))) == render(expected)
+    assert render([reader.from_instance(obj) for obj in queryset]) == render(expected)
+
+
+def test_method_field_without_read_sources_is_not_compiled():
+    class NightsSerializer(serializers.ModelSerializer):
+        nights = serializers.SerializerMethodField()
+
+        class Meta:
+            model = Reservation
+            fields = ['id', 'nights']
+
+        def get_nights(self, obj):
+            return obj.get_nights()
+
+    assert values_serializer(NightsSerializer()) is None
+
+
+class TestValuesReadViews:
+    def test_reservation_list_and_detail(self, api_client, admin_user, test_reservations):
+        api_client.force_authenticate(user=admin_user)
+
+        response = api_client.get(reverse('reservations:reservation-list'))
+        assert response.status_code == status.HTTP_200_OK
+        expected = ReservationSerializer(
+            Reservation.objects.order_by('-id'), many=True).data
+        assert render(response.json()['results']) == render(expected)
+
+        reservation = test_reservations[0]
+        response = api_client.get(
+            reverse('reservations:reservation-detail', args=[reservation.id]))
+        assert response.json() == ReservationSerializer(reservation).data
+
+    def test_client_list_without_user(self, api_client, admin_user, test_clients):
+        api_client.force_authenticate(user=admin_user)
+
+        response = api_client.get(reverse('reservations:client-list'))
+
+        results = response.json()['results']
+        assert 'user_username' not in results[0]
+        assert results[1]['user_username'] == 'testuser'
+        assert results[1]['phone'] == '+12125552368'
+
+    def test_sparse_room_list(self, api_client, normal_user, test_rooms):
+        api_client.force_authenticate(user=normal_user)
+
+        response = api_client.get(reverse('reservations:room-list'),
+                                  {'fields': 'number,price_for_night'})
+
+        assert response.json()['results'] == [
+            {'number': 102, 'price_for_night': '320.50'},
+            {'number': 101, 'price_for_night': '150.00'},
+        ]
@@ -75,7 +75,7 @@ class TestClientView:
         response = api_client.get(api_url, format="json")
 
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.json()) == 1
+        assert len(response.json()['results']) == 1
 
     def test_create_client_without_authentication(self, api_client, new_client):
         api_url = reverse('reservations:client-list')
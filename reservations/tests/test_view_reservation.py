@@ -76,7 +76,7 @@ class TestReservationViewSet:
         url = reverse('reservations:reservation-list')
         response = api_client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 1
+        assert len(response.data['results']) == 1
 
     def test_list_reservations_as_regular_user(self, api_client, regular_user, test_reservation):
         api_client.force_authenticate(user=regular_user)
@@ -84,7 +84,7 @@ class TestReservationViewSet:
         response = api_client.get(url)
         assert response.status_code == status.HTTP_200_OK
         # Regular users only see their own reservations
-        assert len(response.data) == 0
+        assert len(response.data['results']) == 0
 
     def test_create_reservation_as_admin(self, api_client, admin_user, test_client, test_room):
         api_client.force_authenticate(user=admin_user)
@@ -120,7 +120,7 @@ class TestReservationViewSet:
         url = reverse('reservations:reservation-my_reservations')
         response = api_client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 1
+        assert len(response.data['results']) == 1
 
     def test_update_reservation_as_admin(self, api_client, admin_user, test_reservation):
         api_client.force_authenticate(user=admin_user)
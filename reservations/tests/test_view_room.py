@@ -56,14 +56,14 @@ class TestRoomViewSet:
         url = reverse('reservations:room-list')
         response = api_client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 1
+        assert len(response.data['results']) == 1
 
     def test_list_rooms_as_regular_user(self, api_client, regular_user, test_room):
         api_client.force_authenticate(user=regular_user)
         url = reverse('reservations:room-list')
         response = api_client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 1
+        assert len(response.data['results']) == 1
 
     def test_create_room_as_admin(self, api_client, admin_user):
         api_client.force_authenticate(user=admin_user)
@@ -1,6 +1,7 @@
 from rest_framework.routers import DefaultRouter
 from django.urls import path, include
 from reservations.views import ClientViewSet, RoomViewSet, ReservationViewSet, RegisterUser
+from reservations import async_views
 
 app_name = "reservations"
 router = DefaultRouter()
@@ -14,5 +15,7 @@ urlpatterns = [
     path('reservation/my_reservations/', ReservationViewSet.as_view(
         {'get': 'my_reservations'}), name='reservation-my_reservations'),
     path('room/availability/', RoomViewSet.as_view(
-        {'get': 'availability'}), name='room-availability')
+        {'get': 'availability'}), name='room-availability'),
+    path('room/availability/async/', async_views.availability,
+         name='room-availability-async')
 ]
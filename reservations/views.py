@@ -1,21 +1,111 @@
 from rest_framework import viewsets, status
 from django.contrib.auth.models import User
 from reservations.models import Clients, Room, Reservation
-from reservations.serializers import ClientSerializer, RoomSerializer, ReservationSerializer, UserSerializer
+from reservations.serializers import (
+    ClientSerializer, RoomSerializer, ReservationSerializer, UserSerializer, AvailabilityBatchSerializer,
+    CalendarQuerySerializer, AlternativesQuerySerializer, ReservationExportQuerySerializer,
+    GroupBookingSerializer
+)
+from reservations.availability import (
+    InvalidAvailabilityQuery, availability_data, availability_page, availability_paginated,
+    availability_queryset, availability_row, batch_availability, occupancy_calendar,
+    parse_availability_query, suggest_alternative_dates
+)
+from reservations.occupancy import get_occupancy_index, occupancy_index_enabled
+from reservations.exports import EXPORT_CHUNK_SIZE, stream_csv, stream_ndjson
+from reservations.pagination import IdCursorPagination
+from reservations.read_serializers import values_serializer
+from reservations.conditional import conditional_response, instance_version, queryset_version
+from reservations.idempotency import idempotent
+from reservations.cache import (
+    availability_cache_enabled, availability_cache_key, availability_cache_stats, cache_availability,
+    get_cached_availability
+)
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.core.exceptions import ValidationError
 
-from datetime import datetime, date
 import re
 
 
+class SparseFieldsViewMixin:
+    """
+    select_related solo de las relaciones que usan los campos pedidos con
+    ?fields= / ?omit= (ver SparseFieldsMixin)
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        related = self.get_serializer().related_fields()
+        return queryset.select_related(*sorted(related)) if related else queryset
+
+
+class ValuesReadViewMixin:
+    """
+    list y retrieve con ValuesSerializer: la página se lee con values() y el
+    detalle con accesores precompilados, con el mismo JSON que el serializer
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.paginated_response(self.filter_queryset(self.get_queryset()))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.detail_response(self.get_object())
+
+    def detail_response(self, instance):
+        return Response(self.representation(instance))
+
+    def paginated_response(self, queryset):
+        """Página del queryset ya filtrado, serializada desde values()"""
+        serializer = self.get_serializer()
+        reader = values_serializer(serializer)
+        if reader is None:
+            page = self.paginate_queryset(queryset)
+            data = self.get_serializer(page, many=True).data
+        else:
+            page = self.paginate_queryset(reader.values(queryset))
+            data = reader.from_values(page)
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
+
+    def representation(self, instance):
+        reader = values_serializer(self.get_serializer())
+        if reader is None:
+            return self.get_serializer(instance).data
+        return reader.from_instance(instance)
+
+
+class ConditionalGetViewMixin:
+    """
+    ETag en list y retrieve, calculado con modified_at y la cantidad de filas
+    (y de las relaciones que muestran los campos pedidos), y Last-Modified
+    solo en retrieve: 304 sin leer la página ni serializar si el cliente ya
+    tiene esa versión
+    """
+
+    def tracked_relations(self):
+        return sorted(self.get_serializer().related_fields())
+
+    def paginated_response(self, queryset):
+        version = queryset_version(queryset, self.tracked_relations())
+        build = super().paginated_response
+        return conditional_response(
+            self.request, version, lambda: build(queryset), use_last_modified=False)
+
+    def detail_response(self, instance):
+        version = (1, instance_version(instance, self.tracked_relations()))
+        build = super().detail_response
+        return conditional_response(self.request, version, lambda: build(instance))
+
+
 class RegisterUser(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
 
+    @idempotent('register-create')
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         if not serializer.is_valid():
@@ -91,18 +181,28 @@ class RegisterUser(viewsets.ModelViewSet):
         }, status=status.HTTP_201_CREATED)
 
 
-class ClientViewSet(viewsets.ModelViewSet):
+class ClientViewSet(ValuesReadViewMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
+    # user_username y user_email se leen del usuario de cada fila: la unión
+    # con auth_user la agrega SparseFieldsViewMixin
     queryset = Clients.objects.all()
     serializer_class = ClientSerializer
     permission_classes = [IsAuthenticated]
     authentication_classes = [JWTAuthentication]
+    pagination_class = IdCursorPagination
+
+    # Columnas de la exportación CSV
+    EXPORT_FIELDS = [
+        'id', 'name', 'lastname', 'document_number', 'email', 'phone',
+        'street', 'city', 'state', 'country', 'user__username', 'user__email',
+        'created_at'
+    ]
 
     def get_permissions(self):
         """
         Permisos diferenciados según el tipo de acción
         """
-        if self.action in ['list', 'destroy']:
-            # Solo admin puede listar todos los clientes o eliminar
+        if self.action in ['list', 'destroy', 'export']:
+            # Solo admin puede listar o exportar todos los clientes o eliminar
             permission_classes = [IsAdminUser]
         elif self.action == 'create':
             # Cualquier usuario autenticado puede crear un cliente
@@ -116,11 +216,12 @@ class ClientViewSet(viewsets.ModelViewSet):
         """
         Filtrar queryset según el usuario
         """
+        queryset = super().get_queryset()
         if self.request.user.is_staff:
-            return Clients.objects.all()
+            return queryset
         else:
             # Los usuarios normales solo pueden ver su propio perfil
-            return Clients.objects.filter(user=self.request.user)
+            return queryset.filter(user=self.request.user)
 
     def perform_create(self, serializer):
         """
@@ -144,8 +245,7 @@ class ClientViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        serializer = self.get_serializer(client)
-        return Response(serializer.data)
+        return self.detail_response(client)
 
     def update(self, request, *args, **kwargs):
         """
@@ -175,17 +275,29 @@ class ClientViewSet(viewsets.ModelViewSet):
 
         return super().partial_update(request, *args, **kwargs)
 
+    @action(detail=False, methods=['GET'], permission_classes=[IsAdminUser])
+    def export(self, request):
+        """
+        Exportar todos los clientes en CSV, leyendo por bloques
+        """
+        rows = Clients.objects.order_by('id').values_list(
+            *self.EXPORT_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        header = [field.replace('__', '_') for field in self.EXPORT_FIELDS]
+        return stream_csv('clients.csv', header, rows)
 
-class RoomViewSet(viewsets.ModelViewSet):
+
+class RoomViewSet(ConditionalGetViewMixin, ValuesReadViewMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     authentication_classes = [JWTAuthentication]
 
     queryset = Room.objects.all()
     serializer_class = RoomSerializer
+    pagination_class = IdCursorPagination
 
-    # Solo los administradores pueden crear o eliminar habitaciones
+    # Solo los administradores pueden crear o eliminar habitaciones, ver el
+    # calendario de ocupación y la caché
     def get_permissions(self):
-        if self.action in ['create', 'destroy']:
+        if self.action in ['create', 'destroy', 'calendar', 'availability_cache']:
             permission_classes = [IsAdminUser]
         else:
             permission_classes = [IsAuthenticated]
@@ -196,100 +308,156 @@ class RoomViewSet(viewsets.ModelViewSet):
         """
         Consultar disponibilidad de habitaciones en fechas específicas
         """
-        date_in = request.query_params.get('date_in')
-        date_out = request.query_params.get('date_out')
-        guests = request.query_params.get('guests', 1)
-        room_type = request.query_params.get('room_type')
-
-        # Validar parámetros requeridos
-        if not date_in or not date_out:
-            return Response(
-                {"error": "date_in and date_out parameters are required"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
         try:
-            # Convertir strings a objetos date
-            date_in = datetime.strptime(date_in, '%Y-%m-%d').date()
-            date_out = datetime.strptime(date_out, '%Y-%m-%d').date()
-            guests = int(guests)
-        except ValueError:
-            return Response(
-                {"error": "Invalid date format. Use YYYY-MM-DD"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        # Validar fechas
-        if date_out <= date_in:
-            return Response(
-                {"error": "date_out must be after date_in"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            params = parse_availability_query(request.query_params)
+        except InvalidAvailabilityQuery as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Consultas idénticas con el mismo inventario devuelven la misma respuesta
+        cache_key = None
+        if availability_cache_enabled():
+            cache_key = availability_cache_key(params)
+            cached = get_cached_availability(cache_key)
+            if cached is not None:
+                return Response(cached)
+
+        # Habitaciones libres u ocupadas desde el índice en memoria si cubre
+        # el rango; si no, NOT EXISTS sobre el inventario por noche
+        room_ids = None
+        if occupancy_index_enabled():
+            room_ids = get_occupancy_index().room_ids_for(
+                params['date_in'], params['date_out'])
+
+        available_rooms = availability_queryset(params, room_ids)
+
+        # nights y total_price llegan calculados; las filas se leen por bloques
+        results = [
+            availability_row(row)
+            for row in availability_page(available_rooms, params).iterator(chunk_size=500)
+        ]
+        total_available = (
+            available_rooms.count() if availability_paginated(params) else len(results))
+
+        data = availability_data(params, results, total_available)
+        if cache_key is not None:
+            cache_availability(cache_key, data)
+
+        return Response(data)
+
+    @action(detail=False, methods=['POST'], permission_classes=[IsAuthenticated],
+            url_path='availability/batch')
+    def availability_batch(self, request):
+        """
+        Consultar disponibilidad para varias ventanas de fechas en una sola petición
+        """
+        serializer = AvailabilityBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        if date_in < date.today():
-            return Response(
-                {"error": "date_in cannot be in the past"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        guests = serializer.validated_data['guests']
+        room_type = serializer.validated_data.get('room_type')
 
-        # Obtener habitaciones disponibles
         available_rooms = Room.objects.filter(
             status='available',
             capacity__gte=guests
         )
-
-        # Filtrar por tipo de habitación si se especifica
         if room_type:
             available_rooms = available_rooms.filter(type=room_type)
 
-        # Excluir habitaciones con reservaciones en conflicto
-        conflicting_reservations = Reservation.objects.filter(
-            date_in__lt=date_out,
-            date_out__gt=date_in,
-            status__in=['pending', 'confirmed']
-        ).values_list('room_id', flat=True)
-
-        available_rooms = available_rooms.exclude(
-            id__in=conflicting_reservations)
-
-        # Calcular precio total para cada habitación
-        nights = (date_out - date_in).days
-        results = []
-        for room in available_rooms:
-            total_price = nights * room.price_for_night
-            results.append({
-                'room_id': room.id,
-                'room_number': room.number,
-                'room_type': room.type,
-                'capacity': room.capacity,
-                'price_per_night': room.price_for_night,
-                'total_price': total_price,
-                'nights': nights,
-                'description': room.description,
-                'amenities': room.amenities
-            })
+        return Response({
+            'guests': guests,
+            'room_type': room_type,
+            'windows': batch_availability(
+                available_rooms, serializer.validated_data['windows'])
+        })
+
+    @action(detail=False, methods=['GET'], permission_classes=[IsAuthenticated])
+    def alternatives(self, request):
+        """
+        Fechas libres más cercanas a las pedidas, de la misma duración, para
+        una habitación o un tipo de habitación
+        """
+        serializer = AlternativesQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        date_in = serializer.validated_data['date_in']
+        date_out = serializer.validated_data['date_out']
+        room = serializer.validated_data.get('room')
+        room_type = serializer.validated_data.get('room_type')
+        guests = serializer.validated_data['guests']
+
+        rooms = Room.objects.filter(
+            status='available',
+            capacity__gte=guests
+        ).only('id', 'number')
+        if room:
+            rooms = rooms.filter(id=room.id)
+        if room_type:
+            rooms = rooms.filter(type=room_type)
 
         return Response({
             'date_in': date_in,
             'date_out': date_out,
-            'guests': guests,
-            'available_rooms': results,
-            'total_available': len(results)
+            'nights': (date_out - date_in).days,
+            'alternatives': suggest_alternative_dates(
+                rooms, date_in, date_out, limit=serializer.validated_data['limit'])
         })
 
+    @action(detail=False, methods=['GET'], permission_classes=[IsAdminUser])
+    def calendar(self, request):
+        """
+        Calendario de ocupación (habitaciones x días) para recepción
+        """
+        serializer = CalendarQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        start = serializer.validated_data['start']
+        end = serializer.validated_data['end']
+        encoding = serializer.validated_data['encoding']
+        rooms = Room.objects.only('id', 'number', 'type', 'status').order_by('number', 'id')
 
-class ReservationViewSet(viewsets.ModelViewSet):
+        return Response({
+            'start': start,
+            'end': end,
+            'days': (end - start).days,
+            'encoding': encoding,
+            'rooms': occupancy_calendar(rooms, start, end, encoding)
+        })
+
+    @action(detail=False, methods=['GET'], permission_classes=[IsAdminUser],
+            url_path='availability/cache')
+    def availability_cache(self, request):
+        """
+        Contadores de aciertos y fallos de la caché de disponibilidad
+        """
+        return Response(availability_cache_stats())
+
+
+class ReservationViewSet(ConditionalGetViewMixin, ValuesReadViewMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
+    # El serializer lee campos de client y room en cada fila: las uniones
+    # las agrega SparseFieldsViewMixin según los campos pedidos
     queryset = Reservation.objects.all()
     serializer_class = ReservationSerializer
     permission_classes = [IsAuthenticated]
     authentication_classes = [JWTAuthentication]
+    pagination_class = IdCursorPagination
+
+    # Columnas de la exportación, con los datos del cliente y la habitación unidos
+    EXPORT_FIELDS = [
+        'id', 'date_in', 'date_out', 'number_of_guests', 'status', 'total_price',
+        'client_id', 'client__name', 'client__lastname', 'client__document_number',
+        'client__email', 'room_id', 'room__number', 'room__type',
+        'room__price_for_night', 'created_at', 'updated_at'
+    ]
 
     def get_permissions(self):
         """
         Permisos diferenciados según el tipo de acción
         """
-        if self.action in ['create', 'destroy', 'update', 'partial_update']:
-            # Solo admin puede crear, eliminar o modificar reservaciones
+        if self.action in ['create', 'destroy', 'update', 'partial_update', 'export', 'group']:
+            # Solo admin puede crear, eliminar, modificar o exportar reservaciones
             permission_classes = [IsAdminUser]
         else:
             # Consultas y listados requieren solo autenticación
@@ -297,24 +465,25 @@ class ReservationViewSet(viewsets.ModelViewSet):
 
         return [permission() for permission in permission_classes]
 
+    @idempotent('reservation-create')
+    def create(self, request, *args, **kwargs):
+        """
+        Crear reservación; con Idempotency-Key los reintentos reciben la
+        respuesta original sin volver a reservar
+        """
+        return super().create(request, *args, **kwargs)
+
     def list(self, request):
         """
         Listar reservaciones (solo usuarios autenticados)
         """
         # Filtrar reservaciones según el usuario
-        if request.user.is_staff:
-            # Admins ven todas las reservaciones
-            queryset = Reservation.objects.all()
-        else:
+        queryset = self.get_queryset()
+        if not request.user.is_staff:
             # Usuarios normales ven solo sus propias reservaciones
-            try:
-                client = Clients.objects.get(user=request.user)
-                queryset = Reservation.objects.filter(client=client)
-            except Clients.DoesNotExist:
-                queryset = Reservation.objects.none()
+            queryset = queryset.filter(client__user=request.user)
 
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.paginated_response(queryset)
 
     def retrieve(self, request, pk=None):
         """
@@ -323,33 +492,60 @@ class ReservationViewSet(viewsets.ModelViewSet):
         reservation = self.get_object()
 
         # Verificar si el usuario tiene permiso para ver esta reservación
-        if not request.user.is_staff:
-            try:
-                client = Clients.objects.get(user=request.user)
-                if reservation.client != client:
-                    return Response(
-                        {"detail": "No tiene permiso para ver esta reservación"},
-                        status=status.HTTP_403_FORBIDDEN
-                    )
-            except Clients.DoesNotExist:
-                return Response(
-                    {"detail": "No tiene permiso para ver esta reservación"},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-
-        serializer = self.get_serializer(reservation)
-        return Response(serializer.data)
+        if not request.user.is_staff and reservation.client.user_id != request.user.id:
+            return Response(
+                {"detail": "No tiene permiso para ver esta reservación"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        return self.detail_response(reservation)
 
     @action(detail=False, methods=['GET'], permission_classes=[IsAuthenticated])
     def my_reservations(self, request):
         """
         Acción personalizada para ver reservaciones del usuario actual
         """
-        try:
-            client = Clients.objects.get(user=request.user)
-            queryset = Reservation.objects.filter(client=client)
-        except Clients.DoesNotExist:
-            queryset = Reservation.objects.none()
+        queryset = self.get_queryset().filter(client__user=request.user)
+
+        return self.paginated_response(queryset)
 
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+    @action(detail=False, methods=['POST'], permission_classes=[IsAdminUser])
+    @idempotent('reservation-group')
+    def group(self, request):
+        """
+        Reserva de grupo: varias habitaciones en una sola transacción, todas o ninguna
+        """
+        serializer = GroupBookingSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        reservations = serializer.save()
+
+        return Response({
+            'reservations': self.get_serializer(reservations, many=True).data,
+            'total_price': str(sum(reservation.total_price for reservation in reservations)),
+        }, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['GET'], permission_classes=[IsAdminUser])
+    def export(self, request):
+        """
+        Exportar reservaciones en CSV o NDJSON, leyendo por bloques
+        """
+        serializer = ReservationExportQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        params = serializer.validated_data
+
+        reservations = Reservation.objects.order_by('id')
+        if 'date_from' in params:
+            reservations = reservations.filter(date_in__gte=params['date_from'])
+        if 'date_to' in params:
+            reservations = reservations.filter(date_in__lte=params['date_to'])
+        if params.get('status'):
+            reservations = reservations.filter(status__in=params['status'])
+
+        rows = reservations.values_list(
+            *self.EXPORT_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        header = [field.replace('__', '_') for field in self.EXPORT_FIELDS]
+        if params['export_format'] == 'ndjson':
+            return stream_ndjson('reservations.ndjson', header, rows)
+        return stream_csv('reservations.csv', header, rows)